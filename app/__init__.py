@@ -44,6 +44,16 @@ def create_app(debug=False):
     from .routes import init_routes
     init_routes(app)
     
+    # Optional background cleanup of stale-generation cache keys, and the
+    # pub/sub listener that keeps this worker's L1 cache coherent
+    from .integrations.redis_client import start_cache_sweeper, start_cache_invalidation_listener
+    start_cache_sweeper()
+    start_cache_invalidation_listener()
+    
+    # Background job workers inside this process (JOB_EMBEDDED_WORKERS, Redis queue only)
+    from .jobs.queue import start_embedded_workers
+    start_embedded_workers(app)
+    
     return app
 
 def configure_logging(debug_mode):
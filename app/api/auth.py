@@ -1,7 +1,8 @@
 """Authentication API routes"""
 from flask import Blueprint, request, jsonify, session, redirect, url_for, render_template, current_app, g
 import logging
-from app.auth import get_supabase_auth_client, get_current_user, require_auth, require_super_user
+from app.auth import get_supabase_auth_client, get_current_user, require_auth, require_super_user, invalidate_user_context
+from app.services.permission_matrix import bump_permissions_version
 
 logger = logging.getLogger(__name__)
 
@@ -49,6 +50,7 @@ def login():
                     is_new_user = True
                 else:
                     supabase.table('app_users').update({'email': email}).eq('supabase_user_id', response.user.id).execute()
+                invalidate_user_context(str(response.user.id))
                 
                 # Auto-grant default permissions for new users (if not super user)
                 if is_new_user:
@@ -88,6 +90,7 @@ def login():
                                                     logger.warning(f"Error granting permission: {perm_error}")
                                         
                                         logger.info(f"Auto-granted {granted_count}/{len(permissions_to_insert)} default permissions to {email}")
+                                        bump_permissions_version()
                     except Exception as perm_error:
                         logger.warning(f"Failed to auto-grant default permissions: {perm_error}")
 
@@ -299,6 +302,7 @@ def oauth_complete():
             else:
                 # Update email if changed
                 supabase.table('app_users').update({'email': user.email}).eq('supabase_user_id', user.id).execute()
+            invalidate_user_context(str(user.id))
             
             # Auto-grant default permissions for new users
             if is_new_user:
@@ -333,6 +337,7 @@ def oauth_complete():
                                                 logger.warning(f"Error granting permission: {perm_error}")
                                     
                                     logger.info(f"Auto-granted {granted_count}/{len(permissions_to_insert)} default permissions to {user.email}")
+                                    bump_permissions_version()
                 except Exception as perm_error:
                     logger.warning(f"Failed to auto-grant default permissions: {perm_error}")
             
@@ -581,6 +586,7 @@ def toggle_industry_admin(user_id):
             update_data['active_industry_id'] = industry_id
         
         db_supabase.table('app_users').update(update_data).eq('id', user_id).execute()
+        invalidate_user_context(str(user_id))
         logger.info(f"User {user_id} industry admin status updated to {is_industry_admin}.")
         return jsonify({'success': True, 'message': f'User {user_id} industry admin status updated.'})
     except Exception as e:
@@ -620,6 +626,7 @@ def assign_industry(user_id):
         }
         
         db_supabase.table('app_users').update(update_data).eq('id', user_id).execute()
+        invalidate_user_context(str(user_id))
         
         # Get user email for logging
         user_info = db_supabase.table('app_users').select('email').eq('id', user_id).limit(1).execute()
@@ -667,6 +674,7 @@ def toggle_super_user(user_id):
         user_email = user_info.data[0].get('email', 'unknown') if user_info.data else 'unknown'
         
         db_supabase.table('app_users').update({'is_super_user': bool(is_super_user)}).eq('id', user_id).execute()
+        invalidate_user_context(str(user_id))
         logger.info(f"User {user_email} ({user_id}) super user status updated to {is_super_user}.")
         return jsonify({
             'success': True, 
@@ -1,5 +1,6 @@
 """Contacts API routes"""
 from flask import Blueprint, request, jsonify, current_app
+import os
 import logging
 import openpyxl
 from io import BytesIO
@@ -10,24 +11,66 @@ from app.services.contact_service import (
     upsert_contacts, find_duplicates, resolve_best_domain,
     normalize_email, normalize_phone
 )
+from app.integrations.redis_client import register_cache_namespace
+from app.services.contact_pagination import (
+    InvalidCursorError, SearchTooBroadError, SERVER_SEARCH_MAX_COMPANIES,
+    encode_cursor, decode_cursor, search_filter, matching_company_ids, apply_keyset
+)
 from uuid import UUID
 
 logger = logging.getLogger(__name__)
 
 contacts_bp = Blueprint('contacts', __name__)
 
+# 'server' runs filters/ordering/keyset pagination in Postgres; 'cache' fetches every
+# contact into the cache and paginates in memory (also used for limits above the page cap)
+CONTACTS_LIST_MODE = os.getenv('CONTACTS_LIST_MODE', 'server').strip().lower()
+# Largest page served in server mode (PostgREST max-rows is 1000 by default)
+CONTACTS_SERVER_MAX_LIMIT = int(os.getenv('CONTACTS_SERVER_MAX_LIMIT', 1000))
+
+# Shared contacts datasets (get_cache_key('contacts:all', industry=...)), invalidated on writes
+register_cache_namespace('contacts:all')
+
+
+def _contact_row_to_dict(row: dict) -> dict:
+    """Convert a contacts row (with embedded companies) into the API contact dict"""
+    contact = Contact.from_dict(row).to_dict()
+    # Enrich with company name if available
+    companies_data = row.get('companies')
+    if companies_data:
+        if isinstance(companies_data, list) and len(companies_data) > 0:
+            company = companies_data[0]
+            if company and company.get('name'):
+                contact['company_name'] = company['name']
+            if company and company.get('industry'):
+                contact['company_industry'] = company['industry']
+        elif isinstance(companies_data, dict):
+            if companies_data.get('name'):
+                contact['company_name'] = companies_data['name']
+            if companies_data.get('industry'):
+                contact['company_industry'] = companies_data['industry']
+    return contact
+
 
 @contacts_bp.route('/api/contacts', methods=['GET'])
 @require_auth
 @require_use_case('contact_management')
 def list_contacts():
     """List all contacts with optional filters and industry-based access control
-    Uses Redis caching to store all contacts, then paginates in-memory for performance
+    Server mode (default) filters and keyset-paginates in Postgres: pass the returned
+    next_cursor as ?cursor= for the next page. Its first page reports the planner's row
+    estimate as total (total_estimated: true; null on later pages), so use has_more rather
+    than total to tell whether another page exists. Cache mode (?mode=cache, refresh_cache,
+    or limits above CONTACTS_SERVER_MAX_LIMIT) caches all contacts and paginates in memory
     """
     try:
-        from app.integrations.redis_client import REDIS_AVAILABLE, redis_client
-        from app.integrations.cache_client import cache as in_memory_cache
-        import json
+        from app.integrations.redis_client import (
+            get_cache_key, get_cached, set_cached, get_cached_list, set_cached_list,
+            get_cached_list_version, delete_cached_list, compute_single_flight
+        )
+        from app.services.contact_cache_sync import (
+            CONTACTS_FULL_RESYNC_INTERVAL, get_sync_state_key, new_sync_state, can_delta_refresh, delta_refresh
+        )
         
         supabase = get_supabase_client(current_app)
         if not supabase:
@@ -36,7 +79,6 @@ def list_contacts():
         # Get current user for industry-based filtering
         from app.auth import get_current_user
         user = get_current_user()
-        user_id = str(user.id) if user and hasattr(user, 'id') else 'anonymous'
         user_industry_id = None
         is_industry_admin = False
         is_super_user = False
@@ -58,53 +100,168 @@ def list_contacts():
         offset = int(request.args.get('offset', 0))
         refresh_cache = request.args.get('refresh_cache', 'false').lower() == 'true'
         
-        # Build cache key based on user and filters
-        cache_key = f"contacts:all:{user_id}"
-        if company_id:
-            cache_key += f":company:{company_id}"
-        if industry:
-            cache_key += f":industry:{industry}"
-        
-        # Try to get from cache (unless refresh requested)
-        cached_contacts = None
-        if not refresh_cache:
-            if REDIS_AVAILABLE:
-                try:
-                    cached = redis_client.get(cache_key)
-                    if cached:
-                        cached_contacts = json.loads(cached)
-                        logger.debug(f"✅ Cache HIT (Redis): {cache_key} - {len(cached_contacts)} contacts")
-                except Exception as e:
-                    logger.warning(f"Redis read error: {e}")
-            
-            # Fallback to in-memory cache
-            if cached_contacts is None:
-                cached_contacts = in_memory_cache.get(cache_key)
-                if cached_contacts:
-                    logger.debug(f"✅ Cache HIT (In-Memory): {cache_key} - {len(cached_contacts)} contacts")
-        
-        # If cache miss or refresh requested, fetch from database
-        if cached_contacts is None or refresh_cache:
-            logger.info(f"Cache MISS or refresh requested: {cache_key}, fetching all contacts from database...")
-            
+        def resolve_industry_filter():
+            """Industry filter for this request (industry admins are pinned to their industry)"""
             # Industry-based filtering - only apply if user is NOT a super user
             # Super users should see all contacts regardless of industry
             if is_industry_admin and user_industry_id and not is_super_user:
                 # Industry admin: Only see contacts from their assigned industry
+                # Reuse the industry loaded by require_auth when it is the same one
+                current_industry = get_current_industry()
+                if current_industry is not None and str(getattr(current_industry, 'id', '')) == user_industry_id \
+                        and getattr(current_industry, 'name', None):
+                    return current_industry.name
                 # Get industry name from industry_id
                 industry_lookup = supabase.table('industries').select('name').eq('id', user_industry_id).limit(1).execute()
                 if industry_lookup.data:
-                    industry = industry_lookup.data[0]['name']  # Override with user's industry
+                    return industry_lookup.data[0]['name']  # Override with user's industry
+            return industry
+        
+        def list_contacts_server(keyset, industry_filter):
+            """One page straight from Postgres: filters, (created_at, id) ordering, keyset pagination"""
+            # Search also matches the company's name and industry, as the cached list does
+            search_company_ids = []
+            if search:
+                search_company_ids, complete = matching_company_ids(supabase, search)
+                if not complete and keyset is None:
+                    raise SearchTooBroadError(f"more than {SERVER_SEARCH_MAX_COMPANIES} companies match '{search}'")
+            # Only the first page reports a total, and only the planner's estimate: an exact
+            # count scans every matching row, so latency would again grow with the table
+            query = supabase.table('contacts').select(
+                '*, companies!left(name, industry, domain)',
+                count='planned' if keyset is None else None
+            )
+            if company_id:
+                query = query.eq('company_id', company_id)
+            if industry_filter:
+                query = query.ilike('industry', industry_filter.strip())
+            if search:
+                query = query.or_(search_filter(search, search_company_ids))
+            query = apply_keyset(query, keyset)
+            
+            # One extra row tells whether another page exists
+            if keyset is None and offset:
+                response = query.range(offset, offset + limit).execute()
+            else:
+                response = query.limit(limit + 1).execute()
+            rows = response.data or []
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+            
+            page_contacts = []
+            for c in rows:
+                try:
+                    page_contacts.append(_contact_row_to_dict(c))
+                except Exception as contact_error:
+                    logger.warning(f"Error processing contact {c.get('id', 'unknown')}: {contact_error}")
+            
+            logger.info(f"Contacts API (server): Returning {len(page_contacts)} contacts (has_more: {has_more}, total: {response.count})")
+            return jsonify({
+                'success': True,
+                'contacts': page_contacts,
+                'count': len(page_contacts),
+                'total': response.count,
+                'total_estimated': True,
+                'has_more': has_more,
+                'next_cursor': encode_cursor(rows[-1]) if has_more and rows else None,
+                'cached': False,
+                'mode': 'server'
+            })
+        
+        industry_filter = resolve_industry_filter()
+        cursor = request.args.get('cursor')
+        list_mode = (request.args.get('mode') or CONTACTS_LIST_MODE).strip().lower()
+        if cursor or (list_mode == 'server' and not refresh_cache and limit <= CONTACTS_SERVER_MAX_LIMIT):
+            try:
+                keyset = decode_cursor(cursor) if cursor else None
+            except InvalidCursorError as e:
+                return jsonify({'error': str(e)}), 400
+            limit = min(limit, CONTACTS_SERVER_MAX_LIMIT)
+            try:
+                return list_contacts_server(keyset, industry_filter)
+            except SearchTooBroadError as broad_search:
+                logger.info(f"Contacts search served from cache: {broad_search}")
+            except Exception as server_error:
+                if cursor:
+                    raise
+                logger.warning(f"Server-side contacts listing failed, falling back to cache: {server_error}")
+        
+        # One shared dataset per industry partition (all contacts when unfiltered), not per user;
+        # the company filter and search are per-request views over it
+        industry_partition = (industry_filter or '').strip().lower() or None
+        cache_key = get_cache_key('contacts:all', industry=industry_partition)
+        
+        # Try to get from cache (unless refresh requested)
+        # Views need the full list; plain page reads only decode the chunks covering the page
+        needs_full_list = bool(search or company_id)
+        cached_contacts = None
+        page_contacts = None
+        cached_total = 0
+        if not refresh_cache:
+            if needs_full_list:
+                cached_contacts, cached_total, is_stale = get_cached_list(cache_key)
+            else:
+                page_contacts, cached_total, is_stale = get_cached_list(cache_key, offset, limit)
+            if is_stale:
+                # Past its TTL: only kept as the base for a delta refresh
+                cached_contacts = page_contacts = None
+            elif cached_contacts is not None or page_contacts is not None:
+                logger.debug(f"✅ Cache HIT: {cache_key} - {cached_total} contacts")
+        
+        def read_fresh_contacts():
+            items, _, stale = get_cached_list(cache_key)
+            return None if stale else items
+        
+        # Generation-independent, so the list orphaned by invalidate_cache can be delta-refreshed
+        sync_key = get_sync_state_key(industry_partition)
+        
+        def store_contacts(all_contacts, sync_state):
+            """Cache the list (kept past its TTL as the next delta base) and its sync state"""
+            try:
+                set_cached_list(cache_key, all_contacts, 3600, stale_ttl=CONTACTS_FULL_RESYNC_INTERVAL)
+                set_cached(sync_key, sync_state, CONTACTS_FULL_RESYNC_INTERVAL)
+                logger.info(f"💾 Cached {len(all_contacts)} contacts: {cache_key} (TTL: 3600s)")
+            except Exception as cache_error:
+                logger.warning(f"Error caching contacts: {cache_error}")
+        
+        def refresh_contacts_delta(sync_state):
+            """Advance the previously cached list with rows changed since its high-water mark"""
+            if not can_delta_refresh(sync_state, industry_partition):
+                return None
+            base_contacts, _, _ = get_cached_list(sync_state['data_key'])
+            if base_contacts is None:
+                return None
+            try:
+                result = delta_refresh(
+                    supabase, sync_state, base_contacts, cache_key,
+                    None, industry_partition, _contact_row_to_dict
+                )
+            except Exception as delta_error:
+                logger.warning(f"Contacts delta refresh failed, doing a full reload: {delta_error}")
+                return None
+            if result is None:
+                return None
+            all_contacts, new_state = result
+            store_contacts(all_contacts, new_state)
+            return all_contacts
+        
+        def load_all_contacts():
+            """Fetch the industry partition's contacts (delta when possible) and cache them"""
+            sync_state, _ = get_cached(sync_key)
+            previous_key = sync_state.get('data_key') if isinstance(sync_state, dict) else None
+            all_contacts = refresh_contacts_delta(sync_state)
+            if all_contacts is not None:
+                if previous_key and previous_key != cache_key:
+                    # Superseded generation, no longer needed as a delta base
+                    delete_cached_list(previous_key)
+                return all_contacts
             
             # Fetch ALL contacts (no limit) for caching
             query = supabase.table('contacts').select('*, companies!left(name, industry, domain)')
             
-            if company_id:
-                query = query.eq('company_id', company_id)
-            if industry:
+            if industry_partition:
                 # Use exact case-insensitive match (no wildcards) to match count calculation
-                # Trim the industry name to handle any whitespace issues
-                query = query.ilike('industry', industry.strip())
+                query = query.ilike('industry', industry_partition)
             
             # Order by created_at for consistency
             query = query.order('created_at', desc=True)
@@ -133,63 +290,50 @@ def list_contacts():
             all_contacts = []
             for c in all_contacts_raw:
                 try:
-                    contact = Contact.from_dict(c).to_dict()
-                    # Enrich with company name if available
-                    companies_data = c.get('companies')
-                    if companies_data:
-                        if isinstance(companies_data, list) and len(companies_data) > 0:
-                            company = companies_data[0]
-                            if company and company.get('name'):
-                                contact['company_name'] = company['name']
-                            if company and company.get('industry'):
-                                contact['company_industry'] = company['industry']
-                        elif isinstance(companies_data, dict):
-                            if companies_data.get('name'):
-                                contact['company_name'] = companies_data['name']
-                            if companies_data.get('industry'):
-                                contact['company_industry'] = companies_data['industry']
-                    all_contacts.append(contact)
+                    all_contacts.append(_contact_row_to_dict(c))
                 except Exception as contact_error:
                     logger.warning(f"Error processing contact {c.get('id', 'unknown')}: {contact_error}")
                     continue
             
             # Cache all contacts (TTL: 1 hour = 3600 seconds)
-            try:
-                if REDIS_AVAILABLE:
-                    redis_client.setex(cache_key, 3600, json.dumps(all_contacts))
-                    logger.info(f"💾 Cached {len(all_contacts)} contacts in Redis: {cache_key} (TTL: 3600s)")
-                else:
-                    in_memory_cache.set(cache_key, all_contacts, 3600)
-                    logger.info(f"💾 Cached {len(all_contacts)} contacts in-memory: {cache_key} (TTL: 3600s)")
-            except Exception as cache_error:
-                logger.warning(f"Error caching contacts: {cache_error}")
-            
-            cached_contacts = all_contacts
+            store_contacts(all_contacts, new_sync_state(cache_key, all_contacts_raw, industry_partition))
+            if previous_key and previous_key != cache_key:
+                delete_cached_list(previous_key)
+            return all_contacts
+        
+        # If cache miss or refresh requested, fetch from database (once per key across concurrent requests)
+        if refresh_cache:
+            logger.info(f"Cache refresh requested: {cache_key}, fetching all contacts from database...")
+            cached_contacts = load_all_contacts()
+        elif cached_contacts is None and page_contacts is None:
+            logger.info(f"Cache MISS: {cache_key}, fetching all contacts from database...")
+            cached_contacts, _ = compute_single_flight(
+                cache_key, load_all_contacts, lease_seconds=120,
+                read=read_fresh_contacts
+            )
+        if cached_contacts is not None:
+            cached_total = len(cached_contacts)
         
-        # Apply search filter if provided (client-side filtering on cached data)
+        # Apply search filter if provided (precomputed search index over the cached data)
         filtered_contacts = cached_contacts
         if search:
-            search_lower = search.lower()
-            filtered_contacts = [
-                c for c in cached_contacts
-                if (c.get('name', '').lower().find(search_lower) >= 0 or
-                    c.get('email', '').lower().find(search_lower) >= 0 or
-                    c.get('phone', '').lower().find(search_lower) >= 0 or
-                    c.get('lead_source', '').lower().find(search_lower) >= 0 or
-                    c.get('role', '').lower().find(search_lower) >= 0 or
-                    c.get('company', '').lower().find(search_lower) >= 0 or
-                    c.get('company_name', '').lower().find(search_lower) >= 0 or
-                    c.get('industry', '').lower().find(search_lower) >= 0 or
-                    c.get('company_industry', '').lower().find(search_lower) >= 0)
-            ]
+            from app.services.contact_search import get_search_index
+            search_index = get_search_index(cache_key, get_cached_list_version(cache_key), cached_contacts)
+            filtered_contacts = search_index.search(search)
+        if company_id and filtered_contacts is not None:
+            filtered_contacts = [c for c in filtered_contacts if c.get('company_id') == company_id]
         
         # Paginate from filtered results
-        total_count = len(filtered_contacts)
-        paginated_contacts = filtered_contacts[offset:offset + limit]
+        if filtered_contacts is not None:
+            total_count = len(filtered_contacts)
+            paginated_contacts = filtered_contacts[offset:offset + limit]
+        else:
+            total_count = cached_total
+            paginated_contacts = page_contacts
         
         # Log summary for debugging
         contacts_with_email = len([c for c in paginated_contacts if c.get('email')])
-        logger.info(f"Contacts API: Returning {len(paginated_contacts)} contacts (page {offset//limit + 1}, total: {total_count}, filtered from {len(cached_contacts)} cached), {contacts_with_email} with emails")
+        logger.info(f"Contacts API: Returning {len(paginated_contacts)} contacts (page {offset//limit + 1}, total: {total_count}, filtered from {cached_total} cached), {contacts_with_email} with emails")
         
         return jsonify({
             'success': True,
@@ -753,8 +897,8 @@ def import_excel_contacts():
                 }), 500
             
             # Start background job
-            from app.jobs.import_job import process_import_job
-            process_import_job(job_id, file_content, file.filename, column_map, options, current_app.app_context())
+            from app.jobs.import_job import enqueue_import_job
+            enqueue_import_job(job_id, file_content, file.filename, column_map, options)
             
             logger.info(f"Started background import job {job_id} for file {file.filename}")
             
@@ -970,7 +1114,7 @@ def import_excel_contacts():
                     # Create background job
                     import uuid
                     from datetime import datetime
-                    from app.jobs.import_job import process_import_job
+                    from app.jobs.import_job import enqueue_import_job
                     
                     job_id = str(uuid.uuid4())
                     
@@ -1016,7 +1160,7 @@ def import_excel_contacts():
                     insert_response = supabase.table('import_jobs').insert(job_data).execute()
                     if insert_response.data:
                         # Start background job
-                        process_import_job(job_id, file_content, file.filename, column_map, options, current_app.app_context())
+                        enqueue_import_job(job_id, file_content, file.filename, column_map, options)
                         logger.info(f"Started background import job {job_id} for large file {file.filename}")
                         return jsonify({
                             'success': True,
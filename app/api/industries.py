@@ -1,7 +1,7 @@
 """Industries API routes"""
 from flask import Blueprint, request, jsonify, current_app, g
 import logging
-from app.auth import get_supabase_auth_client, require_super_user, require_auth, get_current_user, get_current_industry
+from app.auth import get_supabase_auth_client, require_super_user, require_auth, get_current_user, get_current_industry, invalidate_user_context
 from app.supabase_client import get_supabase_client
 
 logger = logging.getLogger(__name__)
@@ -295,6 +295,8 @@ def update_industry(industry_id):
         
         # Update the industry
         response = supabase.table('industries').update(update_data).eq('id', industry_id).execute()
+        # Cached user contexts embed the industry row
+        invalidate_user_context()
         
         if response.data:
             return jsonify({'success': True, 'industry': response.data[0]})
@@ -374,6 +376,7 @@ def delete_industry(industry_id):
         
         # Delete the industry
         delete_response = supabase.table('industries').delete().eq('id', industry_id).execute()
+        invalidate_user_context()
         
         return jsonify({
             'success': True,
@@ -485,6 +488,7 @@ def switch_industry():
         
         if not update_response.data:
             return jsonify({'error': 'Failed to update active industry'}), 500
+        invalidate_user_context(str(user_id))
         
         # Update Flask g context for current request
         if industry_id and industry_data:
@@ -1,15 +1,23 @@
 """Job status API routes for background import jobs"""
-from flask import Blueprint, request, jsonify, current_app, session
+from flask import Blueprint, Response, request, jsonify, current_app, session, stream_with_context
+import os
+import json
+import time
 import logging
 from app.supabase_client import get_supabase_client
 from app.auth import require_auth, require_use_case
 from app.models.import_job import ImportJob
-from app.jobs.import_job import cancel_job
+from app.jobs.import_job import cancel_job, resume_import_job
+from app.jobs.progress import FINAL_STATUSES, get_job_snapshot, subscribe_job_progress
 
 logger = logging.getLogger(__name__)
 
 jobs_bp = Blueprint('jobs', __name__)
 
+# An event stream is closed after this long; EventSource reconnects on its own
+JOB_EVENTS_MAX_SECONDS = int(os.getenv('JOB_EVENTS_MAX_SECONDS', 300))
+_EVENTS_KEEPALIVE_SECONDS = 15
+
 
 @jobs_bp.route('/api/jobs/<job_id>', methods=['GET'])
 @require_auth
@@ -201,3 +209,127 @@ def cancel_job_endpoint(job_id):
         logger.error(f"Error cancelling job {job_id}: {e}")
         return jsonify({'error': str(e)}), 500
 
+
+
+def _load_owned_job(supabase, job_id):
+    """
+    Load a job row owned by the current user (by app_users.id, then supabase_user_id)
+    Returns:
+        Tuple of (job row or None, error response or None)
+    """
+    from app.auth import get_current_user
+    current_user = get_current_user()
+    if not current_user:
+        return None, (jsonify({'error': 'User not authenticated'}), 401)
+    
+    user_id = getattr(current_user, 'id', None)
+    supabase_user_id = session.get('user_id')
+    
+    response = None
+    if user_id:
+        response = supabase.table('import_jobs').select('*').eq('id', job_id).eq('user_id', str(user_id)).limit(1).execute()
+    if (not response or not response.data) and supabase_user_id:
+        response = supabase.table('import_jobs').select('*').eq('id', job_id).eq('supabase_user_id', supabase_user_id).limit(1).execute()
+    if not response or not response.data:
+        return None, (jsonify({'error': 'Job not found'}), 404)
+    return response.data[0], None
+
+
+@jobs_bp.route('/api/jobs/<job_id>/resume', methods=['POST'])
+@require_auth
+@require_use_case('target_management')
+def resume_job_endpoint(job_id):
+    """Resume an interrupted or failed import job from its last checkpoint"""
+    try:
+        supabase = get_supabase_client(current_app)
+        if not supabase:
+            return jsonify({'error': 'Supabase not configured'}), 503
+        
+        job_row, error = _load_owned_job(supabase, job_id)
+        if error:
+            return error
+        
+        job = ImportJob.from_dict(job_row)
+        if job.status not in ['pending', 'processing', 'failed']:
+            return jsonify({'error': f'Cannot resume job with status: {job.status}'}), 400
+        
+        resumed, message = resume_import_job(job_id)
+        if not resumed:
+            return jsonify({'success': False, 'message': message}), 409
+        
+        return jsonify({
+            'success': True,
+            'message': message,
+            'checkpoint': job.checkpoint
+        })
+        
+    except Exception as e:
+        logger.error(f"Error resuming job {job_id}: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+def _sse(event: str, data) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@jobs_bp.route('/api/jobs/<job_id>/events', methods=['GET'])
+@require_auth
+@require_use_case('target_management')
+def job_events(job_id):
+    """
+    Stream job progress as Server-Sent Events
+    Sends a 'progress' event with the job (same shape as GET /api/jobs/<id>) on
+    connect and after every update, until the job completes, fails or is cancelled.
+    """
+    try:
+        supabase = get_supabase_client(current_app)
+        if not supabase:
+            return jsonify({'error': 'Supabase not configured'}), 503
+        
+        # Subscribe before reading the job so no update is missed in between
+        subscription = subscribe_job_progress(job_id)
+        try:
+            job_row, error = _load_owned_job(supabase, job_id)
+        except Exception:
+            subscription.close()
+            raise
+        if error:
+            subscription.close()
+            return error
+        # The row can lag the latest update by up to a second (coalesced writes)
+        if job_row.get('status') not in FINAL_STATUSES:
+            job_row.update(get_job_snapshot(job_id))
+        
+    except Exception as e:
+        logger.error(f"Error opening job event stream {job_id}: {e}")
+        return jsonify({'error': str(e)}), 500
+    
+    def stream():
+        try:
+            yield 'retry: 2000\n\n'
+            yield _sse('progress', ImportJob.from_dict(job_row).to_dict())
+            if job_row.get('status') in FINAL_STATUSES:
+                return
+            
+            deadline = time.monotonic() + JOB_EVENTS_MAX_SECONDS
+            last_sent = time.monotonic()
+            while time.monotonic() < deadline:
+                update = subscription.get(timeout=1.0)
+                if update is None:
+                    if time.monotonic() - last_sent >= _EVENTS_KEEPALIVE_SECONDS:
+                        yield ': keepalive\n\n'
+                        last_sent = time.monotonic()
+                    continue
+                job_row.update(update)
+                yield _sse('progress', ImportJob.from_dict(job_row).to_dict())
+                last_sent = time.monotonic()
+                if job_row.get('status') in FINAL_STATUSES:
+                    return
+        finally:
+            subscription.close()
+    
+    return Response(stream_with_context(stream()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'  # Don't let a proxy buffer the stream
+    })
@@ -2,6 +2,7 @@
 from flask import Blueprint, request, jsonify
 import logging
 from app.auth import get_supabase_auth_client, require_super_user, require_auth, get_current_user
+from app.services.permission_matrix import bump_permissions_version
 
 logger = logging.getLogger(__name__)
 
@@ -75,6 +76,7 @@ def grant_permission(user_id):
             'industry_id': str(industry_id) if industry_id else None,
             'granted_by': str(current_user.id) if current_user and hasattr(current_user, 'id') else None
         }).execute()
+        bump_permissions_version()
         return jsonify({'success': True, 'message': 'Permission granted successfully'})
     except Exception as e:
         logger.error(f"Error granting permission to user {user_id}: {e}")
@@ -99,6 +101,7 @@ def revoke_permission(user_id):
         else:
             query = query.is_('industry_id', 'null')
         query.execute()
+        bump_permissions_version()
         return jsonify({'success': True, 'message': 'Permission revoked successfully'})
     except Exception as e:
         logger.error(f"Error revoking permission from user {user_id}: {e}")
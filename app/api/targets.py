@@ -9,6 +9,7 @@ from app.supabase_client import get_supabase_client
 from app.auth import require_auth, require_use_case, get_current_user, get_current_industry
 from app.services.target_identification import get_target_identification_service
 from app.services.industry_context import get_industry_context
+from app.services.industry_matcher import IndustryMatcher
 from app.integrations.rag_client import get_rag_client
 from app.integrations.gemini_client import get_gemini_client
 from app.integrations.redis_client import cache_response, invalidate_cache
@@ -23,7 +24,7 @@ targets_bp = Blueprint('targets', __name__)
 @targets_bp.route('/api/targets', methods=['GET'])
 @require_auth
 @require_use_case('target_management')
-@cache_response(ttl=300, key_prefix='targets')  # Cache for 5 minutes
+@cache_response(ttl=300, key_prefix='targets', stale_ttl=60)  # Cache for 5 minutes, serve stale for 1 more while refreshing
 def list_targets():
     """List all targets with optional filters and industry-based access control"""
     try:
@@ -1307,106 +1308,14 @@ def ai_identify_targets():
         logger.debug(f"Fetched {len(all_fetched_contacts)} contacts from database before industry filtering (processing {len(all_fetched_contacts)} of {len(contacts_response.data) if contacts_response.data else 0} fetched)")
         logger.debug(f"Filtering for industries: {industries}")
         
+        # Requested industries are normalized once; each distinct industry string is matched once
+        industry_matcher = IndustryMatcher(industries)
+        unmatched_count = 0
         for c in all_fetched_contacts:
-            # Get industry from contact or company (prioritize contact industry)
-            contact_industry = (c.get('industry') or '').strip()
-            company_industry = None
-            if c.get('companies') and c['companies'].get('industry'):
-                company_industry = (c['companies'].get('industry') or '').strip()
-            
-            # Use company industry if contact industry is missing
-            if not contact_industry and company_industry:
-                contact_industry = company_industry
-                logger.debug(f"Contact {c.get('name', 'Unknown')}: Using company industry '{contact_industry}'")
-            
-            contact_industry_lower = contact_industry.lower() if contact_industry else ''
-            company_industry_lower = company_industry.lower() if company_industry else ''
-            
-            # Check if contact matches any of the selected industries (case-insensitive, flexible matching)
-            matches = False
-            matched_industry = None
-            for ind in industries:
-                ind_clean = ind.strip().lower()
-                
-                # Normalize industry names for better matching
-                # Remove common variations: "&" -> "and", remove commas, remove extra spaces, etc.
-                ind_normalized = ind_clean.replace('&', 'and').replace(',', ' ').replace('  ', ' ').strip()
-                contact_normalized = contact_industry_lower.replace('&', 'and').replace(',', ' ').replace('  ', ' ').strip()
-                company_normalized = company_industry_lower.replace('&', 'and').replace(',', ' ').replace('  ', ' ').strip() if company_industry_lower else ''
-                
-                # Extract key words from requested industry (words > 3 characters)
-                ind_words = [w for w in ind_normalized.split() if len(w) > 3]
-                contact_words = contact_industry_lower.split()
-                company_words = company_industry_lower.split() if company_industry_lower else []
-                
-                # PRIORITY 1: Exact case-insensitive match (most reliable - handles "travel" == "Travel")
-                # Check this FIRST and break immediately if matched
-                if contact_industry_lower == ind_clean:
-                    matches = True
-                    matched_industry = ind
-                    logger.debug(f"Contact {c.get('name', 'Unknown')} matches industry '{ind}' (EXACT: '{contact_industry}' == '{ind}')")
-                    break
-                
-                if company_industry_lower and company_industry_lower == ind_clean:
-                    matches = True
-                    matched_industry = ind
-                    logger.debug(f"Contact {c.get('name', 'Unknown')} matches industry '{ind}' (EXACT from company: '{company_industry}' == '{ind}')")
-                    break
-                
-                # PRIORITY 2: Normalized exact match (handles variations like "travel" == "Travel" after normalization)
-                if contact_normalized == ind_normalized:
-                    matches = True
-                    matched_industry = ind
-                    logger.debug(f"Contact {c.get('name', 'Unknown')} matches industry '{ind}' (NORMALIZED exact: '{contact_industry}')")
-                    break
-                
-                if company_normalized and company_normalized == ind_normalized:
-                    matches = True
-                    matched_industry = ind
-                    logger.debug(f"Contact {c.get('name', 'Unknown')} matches industry '{ind}' (NORMALIZED exact from company: '{company_industry}')")
-                    break
-                
-                # PRIORITY 3: Substring and word-based matching (flexible matching)
-                match_checks = [
-                    # Substring matches
-                    ind_clean in contact_industry_lower,  # "travel" in "travel & tourism"
-                    contact_industry_lower in ind_clean,  # "travel" in "travel and hospitality"
-                    ind_normalized in contact_normalized,  # Normalized substring
-                    contact_normalized in ind_normalized,  # Reverse normalized substring
-                ]
-                
-                # Word-based matching: check if key words from requested industry appear in contact industry
-                if ind_words:
-                    match_checks.extend([
-                        any(word in contact_industry_lower for word in ind_words),  # Any key word in contact industry
-                        any(word in ind_clean for word in contact_words if len(word) > 3),  # Any contact word in industry
-                    ])
-                
-                # Also check company industry if available
-                if company_industry_lower:
-                    match_checks.extend([
-                        # Substring matches from company
-                        ind_clean in company_industry_lower,
-                        company_industry_lower in ind_clean,
-                        ind_normalized in company_normalized,
-                        company_normalized in ind_normalized,
-                    ])
-                    # Word-based matching for company industry
-                    if ind_words:
-                        match_checks.extend([
-                            any(word in company_industry_lower for word in ind_words),
-                            any(word in ind_clean for word in company_words if len(word) > 3),
-                        ])
-                
-                if any(match_checks):
-                    matches = True
-                    matched_industry = ind
-                    logger.debug(f"Contact {c.get('name', 'Unknown')} matches industry '{ind}' (FLEXIBLE: contact: '{contact_industry}', company: '{company_industry}')")
-                    break
-            
-            if not matches:
-                if contact_industry or company_industry:
-                    logger.debug(f"Contact {c.get('name', 'Unknown')} does not match (contact: '{contact_industry}', company: '{company_industry}', selected: {industries})")
+            # Contact industry first, company industry as fallback and as a second chance
+            company_industry = c['companies'].get('industry') if c.get('companies') else None
+            if not industry_matcher.match(c.get('industry'), company_industry):
+                unmatched_count += 1
                 continue
             
             contact_dict = {
@@ -1425,6 +1334,9 @@ def ai_identify_targets():
                     contact_dict['industry'] = c['companies'].get('industry', '')
             contacts.append(contact_dict)
         
+        logger.debug(f"Industry filter: {len(contacts)} matched, {unmatched_count} did not "
+                     f"({industry_matcher.distinct_values} distinct industry values, selected: {industries})")
+        
         # Track which contact IDs were analyzed (for updating analysis tracking)
         analyzed_contact_ids = [c.get('id') for c in contacts if c.get('id')]
         
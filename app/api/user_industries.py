@@ -2,7 +2,7 @@
 from flask import Blueprint, request, jsonify, current_app
 import logging
 from app.supabase_client import get_supabase_client
-from app.auth import require_auth, require_super_user, get_current_user
+from app.auth import require_auth, require_super_user, get_current_user, invalidate_user_context
 
 logger = logging.getLogger(__name__)
 
@@ -119,6 +119,7 @@ def assign_user_industry(user_id):
             insert_data,
             on_conflict='user_id,industry_id'
         ).execute()
+        invalidate_user_context(str(user_id))
         
         # Get user email for logging
         user_info = supabase.table('app_users').select('email').eq('id', user_id).limit(1).execute()
@@ -167,6 +168,7 @@ def remove_user_industry(user_id, industry_id):
         
         # Delete the assignment
         supabase.table('user_industries').delete().eq('user_id', user_id).eq('industry_id', industry_id).execute()
+        invalidate_user_context(str(user_id))
         
         logger.info(f"Removed industry {industry_id} from user {user_id}")
         return jsonify({'success': True, 'message': 'Industry assignment removed'})
@@ -204,6 +206,7 @@ def set_default_industry(user_id):
         
         # Also update app_users.default_industry_id directly
         result2 = supabase.table('app_users').update({'default_industry_id': industry_id}).eq('id', user_id).execute()
+        invalidate_user_context(str(user_id))
         
         # Verify both updates succeeded
         if not result1.data:
@@ -34,6 +34,10 @@ try:
 except (ImportError, ModuleNotFoundError):
     Industry = None
 
+from app.auth.token_verifier import (
+    verify_access_token, user_context_cache, invalidate_user_context
+)
+
 def init_auth(app):
     """Initialize authentication system"""
     if not create_client:
@@ -69,6 +73,68 @@ def get_current_industry():
         return None
     return g.industry
 
+def _get_token_user_id(supabase, access_token: str) -> Optional[str]:
+    """
+    Validate an access token and return its Supabase user ID
+    Verifies locally (no network call) when SUPABASE_AUTH_VERIFY_MODE=local,
+    otherwise or on local failure calls supabase.auth.get_user(), which raises
+    on invalid/expired tokens so the caller can attempt a refresh
+    """
+    claims = verify_access_token(access_token)
+    if claims and claims.get('sub'):
+        return claims['sub']
+    user_response = supabase.auth.get_user(access_token)
+    if user_response and hasattr(user_response, 'user') and user_response.user:
+        return user_response.user.id
+    return None
+
+def _resolve_user_context(supabase, supabase_user_id: str):
+    """
+    Load app_users row and active industry for a Supabase user (cached for AUTH_USER_CACHE_TTL seconds)
+    Returns:
+        Tuple of (user_data, industry_data) or None if the app user does not exist
+    """
+    cached = user_context_cache.get(supabase_user_id)
+    if cached is not None:
+        return cached
+    
+    app_user_data = supabase.table('app_users').select('*').eq('supabase_user_id', supabase_user_id).limit(1).execute()
+    if not app_user_data.data:
+        return None
+    
+    user_data = app_user_data.data[0]
+    # Ensure boolean fields are properly converted
+    if 'is_super_user' in user_data:
+        user_data['is_super_user'] = bool(user_data['is_super_user'])
+    if 'is_industry_admin' in user_data:
+        user_data['is_industry_admin'] = bool(user_data['is_industry_admin'])
+    
+    # Load active industry (prioritize default_industry_id, then active_industry_id)
+    industry_data = None
+    industry_id_to_load = user_data.get('default_industry_id') or user_data.get('active_industry_id')
+    if industry_id_to_load:
+        industry_response = supabase.table('industries').select('*').eq('id', industry_id_to_load).limit(1).execute()
+        if industry_response.data:
+            industry_data = industry_response.data[0]
+    
+    user_context_cache.set(supabase_user_id, user_data, industry_data)
+    return user_data, industry_data
+
+def _set_request_context(user_data, industry_data):
+    """Populate g.user and g.industry for the current request"""
+    if AppUser:
+        g.user = AppUser.from_dict(user_data)
+    else:
+        g.user = type('AppUser', (), user_data)()
+    
+    if industry_data:
+        if Industry:
+            g.industry = Industry.from_dict(industry_data)
+        else:
+            g.industry = type('Industry', (), industry_data)()
+    else:
+        g.industry = None
+
 def require_auth(f):
     """Decorator to require authentication"""
     @wraps(f)
@@ -107,48 +173,19 @@ def require_auth(f):
                         return jsonify({'error': 'Unauthorized: No session token'}), 401
                     return {'error': 'Unauthorized'}, 401
                 
-                # Validate token with Supabase
+                # Validate token locally when configured, otherwise with Supabase Auth
                 logger.debug(f"require_auth: Validating token for {request.path if request else 'unknown'}")
                 try:
-                    user_response = supabase.auth.get_user(access_token)
+                    supabase_user_id = _get_token_user_id(supabase, access_token)
                     
-                    # Process successful user response
-                    if user_response and hasattr(user_response, 'user') and user_response.user:
-                        app_user_data = supabase.table('app_users').select('*').eq('supabase_user_id', user_response.user.id).limit(1).execute()
-                        if app_user_data.data:
-                            user_data = app_user_data.data[0]
-                            # Ensure boolean fields are properly converted
-                            if 'is_super_user' in user_data:
-                                user_data['is_super_user'] = bool(user_data['is_super_user'])
-                            if 'is_industry_admin' in user_data:
-                                user_data['is_industry_admin'] = bool(user_data['is_industry_admin'])
-                            
-                            if AppUser:
-                                g.user = AppUser.from_dict(user_data)
-                            else:
-                                g.user = type('AppUser', (), user_data)()
-                            
-                            # Load active industry (prioritize default_industry_id, then active_industry_id)
-                            industry_id_to_load = None
-                            if hasattr(g.user, 'default_industry_id') and g.user.default_industry_id:
-                                industry_id_to_load = g.user.default_industry_id
-                            elif hasattr(g.user, 'active_industry_id') and g.user.active_industry_id:
-                                industry_id_to_load = g.user.active_industry_id
-                            
-                            if industry_id_to_load:
-                                industry_data = supabase.table('industries').select('*').eq('id', industry_id_to_load).limit(1).execute()
-                                if industry_data.data:
-                                    if Industry:
-                                        g.industry = Industry.from_dict(industry_data.data[0])
-                                    else:
-                                        g.industry = type('Industry', (), industry_data.data[0])()
-                                else:
-                                    g.industry = None
-                            else:
-                                g.industry = None
+                    # Process successful validation
+                    if supabase_user_id:
+                        user_context = _resolve_user_context(supabase, supabase_user_id)
+                        if user_context:
+                            _set_request_context(*user_context)
                             return f(*args, **kwargs)
                         else:
-                            logger.warning(f"App user not found for Supabase user ID: {user_response.user.id}")
+                            logger.warning(f"App user not found for Supabase user ID: {supabase_user_id}")
                             session.pop('access_token', None)
                             if request and (request.is_json or request.path.startswith('/api/')):
                                 return jsonify({'error': 'User not found in app_users table'}), 404
@@ -180,39 +217,11 @@ def require_auth(f):
                                     session.modified = True
                                 logger.info(f"require_auth: Token refreshed successfully, retrying authentication")
                                 # Retry getting user with new token
-                                user_response = supabase.auth.get_user(refresh_response.session.access_token)
-                                if user_response and hasattr(user_response, 'user') and user_response.user:
-                                    app_user_data = supabase.table('app_users').select('*').eq('supabase_user_id', user_response.user.id).limit(1).execute()
-                                    if app_user_data.data:
-                                        user_data = app_user_data.data[0]
-                                        if 'is_super_user' in user_data:
-                                            user_data['is_super_user'] = bool(user_data['is_super_user'])
-                                        if 'is_industry_admin' in user_data:
-                                            user_data['is_industry_admin'] = bool(user_data['is_industry_admin'])
-                                        
-                                        if AppUser:
-                                            g.user = AppUser.from_dict(user_data)
-                                        else:
-                                            g.user = type('AppUser', (), user_data)()
-                                        
-                                        # Load active industry (prioritize default_industry_id, then active_industry_id)
-                                        industry_id_to_load = None
-                                        if hasattr(g.user, 'default_industry_id') and g.user.default_industry_id:
-                                            industry_id_to_load = g.user.default_industry_id
-                                        elif hasattr(g.user, 'active_industry_id') and g.user.active_industry_id:
-                                            industry_id_to_load = g.user.active_industry_id
-                                        
-                                        if industry_id_to_load:
-                                            industry_data = supabase.table('industries').select('*').eq('id', industry_id_to_load).limit(1).execute()
-                                            if industry_data.data:
-                                                if Industry:
-                                                    g.industry = Industry.from_dict(industry_data.data[0])
-                                                else:
-                                                    g.industry = type('Industry', (), industry_data.data[0])()
-                                            else:
-                                                g.industry = None
-                                        else:
-                                            g.industry = None
+                                supabase_user_id = _get_token_user_id(supabase, refresh_response.session.access_token)
+                                if supabase_user_id:
+                                    user_context = _resolve_user_context(supabase, supabase_user_id)
+                                    if user_context:
+                                        _set_request_context(*user_context)
                                         return f(*args, **kwargs)
                         except Exception as refresh_error:
                             logger.warning(f"require_auth: Token refresh failed: {refresh_error}")
@@ -284,28 +293,20 @@ def require_use_case(use_case_code: str):
                 logger.warning(f"require_use_case({use_case_code}): User has no ID")
                 return jsonify({'error': 'Invalid user data'}), 500
             
-            use_case_response = supabase.table('use_cases').select('id').eq('code', use_case_code).limit(1).execute()
-            if not use_case_response.data:
+            # Check global permission, then industry-specific permission if an industry is active
+            industry_id = None
+            if hasattr(g, 'industry') and g.industry:
+                industry_id = getattr(g.industry, 'id', None)
+            try:
+                from app.services.permission_matrix import get_permission_matrix
+                granted = get_permission_matrix().check(supabase, user_id, use_case_code, industry_id)
+            except KeyError:
                 logger.error(f"Use case '{use_case_code}' not found")
                 return jsonify({'error': f'Use case {use_case_code} not found'}), 500
-            
-            use_case_id = use_case_response.data[0]['id']
-            
-            # Check global permission (industry_id is NULL)
-            global_permission = supabase.table('user_permissions').select('id').eq('user_id', user_id).eq('use_case_id', use_case_id).is_('industry_id', 'null').limit(1).execute()
-            if global_permission.data:
-                logger.debug(f"require_use_case({use_case_code}): Global permission granted")
+            if granted:
+                logger.debug(f"require_use_case({use_case_code}): {granted.capitalize()} permission granted")
                 return f(*args, **kwargs)
             
-            # Check industry-specific permission if an industry is active
-            if hasattr(g, 'industry') and g.industry:
-                industry_id = getattr(g.industry, 'id', None)
-                if industry_id:
-                    industry_permission = supabase.table('user_permissions').select('id').eq('user_id', user_id).eq('use_case_id', use_case_id).eq('industry_id', industry_id).limit(1).execute()
-                    if industry_permission.data:
-                        logger.debug(f"require_use_case({use_case_code}): Industry permission granted")
-                        return f(*args, **kwargs)
-            
             logger.warning(f"require_use_case({use_case_code}): Permission denied for user {getattr(user, 'email', 'unknown')}")
             return jsonify({'error': f'Forbidden: Missing permission for {use_case_code}'}), 403
         return decorated_function
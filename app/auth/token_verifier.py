@@ -0,0 +1,187 @@
+"""
+Local Supabase JWT verification and short-lived user context cache
+Avoids a network round trip to Supabase Auth plus the app_users/industries
+lookups on every authenticated request
+"""
+import os
+import time
+import logging
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    import jwt
+    from jwt import PyJWKClient
+except ImportError:
+    jwt = None
+    PyJWKClient = None
+
+# 'remote' keeps the original supabase.auth.get_user() validation,
+# 'local' verifies the token signature in-process (HS256 secret or JWKS)
+AUTH_VERIFY_MODE = os.getenv('SUPABASE_AUTH_VERIFY_MODE', 'remote').strip().lower()
+JWT_SECRET = os.getenv('SUPABASE_JWT_SECRET', '').strip() or None
+JWT_AUDIENCE = os.getenv('SUPABASE_JWT_AUDIENCE', 'authenticated').strip() or None
+JWKS_CACHE_TTL = int(os.getenv('SUPABASE_JWKS_CACHE_TTL', 600))
+USER_CONTEXT_TTL = int(os.getenv('AUTH_USER_CACHE_TTL', 60))
+
+# Accepted signing algorithms, pinned per key source (never taken from the token alone)
+SECRET_ALGORITHMS = ('HS256',)
+JWKS_ALGORITHMS = ('ES256', 'RS256')
+
+_jwks_client = None
+_jwks_lock = threading.Lock()
+
+
+def is_local_verification_enabled() -> bool:
+    """Check whether local JWT verification is configured and usable"""
+    if AUTH_VERIFY_MODE != 'local':
+        return False
+    if jwt is None:
+        logger.warning("SUPABASE_AUTH_VERIFY_MODE=local but PyJWT is not installed. Install with: pip install PyJWT[crypto]")
+        return False
+    return True
+
+
+def _get_jwks_client():
+    """Get (lazily created) JWKS client for the Supabase project's signing keys"""
+    global _jwks_client
+    if _jwks_client is not None or PyJWKClient is None:
+        return _jwks_client
+    supabase_url = os.getenv('SUPABASE_URL', '').rstrip('/')
+    if not supabase_url:
+        return None
+    with _jwks_lock:
+        if _jwks_client is None:
+            jwks_url = os.getenv('SUPABASE_JWKS_URL') or f"{supabase_url}/auth/v1/.well-known/jwks.json"
+            api_key = os.getenv('SUPABASE_KEY') or os.getenv('SUPABASE_ANON_KEY')
+            headers = {'apikey': api_key} if api_key else None
+            _jwks_client = PyJWKClient(jwks_url, cache_jwk_set=True, lifespan=JWKS_CACHE_TTL, headers=headers, timeout=5)
+            logger.info(f"JWKS client initialized: {jwks_url}")
+    return _jwks_client
+
+
+def verify_access_token(access_token: str) -> Optional[Dict[str, Any]]:
+    """
+    Verify a Supabase access token locally
+    Args:
+        access_token: Supabase JWT from the session
+    Returns:
+        Decoded claims if the token is valid, None otherwise (caller should
+        fall back to remote validation, which also handles token refresh)
+    """
+    if not access_token or not is_local_verification_enabled():
+        return None
+    try:
+        header = jwt.get_unverified_header(access_token)
+        algorithm = header.get('alg', '')
+        options = {'require': ['exp', 'sub'], 'verify_aud': JWT_AUDIENCE is not None}
+        # The header only selects the key source; decode() accepts that source's allowlist
+        if algorithm in SECRET_ALGORITHMS:
+            if not JWT_SECRET:
+                logger.debug(f"verify_access_token: {algorithm} token but SUPABASE_JWT_SECRET not set")
+                return None
+            key, algorithms = JWT_SECRET, list(SECRET_ALGORITHMS)
+        elif algorithm in JWKS_ALGORITHMS:
+            jwks_client = _get_jwks_client()
+            if not jwks_client:
+                return None
+            key, algorithms = jwks_client.get_signing_key_from_jwt(access_token).key, list(JWKS_ALGORITHMS)
+        else:
+            logger.debug(f"verify_access_token: Rejected token signed with algorithm '{algorithm}'")
+            return None
+        return jwt.decode(access_token, key, algorithms=algorithms, audience=JWT_AUDIENCE, options=options)
+    except jwt.ExpiredSignatureError:
+        logger.debug("verify_access_token: Token expired")
+        return None
+    except Exception as e:
+        logger.debug(f"verify_access_token: Local verification failed: {e}")
+        return None
+
+
+class UserContextCache:
+    """Thread-safe TTL cache of resolved (app_user, industry) rows keyed by Supabase user ID (token sub)"""
+
+    def __init__(self, ttl: int = 60):
+        """
+        Initialize user context cache
+        Args:
+            ttl: Time-to-live in seconds (default: 1 minute)
+        """
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._ttl = ttl
+        self._lock = threading.Lock()
+
+    def get(self, supabase_user_id: str) -> Optional[Tuple[Dict[str, Any], Optional[Dict[str, Any]]]]:
+        """
+        Get cached context
+        Args:
+            supabase_user_id: Supabase auth user ID (JWT sub claim)
+        Returns:
+            Tuple of (user_data, industry_data) copies, or None if not found/expired
+        """
+        with self._lock:
+            entry = self._entries.get(supabase_user_id)
+            if not entry:
+                return None
+            if time.time() > entry['expires_at']:
+                del self._entries[supabase_user_id]
+                return None
+            industry_data = entry['industry']
+            return dict(entry['user']), (dict(industry_data) if industry_data else None)
+
+    def set(self, supabase_user_id: str, user_data: Dict[str, Any], industry_data: Optional[Dict[str, Any]]):
+        """
+        Cache the resolved context for a user
+        Args:
+            supabase_user_id: Supabase auth user ID (JWT sub claim)
+            user_data: app_users row
+            industry_data: industries row for the user's active industry (or None)
+        """
+        if self._ttl <= 0:
+            return
+        with self._lock:
+            self._entries[supabase_user_id] = {
+                'user': dict(user_data),
+                'industry': dict(industry_data) if industry_data else None,
+                'expires_at': time.time() + self._ttl
+            }
+
+    def invalidate(self, user_id: Optional[str] = None):
+        """
+        Drop cached context
+        Args:
+            user_id: app_users.id (or Supabase user ID) to drop; clears everything if not provided
+        """
+        with self._lock:
+            if user_id is None:
+                count = len(self._entries)
+                self._entries.clear()
+            else:
+                user_id = str(user_id)
+                keys = [
+                    sub for sub, entry in self._entries.items()
+                    if sub == user_id or str(entry['user'].get('id')) == user_id
+                ]
+                for sub in keys:
+                    del self._entries[sub]
+                count = len(keys)
+        logger.debug(f"Invalidated {count} cached user context(s) (user_id={user_id or 'all'})")
+
+    def size(self) -> int:
+        """Get number of cached users"""
+        return len(self._entries)
+
+
+# Global user context cache
+user_context_cache = UserContextCache(ttl=USER_CONTEXT_TTL)
+
+
+def invalidate_user_context(user_id: Optional[str] = None):
+    """
+    Invalidate cached auth context after app_users/user_industries/industries changes
+    Args:
+        user_id: app_users.id of the changed user; clears all users if not provided
+    """
+    user_context_cache.invalidate(user_id)
@@ -1,26 +1,101 @@
 """
 In-memory cache client with TTL support
 Used as fallback when Redis is unavailable
+Bounded LRU (by entry count and approximate bytes), safe for threaded use
 """
+import os
+import sys
+import json
 import time
 import logging
+import threading
+from collections import OrderedDict
 from typing import Any, Dict, Optional
 
 logger = logging.getLogger(__name__)
 
 
+def estimate_size(value: Any, sample_size: int = 100) -> int:
+    """
+    Estimate the memory footprint of a cached value in bytes
+    Large lists are estimated from a sample of their items (JSON-encoded length);
+    dicts are estimated value by value, so a response dict wrapping a large list
+    is not encoded in full, and dicts with many keys are sampled like lists
+    Args:
+        value: Value to measure
+        sample_size: Max list items / dict entries to measure when extrapolating
+    Returns:
+        Approximate size in bytes
+    """
+    try:
+        if isinstance(value, list) and len(value) > sample_size:
+            step = len(value) // sample_size
+            sample = value[::step][:sample_size]
+            sample_bytes = len(json.dumps(sample, default=str))
+            return int(sample_bytes * len(value) / len(sample))
+        if isinstance(value, dict) and value:
+            items = list(value.items())
+            sample = items if len(items) <= sample_size else items[::len(items) // sample_size][:sample_size]
+            # Key, quotes, colon and separator per entry
+            sample_bytes = sum(len(str(k)) + 4 + estimate_size(v, sample_size) for k, v in sample)
+            return int(sample_bytes * len(items) / len(sample)) + 2
+        if isinstance(value, (dict, list, tuple)):
+            return len(json.dumps(value, default=str))
+        if isinstance(value, (str, bytes)):
+            return len(value)
+        if value is None or isinstance(value, (bool, int, float)):
+            return len(json.dumps(value))
+    except (TypeError, ValueError):
+        pass
+    return sys.getsizeof(value)
+
+
 class InMemoryCache:
-    """Simple in-memory cache with TTL support"""
-    
-    def __init__(self, default_ttl: int = 300):
+    """In-memory LRU cache with TTL support, size/byte bounds and hit/miss/eviction counters"""
+
+    def __init__(self, default_ttl: int = 300, max_entries: int = 1000,
+                 max_bytes: int = 256 * 1024 * 1024, sweep_interval: int = 60):
         """
         Initialize in-memory cache
         Args:
             default_ttl: Default time-to-live in seconds (default: 5 minutes)
+            max_entries: Max number of entries before LRU eviction (0 = unbounded)
+            max_bytes: Max approximate total size in bytes before LRU eviction (0 = unbounded)
+            sweep_interval: Seconds between background expiry sweeps (0 = disabled)
         """
-        self._cache: Dict[str, Dict[str, Any]] = {}
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
         self._default_ttl = default_ttl
-    
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0, 'rejected': 0}
+        self._sweep_interval = sweep_interval
+        self._sweeper_thread = None
+
+    def _remove(self, key: str) -> Dict[str, Any]:
+        """Remove an entry and release its size (caller holds the lock)"""
+        entry = self._cache.pop(key)
+        self._bytes -= entry['size']
+        return entry
+
+    def _start_sweeper(self):
+        """Start the background expiry sweeper on first write"""
+        if self._sweep_interval <= 0 or self._sweeper_thread is not None:
+            return
+
+        def _run():
+            while True:
+                time.sleep(self._sweep_interval)
+                try:
+                    self.purge_expired()
+                except Exception as e:
+                    logger.warning(f"In-memory cache sweep error: {e}")
+
+        self._sweeper_thread = threading.Thread(target=_run, name='in-memory-cache-sweeper', daemon=True)
+        self._sweeper_thread.start()
+
     def get(self, key: str) -> Optional[Any]:
         """
         Get value from cache
@@ -29,39 +104,80 @@ class InMemoryCache:
         Returns:
             Cached value or None if not found/expired
         """
-        if key not in self._cache:
-            return None
-        
-        entry = self._cache[key]
-        if time.time() > entry['expires_at']:
-            del self._cache[key]
-            return None
-        
-        return entry['data']
-    
-    def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+
+            if time.time() > entry['expires_at']:
+                self._remove(key)
+                self._stats['expirations'] += 1
+                self._stats['misses'] += 1
+                return None
+
+            self._cache.move_to_end(key)
+            self._stats['hits'] += 1
+            return entry['data']
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None, size: Optional[int] = None):
         """
         Set value in cache
         Args:
             key: Cache key
             value: Value to cache
-            ttl: Time-to-live in seconds (uses default if not provided)
-        """
-        ttl = ttl or self._default_ttl
-        self._cache[key] = {
-            'data': value,
-            'expires_at': time.time() + ttl
-        }
-    
+            ttl: Time-to-live in seconds (uses default if not provided; 0 or less
+                 stores nothing and drops any current value)
+            size: Size in bytes if already known (estimated otherwise)
+        """
+        if ttl is None:
+            ttl = self._default_ttl
+        if ttl <= 0:
+            self.delete(key)
+            return
+        if size is None:
+            size = estimate_size(value)
+
+        if self._max_bytes and size > self._max_bytes:
+            with self._lock:
+                self._stats['rejected'] += 1
+                if key in self._cache:
+                    self._remove(key)
+            logger.warning(f"In-memory cache: value for {key} (~{size} bytes) exceeds max_bytes, not cached")
+            return
+
+        with self._lock:
+            if key in self._cache:
+                self._remove(key)
+            self._cache[key] = {
+                'data': value,
+                'expires_at': time.time() + ttl,
+                'size': size
+            }
+            self._bytes += size
+
+            # Evict least recently used entries until within bounds
+            while self._cache and (
+                (self._max_entries and len(self._cache) > self._max_entries) or
+                (self._max_bytes and self._bytes > self._max_bytes)
+            ):
+                evicted_key, _ = next(iter(self._cache.items()))
+                self._remove(evicted_key)
+                self._stats['evictions'] += 1
+                logger.debug(f"In-memory cache: evicted {evicted_key}")
+
+        self._start_sweeper()
+
     def delete(self, key: str):
         """
         Delete key from cache
         Args:
             key: Cache key to delete
         """
-        if key in self._cache:
-            del self._cache[key]
-    
+        with self._lock:
+            if key in self._cache:
+                self._remove(key)
+
     def clear_pattern(self, pattern: str):
         """
         Clear all keys matching pattern
@@ -69,26 +185,86 @@ class InMemoryCache:
             pattern: Pattern to match (e.g., 'targets:*')
         """
         prefix = pattern.rstrip('*')
-        keys_to_delete = [k for k in self._cache.keys() if k.startswith(prefix)]
-        for key in keys_to_delete:
-            del self._cache[key]
+        with self._lock:
+            keys_to_delete = [k for k in self._cache.keys() if k.startswith(prefix)]
+            for key in keys_to_delete:
+                self._remove(key)
         logger.debug(f"Cleared {len(keys_to_delete)} keys matching pattern: {pattern}")
-    
+
+    def purge_expired(self) -> int:
+        """
+        Remove all expired entries
+        Returns:
+            Number of entries removed
+        """
+        now = time.time()
+        with self._lock:
+            expired = [k for k, entry in self._cache.items() if now > entry['expires_at']]
+            for key in expired:
+                self._remove(key)
+            self._stats['expirations'] += len(expired)
+        if expired:
+            logger.debug(f"Purged {len(expired)} expired in-memory cache entries")
+        return len(expired)
+
+    def get_generation(self, namespace: str) -> int:
+        """
+        Get current generation for a cache namespace
+        Args:
+            namespace: Cache key prefix (e.g., 'targets')
+        Returns:
+            Generation number (0 if never invalidated)
+        """
+        return self._generations.get(namespace, 0)
+
+    def bump_generation(self, namespace: str) -> int:
+        """
+        Invalidate a namespace by moving it to a new generation
+        Old-generation keys are never read again and expire by TTL
+        Args:
+            namespace: Cache key prefix (e.g., 'targets')
+        Returns:
+            New generation number
+        """
+        with self._lock:
+            generation = self._generations.get(namespace, 0) + 1
+            self._generations[namespace] = generation
+        return generation
+
     def clear(self):
         """Clear all cache entries"""
-        count = len(self._cache)
-        self._cache.clear()
+        with self._lock:
+            count = len(self._cache)
+            self._cache.clear()
+            self._bytes = 0
         logger.debug(f"Cleared all cache entries ({count} keys)")
-    
+
     def size(self) -> int:
         """Get number of cached entries"""
         return len(self._cache)
 
-
-# Global cache instance
-cache = InMemoryCache(default_ttl=300)
-
-
-
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics
+        Returns:
+            Dictionary with entry/byte usage and hit/miss/eviction counters
+        """
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['misses']
+            return {
+                'entries': len(self._cache),
+                'bytes': self._bytes,
+                'max_entries': self._max_entries,
+                'max_bytes': self._max_bytes,
+                'hit_rate': round(self._stats['hits'] / lookups, 4) if lookups else None,
+                **self._stats
+            }
 
 
+# Global cache instance
+cache = InMemoryCache(
+    default_ttl=300,
+    max_entries=int(os.getenv('MEMORY_CACHE_MAX_ENTRIES', 1000)),
+    max_bytes=int(os.getenv('MEMORY_CACHE_MAX_MB', 256)) * 1024 * 1024,
+    sweep_interval=int(os.getenv('MEMORY_CACHE_SWEEP_INTERVAL', 60))
+)
@@ -0,0 +1,160 @@
+"""
+Pluggable binary codec for cached payloads
+Serializes with msgpack/orjson (falling back to json) and compresses with
+zstd/lz4 (falling back to zlib). Every payload starts with a 2-byte header
+naming its serializer and compressor, so values stay readable after the
+configured codec changes.
+"""
+import os
+import json
+import zlib
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+# Payloads smaller than this are stored uncompressed
+COMPRESS_MIN_BYTES = int(os.getenv('CACHE_COMPRESS_MIN_BYTES', 1024))
+
+
+def _json_dumps(value: Any) -> bytes:
+    return json.dumps(value, default=str, separators=(',', ':')).encode('utf-8')
+
+
+def _orjson_dumps(value: Any) -> bytes:
+    return orjson.dumps(value, default=str)
+
+
+def _msgpack_dumps(value: Any) -> bytes:
+    return msgpack.packb(value, default=str, use_bin_type=True)
+
+
+def _msgpack_loads(data: bytes) -> Any:
+    return msgpack.unpackb(data, raw=False)
+
+
+# id -> (name, dumps, loads)
+SERIALIZERS: Dict[bytes, Tuple[str, Any, Any]] = {
+    b'j': ('json', _json_dumps, json.loads),
+}
+if orjson:
+    SERIALIZERS[b'o'] = ('orjson', _orjson_dumps, orjson.loads)
+if msgpack:
+    SERIALIZERS[b'm'] = ('msgpack', _msgpack_dumps, _msgpack_loads)
+
+# id -> (name, compress, decompress)
+COMPRESSORS: Dict[bytes, Tuple[str, Any, Any]] = {
+    b'n': ('none', lambda data: data, lambda data: data),
+    b'z': ('zlib', lambda data: zlib.compress(data, 1), zlib.decompress),
+}
+if zstandard:
+    _zstd_compressor = zstandard.ZstdCompressor(level=3)
+    _zstd_decompressor = zstandard.ZstdDecompressor()
+    COMPRESSORS[b's'] = ('zstd', _zstd_compressor.compress, _zstd_decompressor.decompress)
+if lz4_frame:
+    COMPRESSORS[b'l'] = ('lz4', lz4_frame.compress, lz4_frame.decompress)
+
+
+class CacheCodec:
+    """Encodes values as <serializer id><compressor id><payload>"""
+
+    def __init__(self, serializer: str = 'json', compressor: str = 'none',
+                 compress_min_bytes: int = COMPRESS_MIN_BYTES):
+        """
+        Initialize codec
+        Args:
+            serializer: 'json', 'orjson' or 'msgpack'
+            compressor: 'none', 'zlib', 'zstd' or 'lz4'
+            compress_min_bytes: Payloads below this size are not compressed
+        """
+        self._serializer_id = self._lookup(SERIALIZERS, serializer)
+        self._compressor_id = self._lookup(COMPRESSORS, compressor)
+        self._compress_min_bytes = compress_min_bytes
+        self.name = f"{SERIALIZERS[self._serializer_id][0]}+{COMPRESSORS[self._compressor_id][0]}"
+
+    @staticmethod
+    def _lookup(table: Dict[bytes, Tuple[str, Any, Any]], name: str) -> bytes:
+        for codec_id, (codec_name, _, _) in table.items():
+            if codec_name == name:
+                return codec_id
+        raise ValueError(f"Cache codec '{name}' is not available (available: {', '.join(n for n, _, _ in table.values())})")
+
+    def encode(self, value: Any) -> bytes:
+        """
+        Encode a value for storage
+        Args:
+            value: JSON-compatible value
+        Returns:
+            Header-prefixed bytes
+        """
+        payload = SERIALIZERS[self._serializer_id][1](value)
+        compressor_id = self._compressor_id
+        if len(payload) < self._compress_min_bytes:
+            compressor_id = b'n'
+        return self._serializer_id + compressor_id + COMPRESSORS[compressor_id][1](payload)
+
+    @staticmethod
+    def decode(data: Optional[bytes]) -> Any:
+        """
+        Decode a stored value (whatever codec wrote it)
+        Args:
+            data: Bytes from the cache
+        Returns:
+            Decoded value, or None if data is empty
+        Raises:
+            ValueError: If the payload was written by an unavailable or unknown codec
+        """
+        if not data:
+            return None
+        if isinstance(data, str):
+            # Plain JSON written before the codec existed
+            return json.loads(data)
+        serializer = SERIALIZERS.get(data[0:1])
+        compressor = COMPRESSORS.get(data[1:2])
+        if not serializer or not compressor:
+            if data[0:1] in (b'{', b'['):
+                return json.loads(data)
+            raise ValueError(f"Unknown cache codec header: {data[:2]!r}")
+        return serializer[2](compressor[2](data[2:]))
+
+
+def get_default_codec() -> CacheCodec:
+    """
+    Build the codec configured by CACHE_CODEC (e.g. 'msgpack+zstd', 'orjson+lz4', 'json+none')
+    Defaults to the fastest installed serializer and compressor
+    """
+    configured = os.getenv('CACHE_CODEC', '').strip().lower()
+    if configured:
+        serializer, _, compressor = configured.partition('+')
+        try:
+            return CacheCodec(serializer, compressor or 'none')
+        except ValueError as e:
+            logger.warning(f"{e} - using default cache codec")
+
+    serializer = 'msgpack' if msgpack else 'orjson' if orjson else 'json'
+    compressor = 'zstd' if zstandard else 'lz4' if lz4_frame else 'zlib'
+    return CacheCodec(serializer, compressor)
+
+
+# Global codec instance
+codec = get_default_codec()
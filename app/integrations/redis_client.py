@@ -4,16 +4,20 @@ Provides caching for API responses to improve performance
 """
 import os
 import json
+import time
+import uuid
 import logging
+import threading
 from functools import wraps
-from typing import Optional, Any, Callable, Dict
-from flask import request, jsonify
+from typing import Optional, Any, Callable, Dict, Iterable, Tuple
+from flask import request, jsonify, g, current_app
 
 logger = logging.getLogger(__name__)
 
 # Try to import and connect to Redis
 REDIS_AVAILABLE = False
 redis_client = None
+redis_binary_client = None  # Same server, raw bytes (for codec-encoded cache payloads)
 
 try:
     import redis
@@ -68,61 +72,618 @@ try:
     
     # Test connection
     redis_client.ping()
+    redis_binary_client = redis.Redis(**{**redis_config, 'decode_responses': False})
     REDIS_AVAILABLE = True
     password_info = "with password" if redis_password else "no password"
     logger.info(f"✅ Redis connected: {redis_host}:{redis_port} (db={redis_db}, {password_info})")
 except ImportError:
     REDIS_AVAILABLE = False
     redis_client = None
+    redis_binary_client = None
     logger.warning("⚠️ Redis package not installed. Install with: pip install redis>=5.0.0")
 except redis.ConnectionError as e:
     REDIS_AVAILABLE = False
     redis_client = None
+    redis_binary_client = None
     logger.warning(f"⚠️ Redis connection failed ({redis_host}:{redis_port}), using in-memory cache: {e}")
     logger.info("💡 Tip: Make sure Redis is running. For WSL: sudo service redis-server start")
 except redis.AuthenticationError as e:
     REDIS_AVAILABLE = False
     redis_client = None
+    redis_binary_client = None
     logger.warning(f"⚠️ Redis authentication failed ({redis_host}:{redis_port}), using in-memory cache: {e}")
     logger.info("💡 Tip: If Redis doesn't require a password, remove REDIS_PASSWORD from .env.local or set it to empty: REDIS_PASSWORD=")
 except Exception as e:
     REDIS_AVAILABLE = False
     redis_client = None
+    redis_binary_client = None
     logger.warning(f"⚠️ Redis unavailable, using in-memory cache: {e}")
 
 # Import in-memory cache fallback
-from app.integrations.cache_client import cache as in_memory_cache
+from app.integrations.cache_client import cache as in_memory_cache, estimate_size, InMemoryCache
+from app.integrations.cache_codec import codec
+
+# Items per chunk when large lists are cached with set_cached_list
+CACHE_CHUNK_SIZE = int(os.getenv('CACHE_CHUNK_SIZE', 500))
+
+# Per-process L1 of already-decoded values in front of Redis.
+# Only used while this process is subscribed to the invalidation channel, so
+# every worker drops its L1 entries when any worker invalidates a namespace.
+CACHE_L1_ENABLED = os.getenv('CACHE_L1_ENABLED', 'true').lower() == 'true'
+CACHE_L1_TTL = int(os.getenv('CACHE_L1_TTL', 30))
+INVALIDATION_CHANNEL = 'cache:invalidate'
+l1_cache = InMemoryCache(
+    default_ttl=CACHE_L1_TTL,
+    max_entries=int(os.getenv('CACHE_L1_MAX_ENTRIES', 256)),
+    max_bytes=int(os.getenv('CACHE_L1_MAX_MB', 64)) * 1024 * 1024
+)
+_listener_thread = None
+_listener_connected = False
+_l1_epoch = 0  # Bumped on every received invalidation
+
+
+def _l1_active() -> bool:
+    return REDIS_AVAILABLE and CACHE_L1_ENABLED and _listener_connected
+
+
+def _l1_put(cache_key: str, value: Any, ttl: Optional[int] = None, size: Optional[int] = None,
+            epoch: Optional[int] = None):
+    """
+    Store a decoded value in L1
+    Args:
+        epoch: _l1_epoch observed before the value was read from Redis; the value is
+               dropped if an invalidation arrived in between
+    """
+    if not _l1_active() or (epoch is not None and epoch != _l1_epoch):
+        return
+    l1_cache.set(cache_key, value, max(1, min(ttl or CACHE_L1_TTL, CACHE_L1_TTL)), size=size)
+
+
+def _l1_drop_namespace(namespace: str):
+    """Drop L1 entries (values and generation) for a namespace, or everything for '*'"""
+    global _l1_epoch
+    _l1_epoch += 1
+    if namespace == '*':
+        l1_cache.clear()
+    else:
+        l1_cache.clear_pattern(f"{namespace}:*")
+
+
+def get_cache_generation(namespace: str) -> str:
+    """
+    Get the current generation of a cache namespace
+    Generations are embedded in cache keys, so bumping one invalidates every key
+    in the namespace at once (old keys are simply never read again and expire by TTL)
+    Args:
+        namespace: Cache key prefix (e.g., 'targets')
+    Returns:
+        Generation token ('m'-prefixed when served by the in-memory fallback)
+    """
+    if REDIS_AVAILABLE:
+        gen_key = f"{namespace}:gen"
+        if _l1_active():
+            generation = l1_cache.get(gen_key)
+            if generation is not None:
+                return generation
+        epoch = _l1_epoch
+        try:
+            generation = str(redis_client.get(gen_key) or 0)
+            _l1_put(gen_key, generation, epoch=epoch)
+            return generation
+        except Exception as e:
+            logger.warning(f"Redis generation read error, using fallback: {e}")
+    return f"m{in_memory_cache.get_generation(namespace)}"
+
+
+# Prefixes keys are built with (get_cache_key / cache_response), i.e. the namespaces
+# invalidate_cache can bump
+_cache_namespaces = set()
+
+
+def register_cache_namespace(namespace: str):
+    """
+    Declare a get_cache_key prefix up front, so invalidate_cache recognizes it in
+    processes that have not built any of its keys yet (cache_response does this itself)
+    """
+    _cache_namespaces.add(namespace)
+
+
+def _registered_namespace(namespace: str) -> Optional[str]:
+    """The registered namespace containing namespace (itself, or its longest registered parent)"""
+    if namespace in _cache_namespaces:
+        return namespace
+    parents = [n for n in list(_cache_namespaces) if namespace.startswith(f"{n}:")]
+    return max(parents, key=len) if parents else None
 
 
 def get_cache_key(prefix: str, **kwargs) -> str:
     """
-    Build a cache key from prefix and parameters
+    Build a cache key from prefix, namespace generation and parameters
     Args:
-        prefix: Cache key prefix (e.g., 'targets')
+        prefix: Cache key prefix / invalidation namespace (e.g., 'targets')
         **kwargs: Key-value pairs to include in cache key
     Returns:
-        Cache key string
+        Cache key string (e.g., 'targets:gen:3:company:all:...')
     """
+    _cache_namespaces.add(prefix)
     # Sort kwargs for consistent key generation
     sorted_kwargs = sorted(kwargs.items())
-    key_parts = [prefix] + [f"{k}:{v}" for k, v in sorted_kwargs if v is not None]
+    key_parts = [prefix, f"gen:{get_cache_generation(prefix)}"] + [f"{k}:{v}" for k, v in sorted_kwargs if v is not None]
     return ":".join(key_parts)
 
 
-def cache_response(ttl: int = 300, key_prefix: str = "api"):
+def get_cached(cache_key: str) -> Tuple[Optional[Any], bool]:
+    """
+    Read a value written by set_cached (Redis first, in-memory fallback)
+    Args:
+        cache_key: Cache key
+    Returns:
+        Tuple of (data, is_stale); data is None on a miss. is_stale is True when the
+        value is past its TTL but still inside its stale-while-revalidate window
+    """
+    envelope = _get_envelope(cache_key)
+    if envelope is None or envelope.get('data') is None:
+        return None, False
+    return envelope['data'], time.time() > envelope.get('fresh_until', 0)
+
+
+def get_cached_many(cache_keys: Iterable[str]) -> Dict[str, Any]:
+    """
+    Read several values written by set_cached (one Redis MGET for the L1 misses)
+    Args:
+        cache_keys: Cache keys
+    Returns:
+        Cache key -> data for the keys found (stale values included)
+    """
+    envelopes: Dict[str, Any] = {}
+    missing = list(dict.fromkeys(cache_keys))
+    if _l1_active():
+        for cache_key in missing:
+            envelope = l1_cache.get(cache_key)
+            if envelope is not None:
+                envelopes[cache_key] = envelope
+        missing = [key for key in missing if key not in envelopes]
+    
+    if missing and REDIS_AVAILABLE:
+        epoch = _l1_epoch
+        try:
+            raw_values = redis_binary_client.mget(missing)
+            for cache_key, raw in zip(missing, raw_values):
+                if not raw:
+                    continue
+                envelope = envelopes[cache_key] = codec.decode(raw)
+                fresh_for = int(envelope.get('fresh_until', 0) - time.time()) if isinstance(envelope, dict) else 0
+                if fresh_for > 0 and envelope.get('data') is not None:
+                    _l1_put(cache_key, envelope, fresh_for, size=estimate_size(envelope['data']), epoch=epoch)
+            logger.debug(f"✅ Cache MGET (Redis): {len(envelopes)}/{len(missing)} hits")
+        except Exception as e:
+            logger.warning(f"Redis read error, using fallback: {e}")
+        missing = [key for key in missing if key not in envelopes]
+    
+    # Fallback to in-memory cache
+    for cache_key in missing:
+        envelope = in_memory_cache.get(cache_key)
+        if envelope is not None:
+            envelopes[cache_key] = envelope
+    return {
+        cache_key: envelope['data'] for cache_key, envelope in envelopes.items()
+        if isinstance(envelope, dict) and 'fresh_until' in envelope and envelope.get('data') is not None
+    }
+
+
+def _get_envelope(cache_key: str) -> Optional[Dict[str, Any]]:
+    envelope = None
+    if _l1_active():
+        envelope = l1_cache.get(cache_key)
+        if envelope is not None:
+            logger.debug(f"✅ Cache HIT (L1): {cache_key}")
+            return envelope
+    
+    if REDIS_AVAILABLE:
+        epoch = _l1_epoch
+        try:
+            cached = redis_binary_client.get(cache_key)
+            if cached:
+                envelope = codec.decode(cached)
+                logger.debug(f"✅ Cache HIT (Redis): {cache_key}")
+                # Keep fresh values in L1 (stale ones are re-read until refreshed)
+                fresh_for = int(envelope.get('fresh_until', 0) - time.time()) if isinstance(envelope, dict) else 0
+                if fresh_for > 0:
+                    data = envelope.get('data')
+                    _l1_put(cache_key, envelope, fresh_for, size=estimate_size(data) if data is not None else None, epoch=epoch)
+        except Exception as e:
+            logger.warning(f"Redis read error, using fallback: {e}")
+    
+    # Fallback to in-memory cache
+    if envelope is None:
+        envelope = in_memory_cache.get(cache_key)
+        if envelope is not None:
+            logger.debug(f"✅ Cache HIT (In-Memory): {cache_key}")
+    
+    if not isinstance(envelope, dict) or 'fresh_until' not in envelope:
+        return None
+    return envelope
+
+
+def set_cached(cache_key: str, data: Any, ttl: int, stale_ttl: int = 0):
+    """
+    Cache a JSON-serializable value (Redis if available, in-memory otherwise)
+    Args:
+        cache_key: Cache key
+        data: Value to cache
+        ttl: Seconds the value is fresh
+        stale_ttl: Extra seconds the value may still be served stale while it is refreshed
+    """
+    envelope = {'data': data, 'fresh_until': time.time() + ttl}
+    if REDIS_AVAILABLE:
+        try:
+            redis_binary_client.setex(cache_key, ttl + stale_ttl, codec.encode(envelope))
+            _l1_put(cache_key, envelope, ttl, size=estimate_size(data))
+            logger.debug(f"💾 Cached in Redis: {cache_key} (TTL: {ttl}s, stale: {stale_ttl}s, codec: {codec.name})")
+            return
+        except Exception as e:
+            logger.warning(f"Redis write error: {e}")
+    in_memory_cache.set(cache_key, envelope, ttl + stale_ttl, size=estimate_size(data))
+    logger.debug(f"💾 Cached in-memory: {cache_key} (TTL: {ttl}s, stale: {stale_ttl}s)")
+
+
+def set_cached_many(items: Dict[str, Any], ttl: int):
+    """
+    Cache several values with the same TTL (one Redis pipeline round trip)
+    Args:
+        items: Cache key -> value to cache
+        ttl: Seconds the values are fresh
+    """
+    if not items:
+        return
+    fresh_until = time.time() + ttl
+    envelopes = {cache_key: {'data': data, 'fresh_until': fresh_until} for cache_key, data in items.items()}
+    if REDIS_AVAILABLE:
+        try:
+            pipe = redis_binary_client.pipeline(transaction=False)
+            for cache_key, envelope in envelopes.items():
+                pipe.setex(cache_key, ttl, codec.encode(envelope))
+            pipe.execute()
+            for cache_key, envelope in envelopes.items():
+                _l1_put(cache_key, envelope, ttl, size=estimate_size(envelope['data']))
+            logger.debug(f"💾 Cached {len(envelopes)} keys in Redis (TTL: {ttl}s, codec: {codec.name})")
+            return
+        except Exception as e:
+            logger.warning(f"Redis write error: {e}")
+    for cache_key, envelope in envelopes.items():
+        in_memory_cache.set(cache_key, envelope, ttl, size=estimate_size(envelope['data']))
+    logger.debug(f"💾 Cached {len(envelopes)} keys in-memory (TTL: {ttl}s)")
+
+
+def set_cached_list(cache_key: str, items: list, ttl: int, stale_ttl: int = 0,
+                    chunk_size: Optional[int] = None):
+    """
+    Cache a large list in fixed-size chunks so page reads only decode the chunks they need
+    Redis layout: '<key>' holds metadata, '<key>:chunk:<n>' hold the items
+    Args:
+        cache_key: Cache key
+        items: List of JSON-serializable items
+        ttl: Seconds the list is fresh
+        stale_ttl: Extra seconds the list may be served stale
+        chunk_size: Items per chunk (default: CACHE_CHUNK_SIZE)
+    """
+    chunk_size = chunk_size or CACHE_CHUNK_SIZE
+    fresh_until = time.time() + ttl
+    if REDIS_AVAILABLE:
+        try:
+            chunk_count = (len(items) + chunk_size - 1) // chunk_size
+            pipe = redis_binary_client.pipeline(transaction=False)
+            for i in range(chunk_count):
+                pipe.setex(f"{cache_key}:chunk:{i}", ttl + stale_ttl, codec.encode(items[i * chunk_size:(i + 1) * chunk_size]))
+            # Metadata last, so readers never see it before its chunks
+            meta = {
+                'chunked': {'total': len(items), 'chunk_size': chunk_size, 'chunks': chunk_count},
+                'fresh_until': fresh_until
+            }
+            pipe.setex(cache_key, ttl + stale_ttl, codec.encode(meta))
+            pipe.execute()
+            _l1_put(cache_key, meta, ttl)
+            logger.debug(f"💾 Cached in Redis: {cache_key} ({len(items)} items in {chunk_count} chunks, codec: {codec.name})")
+            return
+        except Exception as e:
+            logger.warning(f"Redis write error: {e}")
+    in_memory_cache.set(cache_key, {'data': items, 'fresh_until': fresh_until}, ttl + stale_ttl, size=estimate_size(items))
+    logger.debug(f"💾 Cached in-memory: {cache_key} ({len(items)} items)")
+
+
+def get_cached_list(cache_key: str, offset: int = 0, limit: Optional[int] = None) -> Tuple[Optional[list], int, bool]:
+    """
+    Read (a slice of) a list written by set_cached_list
+    Args:
+        cache_key: Cache key
+        offset: Index of the first item to return
+        limit: Max items to return (None = through the end)
+    Returns:
+        Tuple of (items, total, is_stale); items is None on a miss
+    """
+    envelope = _get_envelope(cache_key)
+    if envelope is None:
+        return None, 0, False
+    is_stale = time.time() > envelope['fresh_until']
+    end = None if limit is None else offset + limit
+    
+    meta = envelope.get('chunked')
+    if not meta:
+        items = envelope.get('data')
+        if not isinstance(items, list):
+            return None, 0, False
+        return items[offset:end], len(items), is_stale
+    
+    total, chunk_size = meta['total'], meta['chunk_size']
+    end = total if end is None else min(end, total)
+    if offset >= end:
+        return [], total, is_stale
+    first_chunk, last_chunk = offset // chunk_size, (end - 1) // chunk_size
+    chunk_keys = [f"{cache_key}:chunk:{i}" for i in range(first_chunk, last_chunk + 1)]
+    
+    # Decoded chunks from L1, the rest in one MGET
+    chunks = {key: l1_cache.get(key) for key in chunk_keys} if _l1_active() else {key: None for key in chunk_keys}
+    missing = [key for key, chunk in chunks.items() if chunk is None]
+    if missing:
+        epoch = _l1_epoch
+        fresh_for = int(envelope['fresh_until'] - time.time())
+        try:
+            raw_chunks = redis_binary_client.mget(missing)
+        except Exception as e:
+            logger.warning(f"Redis read error: {e}")
+            return None, 0, False
+        if any(raw is None for raw in raw_chunks):
+            # Chunks expired/evicted independently of the metadata
+            return None, 0, False
+        for key, raw in zip(missing, raw_chunks):
+            chunks[key] = codec.decode(raw)
+            if fresh_for > 0:
+                _l1_put(key, chunks[key], fresh_for, size=estimate_size(chunks[key]), epoch=epoch)
+    items = []
+    for key in chunk_keys:
+        items.extend(chunks[key])
+    start = offset - first_chunk * chunk_size
+    return items[start:start + (end - offset)], total, is_stale
+
+
+def get_cached_list_version(cache_key: str) -> Optional[float]:
+    """
+    Identify the currently cached write of a list (changes every time it is rewritten)
+    Lets callers key derived structures (e.g. search indexes) to one cached version
+    Args:
+        cache_key: Cache key
+    Returns:
+        Version marker, or None on a miss
+    """
+    envelope = _get_envelope(cache_key)
+    return envelope['fresh_until'] if envelope else None
+
+
+def delete_cached_list(cache_key: str):
+    """
+    Delete a list written by set_cached_list (metadata and all chunks)
+    Args:
+        cache_key: Cache key
+    """
+    in_memory_cache.delete(cache_key)
+    l1_cache.delete(cache_key)
+    if not REDIS_AVAILABLE:
+        return
+    try:
+        raw = redis_binary_client.get(cache_key)
+        meta = (codec.decode(raw) or {}).get('chunked') if raw else None
+        keys = [cache_key]
+        if meta:
+            keys.extend(f"{cache_key}:chunk:{i}" for i in range(meta['chunks']))
+            for key in keys[1:]:
+                l1_cache.delete(key)
+        redis_binary_client.delete(*keys)
+        logger.debug(f"🗑️ Deleted cached list: {cache_key} ({len(keys) - 1} chunks)")
+    except Exception as e:
+        logger.warning(f"Redis delete error: {e}")
+
+
+# Per-key in-process locks for single-flight recomputation
+_key_locks: Dict[str, list] = {}
+_key_locks_guard = threading.Lock()
+
+# Compare-and-delete so a process never releases a lease another process now holds
+_RELEASE_LEASE_SCRIPT = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) else return 0 end"
+
+
+def _acquire_key_lock(cache_key: str, timeout: float) -> Tuple[threading.Lock, bool]:
+    with _key_locks_guard:
+        entry = _key_locks.setdefault(cache_key, [threading.Lock(), 0])
+        entry[1] += 1
+    return entry[0], entry[0].acquire(timeout=timeout)
+
+
+def _release_key_lock(cache_key: str, lock: threading.Lock, acquired: bool):
+    if acquired:
+        lock.release()
+    with _key_locks_guard:
+        entry = _key_locks.get(cache_key)
+        if entry:
+            entry[1] -= 1
+            if entry[1] <= 0:
+                del _key_locks[cache_key]
+
+
+def _acquire_lease(cache_key: str, lease_seconds: int) -> Optional[str]:
+    """
+    Take the cross-process recompute lease for a key (Redis SET NX)
+    Returns:
+        Lease token if acquired (or Redis unavailable), None if another process holds it
+    """
+    token = uuid.uuid4().hex
+    if not REDIS_AVAILABLE:
+        return token
+    try:
+        if redis_client.set(f"lease:{cache_key}", token, nx=True, ex=lease_seconds):
+            return token
+        return None
+    except Exception as e:
+        logger.warning(f"Redis lease error, computing without lease: {e}")
+        return token
+
+
+def _release_lease(cache_key: str, token: Optional[str]):
+    if not token or not REDIS_AVAILABLE:
+        return
+    try:
+        redis_client.eval(_RELEASE_LEASE_SCRIPT, 1, f"lease:{cache_key}", token)
+    except Exception as e:
+        logger.warning(f"Redis lease release error: {e}")
+
+
+def _lease_held(cache_key: str) -> bool:
+    if not REDIS_AVAILABLE:
+        return False
+    try:
+        return bool(redis_client.exists(f"lease:{cache_key}"))
+    except Exception:
+        return False
+
+
+def compute_single_flight(cache_key: str, compute: Callable[[], Any], lease_seconds: int = 30,
+                          poll_interval: float = 0.1, read: Optional[Callable[[], Any]] = None) -> Tuple[Any, bool]:
+    """
+    Recompute a missing cache value at most once at a time per key
+    Threads in this process queue on a per-key lock; other processes are held off
+    by a Redis SET NX lease and wait for the leader's value to appear.
+    Args:
+        cache_key: Cache key being filled
+        compute: Callable that computes the value and stores it (e.g. via set_cached)
+        lease_seconds: Lease expiry and max time to wait for another leader
+        poll_interval: Seconds between cache re-reads while waiting
+        read: Callable returning the cached value or None (default: get_cached data)
+    Returns:
+        Tuple of (value, computed): compute()'s return value if this caller computed,
+        otherwise the cached data written by the leader
+    """
+    if read is None:
+        read = lambda: get_cached(cache_key)[0]
+    lock, acquired = _acquire_key_lock(cache_key, timeout=lease_seconds)
+    try:
+        # Another thread may have filled the cache while we waited
+        if acquired:
+            data = read()
+            if data is not None:
+                return data, False
+        
+        token = _acquire_lease(cache_key, lease_seconds)
+        if token is None:
+            # Another process is computing - wait for its value
+            deadline = time.time() + lease_seconds
+            while time.time() < deadline:
+                time.sleep(poll_interval)
+                data = read()
+                if data is not None:
+                    logger.debug(f"Single-flight: served {cache_key} computed by another process")
+                    return data, False
+                if not _lease_held(cache_key):
+                    break
+            token = _acquire_lease(cache_key, lease_seconds)
+        
+        try:
+            return compute(), True
+        finally:
+            _release_lease(cache_key, token)
+    finally:
+        _release_key_lock(cache_key, lock, acquired)
+
+
+def _bind_request_context(fn: Callable[[], Any]) -> Callable[[], Any]:
+    """Wrap fn to run in a background thread with a copy of the current request and auth context"""
+    app = current_app._get_current_object()
+    environ = dict(request.environ)
+    user = getattr(g, 'user', None)
+    industry = getattr(g, 'industry', None)
+    
+    def run():
+        with app.request_context(environ):
+            g.user = user
+            g.industry = industry
+            return fn()
+    return run
+
+
+def refresh_in_background(cache_key: str, compute: Callable[[], Any], lease_seconds: int = 30):
+    """
+    Recompute a stale value in a background thread, unless a refresh is already running
+    Args:
+        cache_key: Cache key being refreshed
+        compute: Callable that recomputes and stores the value (runs with the current request context)
+        lease_seconds: Lease expiry for the refresh
+    """
+    lock, acquired = _acquire_key_lock(cache_key, timeout=0)
+    if not acquired:
+        _release_key_lock(cache_key, lock, acquired)
+        return
+    token = _acquire_lease(cache_key, lease_seconds)
+    if token is None:
+        _release_key_lock(cache_key, lock, acquired)
+        return
+    
+    bound = _bind_request_context(compute)
+    
+    def run():
+        try:
+            bound()
+            logger.debug(f"🔄 Background refresh done: {cache_key}")
+        except Exception as e:
+            logger.warning(f"Background refresh failed for {cache_key}: {e}")
+        finally:
+            _release_lease(cache_key, token)
+            _release_key_lock(cache_key, lock, acquired)
+    
+    threading.Thread(target=run, name='cache-refresh', daemon=True).start()
+
+
+def _extract_response_data(result) -> Optional[Any]:
+    """Extract JSON data from a Flask view result"""
+    response_data = None
+    if isinstance(result, tuple) and len(result) == 2:
+        # Flask can return (response, status_code)
+        response_obj = result[0]
+        if hasattr(response_obj, 'get_json'):
+            response_data = response_obj.get_json()
+        elif hasattr(response_obj, 'data'):
+            try:
+                response_data = json.loads(response_obj.data)
+            except:
+                pass
+    elif hasattr(result, 'get_json'):
+        # Direct Flask Response object
+        response_data = result.get_json()
+    elif hasattr(result, 'data'):
+        # Response object with data attribute
+        try:
+            response_data = json.loads(result.data)
+        except:
+            pass
+    return response_data
+
+
+def cache_response(ttl: int = 300, key_prefix: str = "api", stale_ttl: int = 0):
     """
     Decorator to cache API responses
     Uses Redis if available, falls back to in-memory cache
+    Concurrent misses on the same key are coalesced so only one request recomputes
     
     Args:
         ttl: Time-to-live in seconds (default: 5 minutes)
         key_prefix: Prefix for cache keys (default: 'api')
+        stale_ttl: Seconds past ttl an expired response is still served while one
+                   background refresh recomputes it (default: 0 = disabled)
     
     Example:
-        @cache_response(ttl=300, key_prefix='targets')
+        @cache_response(ttl=300, key_prefix='targets', stale_ttl=60)
         def list_targets():
             ...
     """
+    register_cache_namespace(key_prefix)
+    
     def decorator(func: Callable) -> Callable:
         @wraps(func)
         def wrapper(*args, **kwargs):
@@ -149,71 +710,29 @@ def cache_response(ttl: int = 300, key_prefix: str = "api"):
             
             cache_key = get_cache_key(key_prefix, **cache_params)
             
-            # Try Redis first, fallback to in-memory
-            cached_response = None
-            if REDIS_AVAILABLE:
-                try:
-                    cached = redis_client.get(cache_key)
-                    if cached:
-                        cached_response = json.loads(cached)
-                        logger.debug(f"✅ Cache HIT (Redis): {cache_key}")
-                except Exception as e:
-                    logger.warning(f"Redis read error, using fallback: {e}")
-            
-            # Fallback to in-memory cache
-            if cached_response is None:
-                cached_response = in_memory_cache.get(cache_key)
-                if cached_response:
-                    logger.debug(f"✅ Cache HIT (In-Memory): {cache_key}")
+            def compute():
+                result = func(*args, **kwargs)
+                # Cache the response if we got valid JSON
+                response_data = _extract_response_data(result)
+                if response_data:
+                    try:
+                        set_cached(cache_key, response_data, ttl, stale_ttl)
+                    except Exception as e:
+                        logger.warning(f"Error caching response: {e}")
+                return result
             
-            # Return cached response if found
+            # Return cached response if found (refreshing it in the background if stale)
+            cached_response, is_stale = get_cached(cache_key)
             if cached_response:
+                if is_stale:
+                    logger.debug(f"⏳ Cache STALE: {cache_key}, serving stale and refreshing")
+                    refresh_in_background(cache_key, compute)
                 return jsonify(cached_response)
             
-            # Cache miss - execute function
+            # Cache miss - execute function once per key
             logger.debug(f"❌ Cache MISS: {cache_key}")
-            result = func(*args, **kwargs)
-            
-            # Extract JSON data from Flask response
-            response_data = None
-            if isinstance(result, tuple) and len(result) == 2:
-                # Flask can return (response, status_code)
-                response_obj = result[0]
-                if hasattr(response_obj, 'get_json'):
-                    response_data = response_obj.get_json()
-                elif hasattr(response_obj, 'data'):
-                    try:
-                        response_data = json.loads(response_obj.data)
-                    except:
-                        pass
-            elif hasattr(result, 'get_json'):
-                # Direct Flask Response object
-                response_data = result.get_json()
-            elif hasattr(result, 'data'):
-                # Response object with data attribute
-                try:
-                    response_data = json.loads(result.data)
-                except:
-                    pass
-            
-            # Cache the response if we got valid JSON
-            if response_data:
-                try:
-                    if REDIS_AVAILABLE:
-                        try:
-                            redis_client.setex(cache_key, ttl, json.dumps(response_data))
-                            logger.debug(f"💾 Cached in Redis: {cache_key} (TTL: {ttl}s)")
-                        except Exception as e:
-                            logger.warning(f"Redis write error: {e}")
-                            # Fallback to in-memory
-                            in_memory_cache.set(cache_key, response_data, ttl)
-                    else:
-                        in_memory_cache.set(cache_key, response_data, ttl)
-                        logger.debug(f"💾 Cached in-memory: {cache_key} (TTL: {ttl}s)")
-                except Exception as e:
-                    logger.warning(f"Error caching response: {e}")
-            
-            return result
+            result, computed = compute_single_flight(cache_key, compute)
+            return result if computed else jsonify(result)
         
         return wrapper
     return decorator
@@ -221,37 +740,176 @@ def cache_response(ttl: int = 300, key_prefix: str = "api"):
 
 def invalidate_cache(pattern: str):
     """
-    Invalidate cache entries matching a pattern
+    Invalidate all cache entries in a namespace
+    Bumps the namespace generation (one INCR) instead of scanning for keys;
+    stale keys expire by TTL or are removed by the optional sweeper
     Args:
-        pattern: Pattern to match (e.g., 'targets:*' or 'targets:industry:123:*')
+        pattern: Namespace pattern, i.e. a get_cache_key prefix plus '*'
+                 (e.g., 'targets:*' or 'contacts:all:*'). Keys carry only their prefix's
+                 generation, so a narrower pattern ('targets:industry:123:*') invalidates
+                 the whole enclosing namespace; unregistered prefixes invalidate nothing
     
     Example:
         invalidate_cache('targets:*')  # Clear all target caches
-        invalidate_cache('targets:industry:123:*')  # Clear caches for industry 123
     """
+    namespace = pattern.rstrip('*').rstrip(':')
+    if not namespace or '*' in namespace:
+        logger.warning(f"invalidate_cache: '{pattern}' is not a namespace pattern, nothing invalidated")
+        return
+    registered = _registered_namespace(namespace)
+    if registered is None:
+        logger.warning(f"invalidate_cache: no cache keys use namespace '{namespace}', nothing invalidated")
+        return
+    if registered != namespace:
+        logger.warning(f"invalidate_cache: '{namespace}' is inside namespace '{registered}', invalidating all of it")
+        namespace = registered
+    
+    # Always bump the in-memory generation too, so fallback entries written
+    # while Redis was unreachable are invalidated as well
+    in_memory_cache.bump_generation(namespace)
+    _l1_drop_namespace(namespace)
     if REDIS_AVAILABLE:
         try:
-            # Redis pattern deletion
-            keys = redis_client.keys(pattern)
-            if keys:
-                redis_client.delete(*keys)
-                logger.info(f"🗑️ Invalidated {len(keys)} Redis cache keys matching: {pattern}")
+            generation = redis_client.incr(f"{namespace}:gen")
+            # Tell every worker to drop its L1 entries for this namespace
+            redis_client.publish(INVALIDATION_CHANNEL, namespace)
+            logger.info(f"🗑️ Invalidated Redis cache namespace: {namespace} (generation {generation})")
         except Exception as e:
             logger.warning(f"Redis invalidation error: {e}")
-            # Fallback to in-memory
-            in_memory_cache.clear_pattern(pattern)
     else:
-        # In-memory pattern deletion
-        in_memory_cache.clear_pattern(pattern)
-        logger.info(f"🗑️ Invalidated in-memory cache keys matching: {pattern}")
+        logger.info(f"🗑️ Invalidated in-memory cache namespace: {namespace}")
+
+
+def sweep_stale_cache_keys(batch_size: int = 500) -> int:
+    """
+    Delete Redis keys belonging to old namespace generations
+    Uses incremental SCAN (never KEYS), so it does not block Redis
+    Args:
+        batch_size: SCAN count hint and delete batch size
+    Returns:
+        Number of keys deleted
+    """
+    if not REDIS_AVAILABLE:
+        return 0
+    deleted = 0
+    try:
+        for gen_key in redis_client.scan_iter(match='*:gen', count=batch_size):
+            namespace = gen_key[:-len(':gen')]
+            current = str(redis_client.get(gen_key) or 0)
+            key_prefix = f"{namespace}:gen:"
+            stale_keys = []
+            for key in redis_client.scan_iter(match=f"{key_prefix}*", count=batch_size):
+                if key[len(key_prefix):].split(':', 1)[0] != current:
+                    stale_keys.append(key)
+                if len(stale_keys) >= batch_size:
+                    deleted += redis_client.unlink(*stale_keys)
+                    stale_keys = []
+            if stale_keys:
+                deleted += redis_client.unlink(*stale_keys)
+        if deleted:
+            logger.info(f"🧹 Swept {deleted} stale-generation Redis cache keys")
+    except Exception as e:
+        logger.warning(f"Redis sweep error: {e}")
+    return deleted
 
 
-def clear_all_cache():
-    """Clear all cache entries (use with caution)"""
+_sweeper_thread = None
+
+def start_cache_sweeper(interval: Optional[int] = None):
+    """
+    Start the optional background sweeper for stale-generation keys
+    Args:
+        interval: Seconds between sweeps (default: CACHE_SWEEP_INTERVAL env, 0 disables)
+    """
+    global _sweeper_thread
+    if interval is None:
+        interval = int(os.getenv('CACHE_SWEEP_INTERVAL', 0))
+    if interval <= 0 or not REDIS_AVAILABLE or _sweeper_thread is not None:
+        return
+    
+    import threading
+    import time
+    
+    def _run():
+        while True:
+            time.sleep(interval)
+            sweep_stale_cache_keys()
+    
+    _sweeper_thread = threading.Thread(target=_run, name='cache-sweeper', daemon=True)
+    _sweeper_thread.start()
+    logger.info(f"Cache sweeper started (interval: {interval}s)")
+
+
+def start_cache_invalidation_listener():
+    """
+    Subscribe this process to the cache invalidation channel (enables the L1 cache)
+    Runs in a daemon thread; L1 is bypassed whenever the subscription is down, and
+    fully cleared after reconnecting since messages may have been missed
+    """
+    global _listener_thread
+    if not REDIS_AVAILABLE or not CACHE_L1_ENABLED or _listener_thread is not None:
+        return
+    
+    def _run():
+        global _listener_connected
+        while True:
+            pubsub = None
+            try:
+                pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(INVALIDATION_CHANNEL)
+                _l1_drop_namespace('*')
+                _listener_connected = True
+                while True:
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message.get('type') == 'message':
+                        _l1_drop_namespace(message['data'])
+            except Exception as e:
+                _listener_connected = False
+                logger.warning(f"Cache invalidation listener error, L1 disabled until reconnected: {e}")
+                time.sleep(2)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+    
+    _listener_thread = threading.Thread(target=_run, name='cache-invalidation-listener', daemon=True)
+    _listener_thread.start()
+    logger.info(f"Cache invalidation listener started (channel: {INVALIDATION_CHANNEL}, L1 TTL: {CACHE_L1_TTL}s)")
+
+
+# Cache keys not built with get_cache_key (so not covered by a namespace generation)
+_UNVERSIONED_CACHE_PATTERNS = ('contacts:sync:*', 'enrichment:domain:*', 'target_analysis:*')
+
+
+def clear_all_cache(batch_size: int = 500):
+    """
+    Clear all cache entries (use with caution)
+    Bumps every namespace generation and deletes the other cache keys with SCAN;
+    never FLUSHDB, since the job queue, leases and progress share the Redis DB
+    Args:
+        batch_size: SCAN count hint and delete batch size
+    """
+    _l1_drop_namespace('*')
     if REDIS_AVAILABLE:
         try:
-            redis_client.flushdb()
-            logger.warning("🗑️ Cleared all Redis cache")
+            namespaces = 0
+            for gen_key in redis_client.scan_iter(match='*:gen', count=batch_size):
+                redis_client.incr(gen_key)
+                namespaces += 1
+            deleted = 0
+            for pattern in _UNVERSIONED_CACHE_PATTERNS:
+                keys = []
+                for key in redis_client.scan_iter(match=pattern, count=batch_size):
+                    keys.append(key)
+                    if len(keys) >= batch_size:
+                        deleted += redis_client.unlink(*keys)
+                        keys = []
+                if keys:
+                    deleted += redis_client.unlink(*keys)
+            redis_client.publish(INVALIDATION_CHANNEL, '*')
+            logger.warning(f"🗑️ Cleared all Redis cache ({namespaces} namespaces invalidated, {deleted} keys deleted)")
         except Exception as e:
             logger.warning(f"Error clearing Redis cache: {e}")
     
@@ -268,6 +926,10 @@ def get_cache_stats() -> Dict[str, Any]:
     stats = {
         'redis_available': REDIS_AVAILABLE,
         'in_memory_size': in_memory_cache.size(),
+        'in_memory_stats': in_memory_cache.stats(),
+        'codec': codec.name,
+        'l1_active': _l1_active(),
+        'l1_stats': l1_cache.stats(),
     }
     
     if REDIS_AVAILABLE:
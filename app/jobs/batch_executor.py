@@ -0,0 +1,89 @@
+"""
+Bounded concurrent batch execution for background jobs
+Batches run on a small thread pool, but their results are handed back in
+submission order, so progress and resume checkpoints only ever advance past
+batches that are committed along with every batch before them. A process-wide
+semaphore caps concurrent batch writes across all jobs, so several imports
+running at once cannot overwhelm PostgREST.
+"""
+import os
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Batches in flight per job
+IMPORT_JOB_CONCURRENCY = int(os.getenv('IMPORT_JOB_CONCURRENCY', 4))
+# Batches in flight across all jobs in this process
+BATCH_WRITE_MAX_CONCURRENCY = int(os.getenv('BATCH_WRITE_MAX_CONCURRENCY', 8))
+
+_write_slots = threading.BoundedSemaphore(max(1, BATCH_WRITE_MAX_CONCURRENCY))
+
+# (tag, result, error): exactly one of result/error is set
+BatchOutcome = Tuple[Any, Any, Optional[BaseException]]
+
+
+class OrderedBatchExecutor:
+    """Runs fn(batch) for up to max_in_flight batches at once; outcomes come back in order"""
+
+    def __init__(self, fn: Callable[[Any], Any], max_in_flight: int = IMPORT_JOB_CONCURRENCY,
+                 name: str = 'batch'):
+        """
+        Args:
+            fn: Batch function (exceptions are isolated to that batch's outcome)
+            max_in_flight: Batches submitted but not yet collected
+            name: Thread name prefix
+        """
+        self._fn = fn
+        self.max_in_flight = max(1, max_in_flight)
+        self._pool = ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix=name)
+        self._pending: Deque[Tuple[Any, Future]] = deque()
+
+    def _run(self, batch):
+        with _write_slots:
+            return self._fn(batch)
+
+    def submit(self, tag: Any, batch: Any) -> List[BatchOutcome]:
+        """
+        Start a batch, first waiting for the oldest one if max_in_flight are running
+        Args:
+            tag: Caller data returned with the outcome (e.g. batch number and position)
+            batch: Argument for fn
+        Returns:
+            Outcomes of batches finished so far, in submission order
+        """
+        outcomes = []
+        while len(self._pending) >= self.max_in_flight:
+            outcomes.append(self._pop())
+        self._pending.append((tag, self._pool.submit(self._run, batch)))
+        return outcomes + self._collect_done()
+
+    def finish(self) -> List[BatchOutcome]:
+        """Wait for every submitted batch; outcomes in submission order"""
+        outcomes = []
+        while self._pending:
+            outcomes.append(self._pop())
+        return outcomes
+
+    def close(self):
+        """Drop batches that have not started and wait for the running ones"""
+        for _, future in self._pending:
+            future.cancel()
+        self._pending.clear()
+        self._pool.shutdown(wait=True)
+
+    def _pop(self) -> BatchOutcome:
+        tag, future = self._pending.popleft()
+        try:
+            return tag, future.result(), None
+        except Exception as e:
+            return tag, None, e
+
+    def _collect_done(self) -> List[BatchOutcome]:
+        outcomes = []
+        while self._pending and self._pending[0][1].done():
+            outcomes.append(self._pop())
+        return outcomes
@@ -0,0 +1,92 @@
+"""
+Storage for files uploaded to background jobs
+Import files are kept until their job completes, so an interrupted job can be
+resumed by any worker without a re-upload. Files go to a local directory
+(shared between web and worker processes) or to a Supabase storage bucket.
+Stored paths carry their backend: 'local:<name>' or 'supabase:<bucket>/<name>'.
+"""
+import os
+import hashlib
+import logging
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FILE_STORAGE = os.getenv('IMPORT_FILE_STORAGE', 'local').lower()  # 'local' or 'supabase'
+IMPORT_FILE_DIR = os.getenv(
+    'IMPORT_FILE_DIR',
+    os.path.join(os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir)), 'data', 'imports')
+)
+IMPORT_FILE_BUCKET = os.getenv('IMPORT_FILE_BUCKET', 'import-files')
+
+
+def file_hash(content: bytes) -> str:
+    """SHA-256 hex digest of a file's content"""
+    return hashlib.sha256(content).hexdigest()
+
+
+def save_job_file(supabase, job_id: str, file_name: str, content: bytes) -> Tuple[str, str]:
+    """
+    Store an uploaded file for a job
+    Args:
+        supabase: Supabase client (used for the supabase backend)
+        job_id: Job ID (files are stored under it)
+        file_name: Original file name (only its extension is kept)
+        content: File content
+    Returns:
+        Tuple of (stored path, file hash)
+    """
+    digest = file_hash(content)
+    extension = os.path.splitext(file_name or '')[1].lower()[:10]
+    name = f"{job_id}{extension}"
+
+    if IMPORT_FILE_STORAGE == 'supabase':
+        supabase.storage.from_(IMPORT_FILE_BUCKET).upload(
+            name, content, {'content-type': 'application/octet-stream', 'upsert': 'true'}
+        )
+        return f"supabase:{IMPORT_FILE_BUCKET}/{name}", digest
+
+    os.makedirs(IMPORT_FILE_DIR, exist_ok=True)
+    path = os.path.join(IMPORT_FILE_DIR, name)
+    # Write then rename, so a reader never sees a partial file
+    with open(f"{path}.tmp", 'wb') as f:
+        f.write(content)
+    os.replace(f"{path}.tmp", path)
+    return f"local:{name}", digest
+
+
+def load_job_file(supabase, stored_path: str) -> Optional[bytes]:
+    """
+    Read a stored job file
+    Returns:
+        File content, or None if it no longer exists
+    """
+    try:
+        backend, _, location = stored_path.partition(':')
+        if backend == 'supabase':
+            bucket, _, name = location.partition('/')
+            return supabase.storage.from_(bucket).download(name)
+        with open(os.path.join(IMPORT_FILE_DIR, os.path.basename(location)), 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.error(f"Error loading job file {stored_path}: {e}")
+        return None
+
+
+def delete_job_file(supabase, stored_path: Optional[str]):
+    """Delete a stored job file (missing files are ignored)"""
+    if not stored_path:
+        return
+    try:
+        backend, _, location = stored_path.partition(':')
+        if backend == 'supabase':
+            bucket, _, name = location.partition('/')
+            supabase.storage.from_(bucket).remove([name])
+        else:
+            os.remove(os.path.join(IMPORT_FILE_DIR, os.path.basename(location)))
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.warning(f"Error deleting job file {stored_path}: {e}")
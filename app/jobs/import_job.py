@@ -1,235 +1,556 @@
-"""Background job processor for large contact imports"""
+"""Background job for large contact imports (runs on the job queue in app/jobs/queue.py)"""
+import os
+import json
+import queue
 import logging
 import threading
 import openpyxl
 from io import BytesIO
 from datetime import datetime
-from typing import Dict, Any, List, Optional
-from app.services.contact_service import upsert_contacts, find_duplicates, resolve_best_domain
+from flask import current_app
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+from app.services.contact_service import (
+    upsert_contacts, find_duplicates, resolve_best_domain, CompanyResolver, normalize_email, normalize_phone
+)
 from app.supabase_client import get_supabase_client
+from app.jobs.queue import JobCancelled, JobContext, enqueue_job, register_job_type, is_job_active, cancel_job as cancel_queued_job
+from app.jobs.progress import get_progress_bus
+from app.jobs.batch_executor import OrderedBatchExecutor
+from app.jobs.file_store import save_job_file, load_job_file, delete_job_file, file_hash
 
 logger = logging.getLogger(__name__)
 
-# Global job registry to track running jobs
-_active_jobs: Dict[str, threading.Thread] = {}
+IMPORT_JOB_TYPE = 'import_contacts'
 
+# Rows per upsert batch, and batches buffered between the parser and the writer
+# (the parser blocks when the writer falls behind, so memory stays bounded)
+IMPORT_BATCH_SIZE = int(os.getenv('IMPORT_JOB_BATCH_SIZE', 500))
+IMPORT_QUEUE_BATCHES = int(os.getenv('IMPORT_JOB_QUEUE_BATCHES', 4))
 
-def process_import_job(
+# Auto-mapping of common column names
+HEADER_ALIASES = {
+    'name': ['name', 'full_name', 'contact_name'],
+    'email': ['email', 'email_address', 'e_mail'],
+    'phone': ['phone', 'phone_number', 'mobile', 'tel'],
+    'company': ['company', 'company_name', 'organization'],
+    'role': ['role', 'title', 'job_title', 'position', 'designation'],
+    'linkedin': ['linkedin', 'linkedin_url', 'linkedin_profile'],
+    'industry': ['industry', 'sector'],
+    'city': ['city', 'location'],
+    'lead_source': ['lead_source', 'source', 'source_name'],
+}
+
+_END_OF_ROWS = object()
+
+
+def _map_header(value: Any, column_map: Dict[str, str]) -> str:
+    """Map a sheet header to a contact field (explicit column map first, then aliases)"""
+    header = str(value).strip() if value else ''
+    # Apply column mapping if provided
+    if column_map and header in column_map:
+        return column_map[header]
+    header_lower = header.lower().replace(' ', '_').replace('-', '_')
+    for field, aliases in HEADER_ALIASES.items():
+        if header_lower in aliases:
+            return field
+    return header
+
+
+def _normalize_row(contact_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Fill derived fields (domain from email, lead_source from sheet)"""
+    # Extract domain from email if not provided
+    if not contact_data.get('domain') and contact_data.get('email'):
+        contact_data['domain'] = resolve_best_domain(None, contact_data['email'])
+    
+    # Normalize lead_source
+    if contact_data.get('leadSource') and not contact_data.get('lead_source'):
+        contact_data['lead_source'] = contact_data['leadSource']
+    if not contact_data.get('lead_source') and not contact_data.get('leadSource') and contact_data.get('sheet'):
+        contact_data['lead_source'] = contact_data['sheet']
+    return contact_data
+
+
+def iter_positioned_rows(workbook, sheet_names: List[str], column_map: Dict[str, str],
+                         resume_after: Optional[Tuple[str, int]] = None) -> Iterator[Tuple[Tuple[str, int], Dict[str, Any]]]:
+    """
+    Stream normalized contact dicts with their sheet position
+    Args:
+        workbook: openpyxl workbook opened with read_only=True
+        sheet_names: Sheets to read
+        column_map: Header -> field mapping
+        resume_after: (sheet, row number) of the last committed row; rows up to and
+            including it (and earlier sheets) are skipped
+    Yields:
+        ((sheet name, row number), contact dict), one per non-empty row
+    """
+    skip_sheet, skip_row = resume_after or (None, 0)
+    if skip_sheet not in sheet_names:
+        skip_sheet = None
+    for sheet_name in sheet_names:
+        if skip_sheet is not None and sheet_name != skip_sheet:
+            continue
+        first_row = skip_row + 1 if skip_sheet is not None else 2
+        skip_sheet = None
+        
+        rows = workbook[sheet_name].iter_rows(values_only=True)
+        header_row = next(rows, None)
+        if not header_row:
+            continue
+        headers = [_map_header(value, column_map) for value in header_row]
+        
+        for row_number, values in enumerate(rows, start=2):
+            if row_number < first_row:
+                continue
+            contact_data = {}
+            for header, value in zip(headers, values):
+                if header and value:
+                    contact_data[header] = str(value).strip()
+            
+            # Skip empty rows
+            if not contact_data.get('name') and not contact_data.get('email') and not contact_data.get('phone'):
+                continue
+            
+            # Add sheet name
+            contact_data['sheet'] = sheet_name
+            yield (sheet_name, row_number), _normalize_row(contact_data)
+
+
+def iter_contact_rows(workbook, sheet_names: List[str], column_map: Dict[str, str]) -> Iterator[Dict[str, Any]]:
+    """
+    Stream normalized contact dicts from a read-only workbook
+    Args:
+        workbook: openpyxl workbook opened with read_only=True
+        sheet_names: Sheets to read
+        column_map: Header -> field mapping
+    Yields:
+        Contact dicts, one per non-empty row
+    """
+    for _, contact_data in iter_positioned_rows(workbook, sheet_names, column_map):
+        yield contact_data
+
+
+def _estimate_total_rows(workbook, sheet_names: List[str]) -> Optional[int]:
+    """Data rows according to the sheets' stored dimensions (None if unknown)"""
+    try:
+        total = 0
+        for sheet_name in sheet_names:
+            max_row = workbook[sheet_name].max_row
+            if max_row is None:
+                return None
+            total += max(max_row - 1, 0)
+        return total
+    except Exception:
+        return None
+
+
+def _produce_batches(rows: Iterator[Tuple[Tuple[str, int], Dict[str, Any]]], batches: queue.Queue,
+                     stop: threading.Event, batch_size: int):
+    """
+    Group streamed rows into (batch, position of its last row) items and hand them to
+    the writer (blocks when the queue is full)
+    """
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                batches.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    try:
+        batch = []
+        position = None
+        for position, row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                if not put((batch, position)):
+                    return
+                batch = []
+        if batch and not put((batch, position)):
+            return
+        put(_END_OF_ROWS)
+    except Exception as e:
+        logger.error(f"Error parsing import file: {e}", exc_info=True)
+        put(e)
+
+
+def _drop_seen(batch: List[Dict[str, Any]], seen: set) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Drop rows whose email or phone appeared earlier in the file (importOnlyNew)
+    Args:
+        batch: Rows of one batch, in file order
+        seen: Normalized emails/phones of the job's earlier rows (updated in place)
+    Returns:
+        Tuple of (remaining rows, number of rows dropped)
+    """
+    remaining = []
+    for row in batch:
+        keys = [k for k in (('email', normalize_email(row.get('email'))), ('phone', normalize_phone(row.get('phone')))) if k[1]]
+        if any(key in seen for key in keys):
+            continue
+        seen.update(keys)
+        remaining.append(row)
+    return remaining, len(batch) - len(remaining)
+
+
+def _mark_dropped(job_id: str, reason: str):
+    """Record an import job that left the queue without running to completion"""
+    supabase = get_supabase_client(current_app)
+    if not supabase:
+        return
+    if reason == 'cancelled':
+        _update_job_status(supabase, job_id, 'cancelled', completed_at=datetime.now(),
+                           progress_message='Import cancelled by user')
+        delete_job_file(supabase, _load_job_row(supabase, job_id).get('file_path'))
+    elif reason == 'expired':
+        _update_job_status(supabase, job_id, 'failed', completed_at=datetime.now(),
+                           progress_message='Import failed: no worker picked the job up in time (can be resumed)')
+    else:
+        # The stored file and checkpoint are kept so the job can be resumed
+        _update_job_status(supabase, job_id, 'failed', completed_at=datetime.now(),
+                           progress_message='Import failed: worker stopped responding (can be resumed)')
+
+
+def _mark_requeued(job_id: str):
+    """Record an import job handed back to the queue by a worker that shut down"""
+    supabase = get_supabase_client(current_app)
+    if not supabase:
+        return
+    # Resumes from its checkpoint on the next worker
+    _update_job_status(supabase, job_id, 'pending', progress_message='Import interrupted, waiting for a worker...')
+
+
+def _load_job_row(supabase, job_id: str) -> Dict[str, Any]:
+    """import_jobs row of a job ({} if missing)"""
+    try:
+        response = supabase.table('import_jobs').select('*').eq('id', job_id).limit(1).execute()
+        return response.data[0] if response.data else {}
+    except Exception as e:
+        logger.error(f"Error loading import job {job_id}: {e}")
+        return {}
+
+
+def enqueue_import_job(
     job_id: str,
     file_content: bytes,
     file_name: str,
     column_map: Dict[str, str],
-    options: Dict[str, Any],
-    app_context
+    options: Dict[str, Any]
 ):
     """
-    Process import job in background thread.
-    This function runs in a separate thread to avoid blocking the main request.
+    Store the uploaded file and queue an import job for a background worker (see app/jobs/queue.py)
+    Args:
+        job_id: ID of the job's import_jobs row
+        file_content: Uploaded Excel file
+        file_name: Uploaded file name
+        column_map: Header -> field mapping
+        options: Import options (updateExisting, importOnlyNew, selectedSheets)
+    """
+    payload = {
+        'file_name': file_name,
+        'column_map': column_map,
+        'options': options
+    }
+    supabase = get_supabase_client(current_app)
+    try:
+        file_path, content_hash = save_job_file(supabase, job_id, file_name, file_content)
+        supabase.table('import_jobs').update({
+            'file_path': file_path,
+            'file_hash': content_hash
+        }).eq('id', job_id).execute()
+        payload['file_path'] = file_path
+        enqueue_job(IMPORT_JOB_TYPE, payload, job_id=job_id)
+    except Exception as e:
+        # Still importable, just not resumable
+        logger.warning(f"Could not store file for import job {job_id}, queueing it inline: {e}")
+        enqueue_job(IMPORT_JOB_TYPE, payload, job_id=job_id, data=file_content)
+
+
+def resume_import_job(job_id: str) -> Tuple[bool, str]:
+    """
+    Re-queue an interrupted or failed import job; batches committed before its last
+    checkpoint are skipped
+    Args:
+        job_id: Import job ID
+    Returns:
+        Tuple of (resumed, message)
     """
-    def run_job():
-        supabase = None
+    supabase = get_supabase_client(current_app)
+    job = _load_job_row(supabase, job_id)
+    if not job:
+        return False, 'Job not found'
+    if job.get('status') in ('completed', 'cancelled'):
+        return False, f"Cannot resume job with status: {job.get('status')}"
+    if is_job_active(job_id):
+        return False, 'Job is already queued or running'
+    if not job.get('file_path'):
+        return False, 'The uploaded file was not stored for this job; please upload it again'
+    
+    options = job.get('options') or {}
+    checkpoint = job.get('checkpoint') or {}
+    _update_job_status(
+        supabase, job_id, 'pending',
+        progress_message=f"Resuming after {checkpoint.get('processed_records', 0)} contacts..."
+    )
+    enqueue_job(IMPORT_JOB_TYPE, {
+        'file_name': job.get('file_name'),
+        'column_map': options.get('columnMap') or {},
+        'options': options,
+        'file_path': job['file_path']
+    }, job_id=job_id)
+    return True, 'Job resumed'
+
+
+@register_job_type(IMPORT_JOB_TYPE, on_dropped=_mark_dropped, on_requeued=_mark_requeued)
+def run_import_job(ctx: JobContext):
+    """
+    Run an import job (job handler, called by a worker inside an app context)
+    Rows stream parse -> normalize -> upsert through a bounded queue: a parser
+    thread reads the sheets while this thread writes batches, so writes start
+    with the first batch and memory does not grow with the file's row count.
+    A checkpoint (file hash, sheet/row of the last committed row, counts) is recorded
+    after every batch (written with the coalesced progress updates, so a crash can
+    lose at most the last second of it), and a rerun of the job continues from it.
+    Cancellation is checked between batches.
+    """
+    job_id = ctx.job_id
+    column_map = ctx.payload.get('column_map') or {}
+    options = ctx.payload.get('options') or {}
+    file_path = ctx.payload.get('file_path')
+    supabase = None
+    stop_parsing = threading.Event()
+    counts = {}
+    try:
+        supabase = get_supabase_client(current_app)
+        if not supabase:
+            logger.error(f"Import job {job_id}: Supabase not configured")
+            return
+        ctx.check_cancelled()
+        
+        job = _load_job_row(supabase, job_id)
+        if job.get('status') in ('completed', 'cancelled'):
+            logger.info(f"Import job {job_id} already {job['status']}, nothing to do")
+            return
+        
+        file_content = load_job_file(supabase, file_path) if file_path else ctx.data
+        if file_content is None:
+            _update_job_status(supabase, job_id, 'failed', completed_at=datetime.now(),
+                               progress_message='Import failed: uploaded file is no longer available')
+            return
+        content_hash = file_hash(file_content)
+        
+        # Continue from the last checkpoint if it was taken on this exact file
+        checkpoint = job.get('checkpoint') or {}
+        if checkpoint and checkpoint.get('file_hash') != content_hash:
+            logger.warning(f"Import job {job_id} checkpoint does not match the stored file, starting over")
+            checkpoint = {}
+        resume_after = (checkpoint['sheet'], checkpoint['row']) if checkpoint.get('sheet') else None
+        
+        # Update job status to processing
+        _update_job_status(
+            supabase, job_id, 'processing', started_at=None if resume_after else datetime.now(),
+            progress_message=(f"Resuming at sheet '{resume_after[0]}' row {resume_after[1] + 1}..."
+                              if resume_after else 'Reading Excel file...')
+        )
+        
+        # Read Excel file
+        workbook = openpyxl.load_workbook(BytesIO(file_content), data_only=True, read_only=True)
+        
+        # Parse all sheets or selected sheets
+        selected_sheets = options.get('selectedSheets')
+        sheet_names = workbook.sheetnames
+        if selected_sheets:
+            selected_sheet_list = [s.strip() for s in selected_sheets.split(',')]
+            sheet_names = [s for s in sheet_names if s in selected_sheet_list]
+        
+        estimated_total = _estimate_total_rows(workbook, sheet_names)
+        batch_size = IMPORT_BATCH_SIZE
+        batches: queue.Queue = queue.Queue(maxsize=IMPORT_QUEUE_BATCHES)
+        parser = threading.Thread(
+            target=_produce_batches,
+            args=(iter_positioned_rows(workbook, sheet_names, column_map, resume_after), batches, stop_parsing, batch_size),
+            name=f'import-parser-{job_id}',
+            daemon=True
+        )
+        parser.start()
+        
+        _update_job_status(
+            supabase, job_id, 'processing',
+            total_records=estimated_total,
+            progress_message='Importing contacts...'
+        )
+        
+        # Process batches as they are parsed
+        import_only_new = options.get('importOnlyNew', False)
+        update_existing = options.get('updateExisting', False)
+        # Companies are resolved once per job, not once per batch
+        company_resolver = CompanyResolver(supabase)
+        
+        parsed_count = checkpoint.get('parsed_records', 0)
+        processed_count = checkpoint.get('processed_records', 0)
+        imported_count = checkpoint.get('imported_count', 0)
+        skipped_count = checkpoint.get('skipped_count', 0)
+        error_count = checkpoint.get('error_count', 0)
+        errors = job.get('error_details') if checkpoint else []
+        if isinstance(errors, str):
+            # Written as a JSON string by _update_job_status
+            try:
+                errors = json.loads(errors)
+            except ValueError:
+                errors = []
+        errors = list(errors or [])
+        batch_num = checkpoint.get('batch', 0)
+        
+        # importOnlyNew: normalized emails/phones of the rows parsed so far. Rows repeating
+        # one are skipped before their batch is submitted, in file order, so the result does
+        # not depend on whether the earlier batch was already written when the DB is checked
+        seen_in_file = set()
+        
+        def import_batch(item: Tuple[List[Dict[str, Any]], int]) -> Dict[str, Any]:
+            """Duplicate check + upsert of one batch (runs on the batch executor)"""
+            batch, skipped = item
+            # Check for duplicates if importOnlyNew is enabled
+            if import_only_new:
+                duplicates, batch = find_duplicates(supabase, batch)
+                skipped += len(duplicates)
+            if not batch:
+                return {'skipped': skipped, 'processed': 0, 'imported': 0, 'errors': []}
+            result = upsert_contacts(supabase, batch, {
+                'updateExisting': update_existing,
+                'company_resolver': company_resolver
+            })
+            return {
+                'skipped': skipped, 'processed': len(batch),
+                'imported': result.get('imported', 0), 'errors': result.get('errors', [])
+            }
+        
+        def record_batch(tag: Tuple[int, Tuple[str, int], int, int, int], result: Optional[Dict[str, Any]],
+                         error: Optional[BaseException]):
+            """Add a finished batch to the counts and checkpoint (called in batch order)"""
+            nonlocal processed_count, imported_count, skipped_count, error_count, counts
+            done_batch, position, batch_parsed, batch_rows, batch_skipped = tag
+            errors_before = len(errors)
+            if error is not None:
+                # A failing batch only fails its own rows
+                logger.error(f"Error processing batch {done_batch}: {error}")
+                result = {
+                    'skipped': batch_skipped, 'processed': batch_rows, 'imported': 0, 'failed': batch_rows,
+                    'errors': [{'batch': done_batch, 'message': str(error)}]
+                }
+            batch_errors = result['errors']
+            
+            skipped_count += result['skipped']
+            processed_count += result['processed']
+            imported_count += result['imported']
+            error_count += result.get('failed', len(batch_errors))
+            if len(errors) < 100:
+                errors.extend(batch_errors)
+            
+            counts = {
+                'processed_records': processed_count,
+                'imported_count': imported_count,
+                'error_count': error_count,
+                'skipped_count': skipped_count
+            }
+            # This batch and every batch before it are committed: a rerun starts after its last row
+            _update_job_status(
+                supabase, job_id, 'processing',
+                error_details=errors[:100] if len(errors) != errors_before else None,
+                checkpoint={
+                    'file_hash': content_hash,
+                    'sheet': position[0],
+                    'row': position[1],
+                    'batch': done_batch,
+                    'parsed_records': batch_parsed,
+                    **counts
+                },
+                **counts
+            )
+        
+        # Batches are written concurrently (IMPORT_JOB_CONCURRENCY per job, capped process-wide)
+        # and accounted for in order
+        executor = OrderedBatchExecutor(import_batch, name=f'import-{job_id[:8]}')
         try:
-            # Get Flask app context
-            with app_context:
-                supabase = get_supabase_client(app_context.app)
-                if not supabase:
-                    _update_job_status(supabase, job_id, 'failed', progress_message='Supabase not configured')
-                    return
-                
-                # Update job status to processing
-                _update_job_status(supabase, job_id, 'processing', started_at=datetime.now(), progress_message='Reading Excel file...')
-                
-                # Read Excel file
-                workbook = openpyxl.load_workbook(BytesIO(file_content), data_only=True, read_only=True)
+            while True:
+                item = batches.get()
+                if item is _END_OF_ROWS:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                ctx.check_cancelled()
+                batch, position = item
+                batch_num += 1
+                parsed_count += len(batch)
                 
-                # Parse all sheets or selected sheets
-                selected_sheets = options.get('selectedSheets')
-                sheet_names = workbook.sheetnames
-                if selected_sheets:
-                    selected_sheet_list = [s.strip() for s in selected_sheets.split(',')]
-                    sheet_names = [s for s in sheet_names if s in selected_sheet_list]
-                
-                # Collect all contacts
-                all_contacts = []
-                total_rows = 0
-                
-                for sheet_name in sheet_names:
-                    sheet = workbook[sheet_name]
-                    
-                    # Get headers from first row
-                    headers = []
-                    header_row = next(sheet.iter_rows(min_row=1, max_row=1, values_only=False), None)
-                    if not header_row:
-                        continue
-                    
-                    for cell in header_row:
-                        header = str(cell.value).strip() if cell.value else ''
-                        # Apply column mapping if provided
-                        if column_map and header in column_map:
-                            header = column_map[header]
-                        else:
-                            # Auto-map common column names
-                            header_lower = header.lower().replace(' ', '_').replace('-', '_')
-                            if header_lower in ['name', 'full_name', 'contact_name']:
-                                header = 'name'
-                            elif header_lower in ['email', 'email_address', 'e_mail']:
-                                header = 'email'
-                            elif header_lower in ['phone', 'phone_number', 'mobile', 'tel']:
-                                header = 'phone'
-                            elif header_lower in ['company', 'company_name', 'organization']:
-                                header = 'company'
-                            elif header_lower in ['role', 'title', 'job_title', 'position', 'designation']:
-                                header = 'role'
-                            elif header_lower in ['linkedin', 'linkedin_url', 'linkedin_profile']:
-                                header = 'linkedin'
-                            elif header_lower in ['industry', 'sector']:
-                                header = 'industry'
-                            elif header_lower in ['city', 'location']:
-                                header = 'city'
-                            elif header_lower in ['lead_source', 'source', 'source_name']:
-                                header = 'lead_source'
-                        headers.append(header)
-                    
-                    # Parse rows using iterator for memory efficiency
-                    _update_job_status(supabase, job_id, 'processing', progress_message=f'Parsing sheet: {sheet_name}...')
-                    
-                    row_count = 0
-                    for row in sheet.iter_rows(min_row=2, values_only=False):
-                        contact_data = {}
-                        for idx, cell in enumerate(row):
-                            if idx < len(headers) and headers[idx] and cell.value:
-                                contact_data[headers[idx]] = str(cell.value).strip()
-                        
-                        # Skip empty rows
-                        if not contact_data.get('name') and not contact_data.get('email') and not contact_data.get('phone'):
-                            continue
-                        
-                        # Add sheet name
-                        contact_data['sheet'] = sheet_name
-                        all_contacts.append(contact_data)
-                        row_count += 1
-                        total_rows += 1
-                        
-                        # Update progress every 100 rows
-                        if row_count % 100 == 0:
-                            _update_job_status(
-                                supabase, job_id, 'processing',
-                                processed_records=len(all_contacts),
-                                progress_message=f'Parsed {len(all_contacts)} contacts from {sheet_name}...'
-                            )
-                
-                workbook.close()
-                
-                if not all_contacts:
-                    _update_job_status(supabase, job_id, 'failed', progress_message='No contacts found in Excel file')
-                    return
-                
-                # Normalize rows
-                _update_job_status(supabase, job_id, 'processing', total_records=len(all_contacts), progress_message='Normalizing contact data...')
-                normalized_rows = []
-                for row in all_contacts:
-                    normalized = {**row}
-                    
-                    # Extract domain from email if not provided
-                    if not normalized.get('domain') and normalized.get('email'):
-                        normalized['domain'] = resolve_best_domain(None, normalized['email'])
-                    
-                    # Normalize lead_source
-                    if normalized.get('leadSource') and not normalized.get('lead_source'):
-                        normalized['lead_source'] = normalized['leadSource']
-                    if not normalized.get('lead_source') and not normalized.get('leadSource') and normalized.get('sheet'):
-                        normalized['lead_source'] = normalized['sheet']
-                    
-                    normalized_rows.append(normalized)
-                
-                # Check for duplicates if importOnlyNew is enabled
-                import_only_new = options.get('importOnlyNew', False)
-                if import_only_new:
-                    _update_job_status(supabase, job_id, 'processing', progress_message='Checking for duplicates...')
-                    duplicates, uniques = find_duplicates(supabase, normalized_rows)
-                    rows_to_import = uniques
-                    skipped_count = len(duplicates)
-                    logger.info(f"Import only new: {len(uniques)} new contacts, skipping {len(duplicates)} duplicates")
-                else:
-                    rows_to_import = normalized_rows
-                    skipped_count = 0
-                
-                # Update total records
                 _update_job_status(
                     supabase, job_id, 'processing',
-                    total_records=len(rows_to_import),
-                    skipped_count=skipped_count,
-                    progress_message=f'Starting import of {len(rows_to_import)} contacts...'
-                )
-                
-                # Process in batches with progress updates
-                update_existing = options.get('updateExisting', False)
-                batch_size = 100  # Process 100 contacts per batch
-                total_batches = (len(rows_to_import) + batch_size - 1) // batch_size
-                
-                imported_count = 0
-                error_count = 0
-                errors = []
-                
-                for batch_idx in range(0, len(rows_to_import), batch_size):
-                    batch = rows_to_import[batch_idx:batch_idx + batch_size]
-                    batch_num = (batch_idx // batch_size) + 1
-                    
-                    _update_job_status(
-                        supabase, job_id, 'processing',
-                        processed_records=batch_idx,
-                        progress_message=f'Processing batch {batch_num}/{total_batches} ({len(batch)} contacts)...'
-                    )
-                    
-                    try:
-                        result = upsert_contacts(supabase, batch, {'updateExisting': update_existing})
-                        batch_imported = result.get('imported', 0)
-                        batch_errors = result.get('errors', [])
-                        
-                        imported_count += batch_imported
-                        error_count += len(batch_errors)
-                        errors.extend(batch_errors)
-                        
-                    except Exception as batch_error:
-                        logger.error(f"Error processing batch {batch_num}: {batch_error}")
-                        error_count += len(batch)
-                        errors.append({
-                            'batch': batch_num,
-                            'message': str(batch_error)
-                        })
-                
-                # Final status update
-                _update_job_status(
-                    supabase, job_id, 'completed',
-                    processed_records=len(rows_to_import),
-                    imported_count=imported_count,
-                    error_count=error_count,
-                    completed_at=datetime.now(),
-                    error_details=errors[:100],  # Limit to first 100 errors
-                    progress_message=f'Import completed: {imported_count} imported, {error_count} errors, {skipped_count} skipped'
-                )
-                
-                logger.info(f"Import job {job_id} completed: {imported_count} imported, {error_count} errors")
-                
-        except Exception as e:
-            logger.error(f"Error processing import job {job_id}: {e}", exc_info=True)
-            if supabase:
-                _update_job_status(
-                    supabase, job_id, 'failed',
-                    error_count=1,
-                    error_details=[{'message': str(e)}],
-                    completed_at=datetime.now(),
-                    progress_message=f'Import failed: {str(e)}'
+                    progress_message=f'Processing batch {batch_num} ({len(batch)} contacts, {parsed_count} parsed so far)...'
                 )
+                skipped_in_file = 0
+                if import_only_new:
+                    batch, skipped_in_file = _drop_seen(batch, seen_in_file)
+                tag = (batch_num, position, parsed_count, len(batch), skipped_in_file)
+                for outcome in executor.submit(tag, (batch, skipped_in_file)):
+                    record_batch(*outcome)
+            
+            for outcome in executor.finish():
+                record_batch(*outcome)
         finally:
-            # Remove from active jobs
-            if job_id in _active_jobs:
-                del _active_jobs[job_id]
-    
-    # Start job in background thread
-    thread = threading.Thread(target=run_job, daemon=True)
-    thread.start()
-    _active_jobs[job_id] = thread
+            executor.close()
+        
+        workbook.close()
+        
+        if parsed_count == 0:
+            _update_job_status(supabase, job_id, 'failed', progress_message='No contacts found in Excel file')
+            return
+        
+        if import_only_new:
+            logger.info(f"Import only new: {parsed_count - skipped_count} new contacts, skipped {skipped_count} duplicates")
+        
+        # Final status update
+        _update_job_status(
+            supabase, job_id, 'completed',
+            total_records=processed_count,
+            processed_records=processed_count,
+            imported_count=imported_count,
+            error_count=error_count,
+            skipped_count=skipped_count,
+            completed_at=datetime.now(),
+            error_details=errors[:100],  # Limit to first 100 errors
+            progress_message=f'Import completed: {imported_count} imported, {error_count} errors, {skipped_count} skipped'
+        )
+        delete_job_file(supabase, file_path)
+        
+        logger.info(f"Import job {job_id} completed: {imported_count} imported, {error_count} errors")
+        
+    except JobCancelled:
+        # Interrupted: the worker is shutting down (the queue calls _mark_requeued once
+        # the job is back on the queue) or lost the lease (another worker may already
+        # run the job); either way this copy must not touch the job row
+        if not ctx.interrupted:
+            _update_job_status(
+                supabase, job_id, 'cancelled',
+                completed_at=datetime.now(),
+                progress_message=f"Import cancelled by user after {counts.get('processed_records', 0)} contacts",
+                **counts
+            )
+            delete_job_file(supabase, file_path)
+        raise
+    except Exception as e:
+        logger.error(f"Error processing import job {job_id}: {e}", exc_info=True)
+        if supabase:
+            # The checkpoint is kept so the job can be resumed
+            _update_job_status(
+                supabase, job_id, 'failed',
+                error_count=1,
+                error_details=[{'message': str(e)}],
+                completed_at=datetime.now(),
+                progress_message=f'Import failed: {str(e)}'
+            )
+    finally:
+        # Unblock the parser if the writer stopped early
+        stop_parsing.set()
 
 
 def _update_job_status(
@@ -244,9 +565,14 @@ def _update_job_status(
     error_details: Optional[List] = None,
     started_at: Optional[datetime] = None,
     completed_at: Optional[datetime] = None,
-    progress_message: Optional[str] = None
+    progress_message: Optional[str] = None,
+    checkpoint: Optional[Dict[str, Any]] = None
 ):
-    """Update job status in database"""
+    """
+    Update job status in database (with the resume checkpoint, if given)
+    Progress updates go through the job progress bus, which writes them at most once
+    per JOB_PROGRESS_WRITE_INTERVAL; status changes are written immediately
+    """
     try:
         update_data = {'status': status}
         
@@ -261,7 +587,6 @@ def _update_job_status(
         if skipped_count is not None:
             update_data['skipped_count'] = skipped_count
         if error_details is not None:
-            import json
             update_data['error_details'] = json.dumps(error_details)
         if started_at:
             update_data['started_at'] = started_at.isoformat()
@@ -269,47 +594,21 @@ def _update_job_status(
             update_data['completed_at'] = completed_at.isoformat()
         if progress_message:
             update_data['progress_message'] = progress_message
+        if checkpoint is not None:
+            update_data['checkpoint'] = checkpoint
         
-        supabase.table('import_jobs').update(update_data).eq('id', job_id).execute()
+        # Coalesced to at most one write per second per job, and pushed to SSE listeners
+        get_progress_bus().publish(supabase, job_id, update_data)
     except Exception as e:
         logger.error(f"Error updating job status for {job_id}: {e}")
 
 
-def cancel_job(job_id: str):
-    """Cancel a running import job"""
-    if job_id in _active_jobs:
-        # Mark as cancelled in database
-        # Note: We can't actually stop the thread, but we can mark it
-        try:
-            from app.supabase_client import get_supabase_client
-            from flask import current_app
-            supabase = get_supabase_client(current_app)
-            if supabase:
-                supabase.table('import_jobs').update({
-                    'status': 'cancelled',
-                    'progress_message': 'Import cancelled by user'
-                }).eq('id', job_id).execute()
-        except:
-            pass
-        return True
-    return False
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
+def cancel_job(job_id: str) -> bool:
+    """
+    Cancel an import job
+    A queued job is marked cancelled right away; a running job stops before its next
+    batch and records the counts imported so far
+    Returns:
+        True if the job was queued or running
+    """
+    return cancel_queued_job(job_id)
@@ -0,0 +1,58 @@
+"""Durable hand-off of pending LinkedIn enrichment (runs on the job queue in app/jobs/queue.py)"""
+import os
+import logging
+from flask import current_app
+from typing import Any, Dict, List
+from app.supabase_client import get_supabase_client
+from app.jobs.queue import JobContext, enqueue_job, register_job_type, is_durable
+from app.services.linkedin_enrichment import get_linkedin_enrichment_queue
+
+logger = logging.getLogger(__name__)
+
+LINKEDIN_ENRICHMENT_JOB_TYPE = 'linkedin_enrichment'
+
+# Contacts per queued hand-off job
+LINKEDIN_ENRICHMENT_JOB_SIZE = int(os.getenv('LINKEDIN_ENRICHMENT_JOB_SIZE', 1000))
+
+
+def drain_linkedin_enrichment(timeout: float) -> int:
+    """
+    Finish this process's pending LinkedIn enrichment before it exits
+    Contacts still queued after timeout seconds are queued as durable jobs, so
+    another worker enriches them
+    Args:
+        timeout: Seconds to keep enriching locally
+    Returns:
+        Number of contacts handed to the job queue
+    """
+    remaining = get_linkedin_enrichment_queue().drain(timeout)
+    if not remaining:
+        return 0
+    if not is_durable():
+        logger.warning(f"Redis job queue unavailable, {len(remaining)} contacts will not be enriched from LinkedIn")
+        return 0
+    handed_off = 0
+    for start in range(0, len(remaining), LINKEDIN_ENRICHMENT_JOB_SIZE):
+        chunk = remaining[start:start + LINKEDIN_ENRICHMENT_JOB_SIZE]
+        try:
+            enqueue_job(LINKEDIN_ENRICHMENT_JOB_TYPE, {'contacts': chunk})
+            handed_off += len(chunk)
+        except Exception as e:
+            logger.error(f"Could not queue LinkedIn enrichment of {len(chunk)} contacts: {e}")
+    logger.info(f"Queued LinkedIn enrichment of {handed_off} contacts for another worker")
+    return handed_off
+
+
+@register_job_type(LINKEDIN_ENRICHMENT_JOB_TYPE)
+def run_linkedin_enrichment_job(ctx: JobContext):
+    """
+    Put handed-off contacts back on this process's enrichment pool (job handler)
+    If this worker shuts down before they are enriched, its drain hands them off again
+    """
+    contacts: List[Dict[str, Any]] = ctx.payload.get('contacts') or []
+    supabase = get_supabase_client(current_app)
+    if not supabase:
+        logger.error(f"Job {ctx.job_id}: Supabase not configured, {len(contacts)} contacts not enriched")
+        return
+    queued = get_linkedin_enrichment_queue().submit(supabase, contacts)
+    logger.info(f"Job {ctx.job_id}: queued LinkedIn enrichment of {queued} contacts")
@@ -0,0 +1,241 @@
+"""
+Job progress bus
+Coalesces a job's status updates so import_jobs is written at most once per
+JOB_PROGRESS_WRITE_INTERVAL per job (status changes and final states are
+written immediately), and pushes every update to listeners: the Redis channel
+jobs:progress:<id> when Redis is available, plus subscribers in this process.
+GET /api/jobs/<id>/events streams these updates to the browser.
+"""
+import os
+import json
+import time
+import queue
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+from app.integrations import redis_client as redis_store
+
+logger = logging.getLogger(__name__)
+
+JOB_PROGRESS_WRITE_INTERVAL = float(os.getenv('JOB_PROGRESS_WRITE_INTERVAL', 1.0))
+# Latest snapshot kept in Redis for clients that connect mid-job
+_SNAPSHOT_TTL = 3600
+
+FINAL_STATUSES = ('completed', 'failed', 'cancelled')
+# Row fields sent to listeners (error_details and checkpoint stay in the database)
+EVENT_FIELDS = (
+    'status', 'total_records', 'processed_records', 'imported_count', 'error_count',
+    'skipped_count', 'progress_message', 'started_at', 'completed_at'
+)
+
+
+def progress_channel(job_id: str) -> str:
+    return f"jobs:progress:{job_id}"
+
+
+def _snapshot_key(job_id: str) -> str:
+    return f"jobs:progress:last:{job_id}"
+
+
+class _PendingWrite:
+    """Unwritten row changes of one job"""
+
+    def __init__(self, supabase, table: str):
+        self.supabase = supabase
+        self.table = table
+        self.fields: Dict[str, Any] = {}
+        self.status: Optional[str] = None  # Status last written
+        self.last_write = 0.0
+        # Held while taking and writing fields, so writes land in publish order
+        self.write_lock = threading.Lock()
+
+
+class JobProgressBus:
+    """Coalescing writer and in-process fan-out for job progress updates"""
+
+    def __init__(self, write_interval: float = JOB_PROGRESS_WRITE_INTERVAL):
+        self.write_interval = write_interval
+        self._pending: Dict[str, _PendingWrite] = {}
+        self._subscribers: Dict[str, List[queue.Queue]] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._flusher = None
+
+    def publish(self, supabase, job_id: str, update: Dict[str, Any], table: str = 'import_jobs'):
+        """
+        Record a job update
+        Args:
+            supabase: Supabase client used for the (coalesced) row write
+            job_id: Job ID
+            update: Changed row fields; later values of a field replace earlier ones
+            table: Job status table
+        """
+        now = time.monotonic()
+        with self._lock:
+            pending = self._pending.get(job_id)
+            if pending is None:
+                pending = self._pending[job_id] = _PendingWrite(supabase, table)
+            pending.fields.update(update)
+            status = update.get('status')
+            urgent = (status in FINAL_STATUSES or (status is not None and status != pending.status)
+                      or now - pending.last_write >= self.write_interval)
+            if status is not None:
+                pending.status = status
+            if status in FINAL_STATUSES:
+                del self._pending[job_id]
+            elif not urgent:
+                self._start_flusher()
+                self._wakeup.notify()
+
+        if urgent:
+            self._drain(job_id, pending)
+        self._notify(job_id, update)
+
+    def flush(self, job_id: Optional[str] = None):
+        """Write pending updates now (of one job, or all jobs)"""
+        with self._lock:
+            pending_jobs = [(i, p) for i, p in self._pending.items() if job_id is None or i == job_id]
+        for pending_id, pending in pending_jobs:
+            self._drain(pending_id, pending)
+
+    def _drain(self, job_id: str, pending: _PendingWrite):
+        """Write a job's unwritten fields"""
+        with pending.write_lock:
+            with self._lock:
+                fields, pending.fields = pending.fields, {}
+                pending.last_write = time.monotonic()
+            if fields:
+                self._write(pending.supabase, pending.table, job_id, fields)
+
+    def subscribe(self, job_id: str) -> queue.Queue:
+        """Queue receiving this process's updates of a job (call unsubscribe when done)"""
+        events: queue.Queue = queue.Queue(maxsize=100)
+        with self._lock:
+            self._subscribers.setdefault(job_id, []).append(events)
+        return events
+
+    def unsubscribe(self, job_id: str, events: queue.Queue):
+        with self._lock:
+            subscribers = self._subscribers.get(job_id, [])
+            if events in subscribers:
+                subscribers.remove(events)
+            if not subscribers:
+                self._subscribers.pop(job_id, None)
+
+    def _write(self, supabase, table: str, job_id: str, fields: Dict[str, Any]):
+        try:
+            supabase.table(table).update(fields).eq('id', job_id).execute()
+        except Exception as e:
+            logger.error(f"Error updating job status for {job_id}: {e}")
+
+    def _notify(self, job_id: str, update: Dict[str, Any]):
+        event = {k: v for k, v in update.items() if k in EVENT_FIELDS}
+        if not event:
+            return
+        with self._lock:
+            subscribers = list(self._subscribers.get(job_id, []))
+        for events in subscribers:
+            try:
+                events.put_nowait(event)
+            except queue.Full:
+                pass  # Slow listener; it still gets later updates
+        if redis_store.REDIS_AVAILABLE:
+            try:
+                payload = json.dumps(event, default=str)
+                pipe = redis_store.redis_client.pipeline()
+                pipe.hset(_snapshot_key(job_id), mapping={k: json.dumps(v, default=str) for k, v in event.items()})
+                pipe.expire(_snapshot_key(job_id), _SNAPSHOT_TTL)
+                pipe.publish(progress_channel(job_id), payload)
+                pipe.execute()
+            except Exception as e:
+                logger.debug(f"Job progress publish error: {e}")
+
+    def _start_flusher(self):
+        # Called with self._lock held
+        if self._flusher is None:
+            self._flusher = threading.Thread(target=self._flush_loop, name='job-progress-flusher', daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self):
+        while True:
+            with self._lock:
+                while not any(p.fields for p in self._pending.values()):
+                    self._wakeup.wait()
+                now = time.monotonic()
+                due = [p.last_write + self.write_interval - now for p in self._pending.values() if p.fields]
+                delay = max(0.0, min(due))
+                if delay > 0:
+                    self._wakeup.wait(delay)
+                    continue
+                ready = [(job_id, p) for job_id, p in self._pending.items()
+                         if p.fields and now - p.last_write >= self.write_interval]
+            for job_id, pending in ready:
+                self._drain(job_id, pending)
+
+
+def get_job_snapshot(job_id: str) -> Dict[str, Any]:
+    """Latest published progress of a job from Redis ({} if unknown)"""
+    if not redis_store.REDIS_AVAILABLE:
+        return {}
+    try:
+        raw = redis_store.redis_client.hgetall(_snapshot_key(job_id))
+        return {k: json.loads(v) for k, v in raw.items()}
+    except Exception:
+        return {}
+
+
+class ProgressSubscription:
+    """Progress updates of one job: Redis pub/sub when available, else this process's bus"""
+
+    def __init__(self, job_id: str, bus: JobProgressBus):
+        self.job_id = job_id
+        self._bus = bus
+        self._pubsub = None
+        self._events = None
+        if redis_store.REDIS_AVAILABLE:
+            try:
+                self._pubsub = redis_store.redis_client.pubsub(ignore_subscribe_messages=True)
+                self._pubsub.subscribe(progress_channel(job_id))
+                return
+            except Exception as e:
+                logger.warning(f"Job progress subscribe error, using in-process updates only: {e}")
+                self._pubsub = None
+        self._events = bus.subscribe(job_id)
+
+    def get(self, timeout: float = 1.0) -> Optional[Dict[str, Any]]:
+        """Next update (changed fields), or None after timeout seconds without one"""
+        if self._pubsub is not None:
+            message = self._pubsub.get_message(timeout=timeout)
+            if message and message.get('type') == 'message':
+                return json.loads(message['data'])
+            return None
+        try:
+            return self._events.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        if self._pubsub is not None:
+            try:
+                self._pubsub.close()
+            except Exception:
+                pass
+        if self._events is not None:
+            self._bus.unsubscribe(self.job_id, self._events)
+
+
+def subscribe_job_progress(job_id: str) -> ProgressSubscription:
+    """Subscribe to a job's progress updates (close() the subscription when done)"""
+    return ProgressSubscription(job_id, get_progress_bus())
+
+
+_progress_bus = None
+
+
+def get_progress_bus() -> JobProgressBus:
+    """Get the process-wide progress bus"""
+    global _progress_bus
+    if _progress_bus is None:
+        _progress_bus = JobProgressBus()
+    return _progress_bus
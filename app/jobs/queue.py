@@ -0,0 +1,546 @@
+"""
+Durable background job queue
+Jobs are queued in Redis and run by worker threads, either embedded in the web
+process (JOB_EMBEDDED_WORKERS) or in a dedicated worker process
+(scripts/run_job_worker.py). A claimed job holds a lease that its worker renews
+with heartbeats; jobs whose lease expired (worker crashed or restarted) are put
+back on the queue. Cancellation is cooperative: handlers call
+JobContext.check_cancelled() between units of work.
+Without Redis (or with JOB_QUEUE_BACKEND=thread) jobs run in a daemon thread of
+the process that queued them, as before.
+"""
+import os
+import json
+import time
+import uuid
+import socket
+import logging
+import importlib
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from app.integrations import redis_client as redis_store
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUE_BACKEND = os.getenv('JOB_QUEUE_BACKEND', 'redis').lower()  # 'redis' or 'thread'
+# Worker threads of a dedicated worker process
+JOB_WORKER_CONCURRENCY = int(os.getenv('JOB_WORKER_CONCURRENCY', 2))
+# Worker threads started inside each web process (0 when dedicated workers are deployed)
+JOB_EMBEDDED_WORKERS = int(os.getenv('JOB_EMBEDDED_WORKERS', 1))
+JOB_LEASE_SECONDS = int(os.getenv('JOB_LEASE_SECONDS', 60))
+JOB_HEARTBEAT_SECONDS = int(os.getenv('JOB_HEARTBEAT_SECONDS', 15))
+# Claims per job before an expired lease marks it failed instead of requeueing it
+JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', 3))
+# Queued jobs (and their uploaded data) expire if no worker picks them up
+JOB_DATA_TTL = int(os.getenv('JOB_DATA_TTL', 7 * 86400))
+
+# Modules that register job types (imported by workers before claiming jobs)
+JOB_MODULES = ('app.jobs.import_job', 'app.jobs.linkedin_enrichment_job')
+
+QUEUE_KEY = 'jobs:queue'
+PROCESSING_KEY = 'jobs:processing'
+# job_id -> job type of every queued or running job; unlike the job record it does not
+# expire, so a job whose record expired can still be reported to its type's on_dropped
+TYPES_KEY = 'jobs:types'
+_POLL_INTERVAL = 1.0
+
+
+def _job_key(job_id: str) -> str:
+    return f"jobs:job:{job_id}"
+
+
+def _data_key(job_id: str) -> str:
+    return f"jobs:data:{job_id}"
+
+
+def _lease_key(job_id: str) -> str:
+    return f"jobs:lease:{job_id}"
+
+
+def _cancel_key(job_id: str) -> str:
+    return f"jobs:cancel:{job_id}"
+
+
+# Move the next job to the processing list and take its lease in one step, so the
+# reaper never sees a claimed job without a lease. The caller peeks at the job first
+# so that its lease and record keys are passed in KEYS (required by Redis Cluster and
+# proxies); if another worker claimed that job in between, nothing happens. The
+# attempt count is only bumped while the job record exists, so an expired record is
+# not recreated without its type and TTL.
+_CLAIM_SCRIPT = """
+if redis.call('lindex', KEYS[1], -1) ~= ARGV[3] then return false end
+redis.call('rpoplpush', KEYS[1], KEYS[2])
+redis.call('set', KEYS[3], ARGV[1], 'EX', ARGV[2])
+if redis.call('exists', KEYS[4]) == 1 then
+  redis.call('hincrby', KEYS[4], 'attempts', 1)
+end
+return ARGV[3]
+"""
+# Renew a lease only while this worker still holds it
+_RENEW_LEASE_SCRIPT = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('expire', KEYS[1], ARGV[2]) else return 0 end"
+_RELEASE_LEASE_SCRIPT = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) else return 0 end"
+
+
+class JobCancelled(Exception):
+    """Raised by JobContext.check_cancelled() once a job has been cancelled"""
+
+
+class JobType:
+    """A registered job handler and its hooks"""
+
+    def __init__(self, name: str, handler: Callable[['JobContext'], None],
+                 on_dropped: Optional[Callable[[str, str], None]] = None,
+                 on_requeued: Optional[Callable[[str], None]] = None):
+        self.name = name
+        self.handler = handler
+        self.on_dropped = on_dropped
+        self.on_requeued = on_requeued
+
+
+_job_types: Dict[str, JobType] = {}
+
+
+def register_job_type(name: str, on_dropped: Optional[Callable[[str, str], None]] = None,
+                      on_requeued: Optional[Callable[[str], None]] = None):
+    """
+    Register a job handler
+    Args:
+        name: Job type name used by enqueue_job
+        on_dropped: Called as on_dropped(job_id, reason) inside an app context when a job
+            leaves the queue without its handler finishing ('cancelled' before it started,
+            'abandoned' after its lease expired JOB_MAX_ATTEMPTS times, or 'expired' when
+            its record expired before a worker ran it)
+        on_requeued: Called as on_requeued(job_id) inside an app context after a worker
+            that was shutting down handed the job back to the queue. Not called when a
+            worker lost the job's lease: the job may already run on another worker, so
+            the stopped copy must leave the job's state alone.
+    Returns:
+        Decorator for handler(ctx: JobContext)
+    """
+    def decorator(handler: Callable[['JobContext'], None]):
+        _job_types[name] = JobType(name, handler, on_dropped, on_requeued)
+        return handler
+    return decorator
+
+
+class JobContext:
+    """What a job handler gets: payload, uploaded data and cancellation state"""
+
+    def __init__(self, job_id: str, job_type: str, payload: Dict[str, Any], attempt: int = 1,
+                 data: Optional[bytes] = None):
+        self.job_id = job_id
+        self.job_type = job_type
+        self.payload = payload
+        self.attempt = attempt
+        self._data = data
+        self._cancelled = threading.Event()
+        self.interrupted = False
+
+    @property
+    def data(self) -> Optional[bytes]:
+        """Binary data queued with the job (loaded from Redis on first access)"""
+        if self._data is None and redis_store.REDIS_AVAILABLE:
+            self._data = redis_store.redis_binary_client.get(_data_key(self.job_id))
+        return self._data
+
+    def cancel(self, interrupted: bool = False):
+        """
+        Stop the job at its next check_cancelled()
+        Args:
+            interrupted: The worker is shutting down or lost the job's lease; the job
+                will run again (possibly already elsewhere), so handlers should exit
+                without recording anything; see register_job_type's on_requeued
+        """
+        self.interrupted = self.interrupted or interrupted
+        self._cancelled.set()
+
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def check_cancelled(self):
+        """Raise JobCancelled if the job was cancelled (call between units of work)"""
+        if self._cancelled.is_set():
+            raise JobCancelled(self.job_id)
+
+
+# Contexts of jobs running in this process, so cancel_job reaches them immediately
+_running: Dict[str, JobContext] = {}
+_running_lock = threading.Lock()
+
+
+def is_durable() -> bool:
+    """Whether jobs go through the Redis queue (False: in-process threads)"""
+    return JOB_QUEUE_BACKEND == 'redis' and redis_store.REDIS_AVAILABLE
+
+
+def _run_handler(app, ctx: JobContext):
+    """Run a job's handler in an app context (JobCancelled and errors are logged, not raised)"""
+    job_type = _job_types.get(ctx.job_type)
+    if job_type is None:
+        logger.error(f"Unknown job type '{ctx.job_type}' for job {ctx.job_id}")
+        return
+    with _running_lock:
+        _running[ctx.job_id] = ctx
+    try:
+        with app.app_context():
+            job_type.handler(ctx)
+    except JobCancelled:
+        logger.info(f"Job {ctx.job_id} ({ctx.job_type}) cancelled")
+    except Exception as e:
+        logger.error(f"Job {ctx.job_id} ({ctx.job_type}) failed: {e}", exc_info=True)
+    finally:
+        with _running_lock:
+            _running.pop(ctx.job_id, None)
+
+
+def _drop(app, job_id: str, job_type_name: Optional[str], reason: str):
+    job_type = _job_types.get(job_type_name or '')
+    if job_type is None or job_type.on_dropped is None:
+        return
+    try:
+        with app.app_context():
+            job_type.on_dropped(job_id, reason)
+    except Exception as e:
+        logger.error(f"Error handling dropped job {job_id} ({reason}): {e}")
+
+
+def _requeued(app, job_id: str, job_type_name: Optional[str]):
+    job_type = _job_types.get(job_type_name or '')
+    if job_type is None or job_type.on_requeued is None:
+        return
+    try:
+        with app.app_context():
+            job_type.on_requeued(job_id)
+    except Exception as e:
+        logger.error(f"Error handling requeued job {job_id}: {e}")
+
+
+def enqueue_job(job_type: str, payload: Dict[str, Any], job_id: Optional[str] = None,
+                data: Optional[bytes] = None, app=None) -> str:
+    """
+    Queue a job
+    Args:
+        job_type: Registered job type
+        payload: JSON-serializable job arguments
+        job_id: Job ID (default: new UUID); usually the ID of the job's status row
+        data: Optional binary data (e.g. an uploaded file)
+        app: Flask app for the thread fallback (default: current_app)
+    Returns:
+        Job ID
+    """
+    job_id = job_id or str(uuid.uuid4())
+    if job_type not in _job_types:
+        raise ValueError(f"Unknown job type: {job_type}")
+
+    if is_durable():
+        try:
+            pipe = redis_store.redis_client.pipeline()
+            pipe.hset(_job_key(job_id), mapping={
+                'type': job_type,
+                'payload': json.dumps(payload),
+                'attempts': 0,
+                'enqueued_at': datetime.now().isoformat()
+            })
+            pipe.expire(_job_key(job_id), JOB_DATA_TTL)
+            pipe.hset(TYPES_KEY, job_id, job_type)
+            pipe.execute()
+            if data is not None:
+                redis_store.redis_binary_client.set(_data_key(job_id), data, ex=JOB_DATA_TTL)
+            redis_store.redis_client.lpush(QUEUE_KEY, job_id)
+            logger.info(f"Queued job {job_id} ({job_type})")
+            return job_id
+        except Exception as e:
+            logger.warning(f"Redis job queue error, running job {job_id} in-process: {e}")
+
+    if app is None:
+        from flask import current_app
+        app = current_app._get_current_object()
+    ctx = JobContext(job_id, job_type, payload, data=data)
+    thread = threading.Thread(target=_run_handler, args=(app, ctx), name=f'job-{job_id}', daemon=True)
+    thread.start()
+    return job_id
+
+
+def cancel_job(job_id: str, app=None) -> bool:
+    """
+    Request cancellation of a job
+    A job still waiting in the queue is removed (its type's on_dropped hook runs with
+    reason 'cancelled'); a running job stops at its next check_cancelled()
+    Args:
+        job_id: Job ID
+        app: Flask app for the on_dropped hook (default: current_app)
+    Returns:
+        True if the job was queued or running, False if it is unknown or already finished
+    """
+    found = False
+    with _running_lock:
+        ctx = _running.get(job_id)
+    if ctx is not None:
+        ctx.cancel()
+        found = True
+
+    if not redis_store.REDIS_AVAILABLE:
+        return found
+    try:
+        job_type_name = (redis_store.redis_client.hget(_job_key(job_id), 'type')
+                         or redis_store.redis_client.hget(TYPES_KEY, job_id))
+        if job_type_name is None:
+            return found
+        if redis_store.redis_client.lrem(QUEUE_KEY, 0, job_id):
+            redis_store.redis_client.delete(_job_key(job_id), _data_key(job_id))
+            redis_store.redis_client.hdel(TYPES_KEY, job_id)
+            if app is None:
+                from flask import current_app
+                app = current_app._get_current_object()
+            _drop(app, job_id, job_type_name, 'cancelled')
+        else:
+            # Running on some worker: its heartbeat picks the flag up
+            redis_store.redis_client.set(_cancel_key(job_id), '1', ex=JOB_DATA_TTL)
+        return True
+    except Exception as e:
+        logger.error(f"Error cancelling job {job_id}: {e}")
+        return found
+
+
+def is_job_active(job_id: str) -> bool:
+    """Whether a job is queued or running (in this process, or anywhere with Redis)"""
+    with _running_lock:
+        if job_id in _running:
+            return True
+    if not redis_store.REDIS_AVAILABLE:
+        return False
+    try:
+        return bool(redis_store.redis_client.exists(_job_key(job_id)))
+    except Exception as e:
+        logger.warning(f"Error checking job {job_id}: {e}")
+        return False
+
+
+def load_job_modules():
+    """Import the modules that register job types"""
+    for module in JOB_MODULES:
+        importlib.import_module(module)
+
+
+class JobWorker:
+    """
+    Claims jobs from the Redis queue and runs them on a fixed number of threads
+    One housekeeping thread renews the leases of this worker's jobs, relays
+    cancellation flags to them and requeues jobs whose lease has expired.
+    """
+
+    def __init__(self, app, concurrency: int = JOB_WORKER_CONCURRENCY, name: Optional[str] = None):
+        """
+        Args:
+            app: Flask app (handlers run in its app context)
+            concurrency: Jobs run at the same time
+            name: Worker name for logs (default: host:pid)
+        """
+        self.app = app
+        self.concurrency = max(1, concurrency)
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._leases: Dict[str, str] = {}  # job_id -> lease token
+        self._leases_lock = threading.Lock()
+
+    def start(self):
+        """Start the worker threads (returns immediately)"""
+        load_job_modules()
+        for i in range(self.concurrency):
+            thread = threading.Thread(target=self._claim_loop, name=f'job-worker-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        thread = threading.Thread(target=self._housekeeping_loop, name='job-worker-housekeeping', daemon=True)
+        thread.start()
+        self._threads.append(thread)
+        logger.info(f"Job worker {self.name} started ({self.concurrency} threads, lease {JOB_LEASE_SECONDS}s)")
+
+    def stop(self, timeout: Optional[float] = None):
+        """
+        Stop claiming jobs and cancel running ones; unfinished jobs are requeued once
+        their lease expires
+        Args:
+            timeout: Seconds to wait for all worker threads (None: no limit)
+        """
+        self._stop.set()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._leases_lock:
+            job_ids = list(self._leases)
+        with _running_lock:
+            for job_id in job_ids:
+                ctx = _running.get(job_id)
+                if ctx is not None:
+                    ctx.cancel(interrupted=True)
+        for thread in self._threads:
+            thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+
+    def run_forever(self, stop_timeout: float = JOB_LEASE_SECONDS):
+        """
+        Run until SIGINT/SIGTERM (dedicated worker process mode)
+        Args:
+            stop_timeout: Seconds to wait for running jobs to stop after the signal
+        """
+        import signal
+        signal.signal(signal.SIGTERM, lambda signum, frame: self._stop.set())
+        self.start()
+        try:
+            while not self._stop.wait(1.0):
+                pass
+        except KeyboardInterrupt:
+            pass
+        logger.info(f"Job worker {self.name} stopping")
+        self.stop(timeout=stop_timeout)
+
+    def _claim(self) -> Optional[str]:
+        token = f"{self.name}:{uuid.uuid4().hex}"
+        # Claims pop from the right
+        job_id = redis_store.redis_client.lindex(QUEUE_KEY, -1)
+        if not job_id:
+            return None
+        job_id = redis_store.redis_client.eval(
+            _CLAIM_SCRIPT, 4, QUEUE_KEY, PROCESSING_KEY, _lease_key(job_id), _job_key(job_id),
+            token, JOB_LEASE_SECONDS, job_id
+        )
+        if job_id:
+            with self._leases_lock:
+                self._leases[job_id] = token
+        return job_id
+
+    def _claim_loop(self):
+        while not self._stop.is_set():
+            try:
+                job_id = self._claim()
+            except Exception as e:
+                logger.warning(f"Job worker claim error: {e}")
+                job_id = None
+            if not job_id:
+                # Queue empty, or another worker claimed the job first
+                self._stop.wait(_POLL_INTERVAL)
+                continue
+            try:
+                self._execute(job_id)
+            except Exception as e:
+                logger.error(f"Job worker error on job {job_id}: {e}", exc_info=True)
+            finally:
+                with self._leases_lock:
+                    self._leases.pop(job_id, None)
+
+    def _execute(self, job_id: str):
+        job = redis_store.redis_client.hgetall(_job_key(job_id))
+        if not job.get('type'):
+            logger.warning(f"Job {job_id} has no record (expired?), dropping it")
+            job_type_name = redis_store.redis_client.hget(TYPES_KEY, job_id)
+            self._finish(job_id)
+            _drop(self.app, job_id, job_type_name, 'expired')
+            return
+        ctx = JobContext(job_id, job['type'], json.loads(job.get('payload') or '{}'),
+                         attempt=int(job.get('attempts') or 1))
+        if redis_store.redis_client.exists(_cancel_key(job_id)):
+            ctx.cancel()
+        logger.info(f"Job {job_id} ({ctx.job_type}) claimed by {self.name} (attempt {ctx.attempt})")
+        _run_handler(self.app, ctx)
+
+        try:
+            if not ctx.interrupted:
+                self._finish(job_id)
+            elif self._stop.is_set() and self._release(job_id):
+                # Shutting down: hand the job straight to another worker (not counted as an attempt)
+                redis_store.redis_client.hincrby(_job_key(job_id), 'attempts', -1)
+                redis_store.redis_client.rpush(QUEUE_KEY, job_id)
+                logger.info(f"Job {job_id} interrupted by shutdown, requeued")
+                _requeued(self.app, job_id, ctx.job_type)
+            # Otherwise the lease was lost: the reaper requeued the job, which may
+            # already run elsewhere, so this copy leaves it alone
+        except Exception as e:
+            logger.error(f"Job worker error releasing job {job_id}: {e}")
+
+    def _release(self, job_id: str) -> bool:
+        """Give up a job this worker still holds (False if its lease was lost)"""
+        with self._leases_lock:
+            token = self._leases.get(job_id)
+        released = token and redis_store.redis_client.eval(
+            _RELEASE_LEASE_SCRIPT, 1, _lease_key(job_id), token
+        )
+        return bool(released) and bool(redis_store.redis_client.lrem(PROCESSING_KEY, 1, job_id))
+
+    def _finish(self, job_id: str):
+        try:
+            pipe = redis_store.redis_client.pipeline()
+            pipe.lrem(PROCESSING_KEY, 0, job_id)
+            pipe.delete(_job_key(job_id), _lease_key(job_id), _cancel_key(job_id))
+            pipe.hdel(TYPES_KEY, job_id)
+            pipe.execute()
+            redis_store.redis_binary_client.delete(_data_key(job_id))
+        except Exception as e:
+            logger.warning(f"Error removing finished job {job_id}: {e}")
+
+    def _housekeeping_loop(self):
+        last_reap = 0.0
+        while not self._stop.wait(JOB_HEARTBEAT_SECONDS):
+            try:
+                self._heartbeat()
+                if time.time() - last_reap >= JOB_LEASE_SECONDS:
+                    last_reap = time.time()
+                    self._reap_expired()
+            except Exception as e:
+                logger.warning(f"Job worker housekeeping error: {e}")
+
+    def _heartbeat(self):
+        """Renew this worker's leases and relay cancellation flags"""
+        with self._leases_lock:
+            leases = dict(self._leases)
+        for job_id, token in leases.items():
+            with _running_lock:
+                ctx = _running.get(job_id)
+            if ctx is None:
+                continue
+            renewed = redis_store.redis_client.eval(
+                _RENEW_LEASE_SCRIPT, 1, _lease_key(job_id), token, JOB_LEASE_SECONDS
+            )
+            if not renewed:
+                # Lease expired and the job may already run elsewhere: stop this copy
+                logger.warning(f"Job {job_id} lost its lease, stopping it on {self.name}")
+                ctx.cancel(interrupted=True)
+            elif redis_store.redis_client.exists(_cancel_key(job_id)):
+                ctx.cancel()
+
+    def _reap_expired(self):
+        """Requeue (or drop) processing jobs whose worker stopped renewing the lease"""
+        for job_id in redis_store.redis_client.lrange(PROCESSING_KEY, 0, -1):
+            if redis_store.redis_client.exists(_lease_key(job_id)):
+                continue
+            # Only the worker whose LREM removed the entry handles it
+            if not redis_store.redis_client.lrem(PROCESSING_KEY, 1, job_id):
+                continue
+            job = redis_store.redis_client.hmget(_job_key(job_id), 'type', 'attempts')
+            job_type_name, attempts = job[0], int(job[1] or 0)
+            if job_type_name is None:
+                job_type_name = redis_store.redis_client.hget(TYPES_KEY, job_id)
+                reason = 'expired'
+            elif redis_store.redis_client.exists(_cancel_key(job_id)):
+                reason = 'cancelled'
+            elif attempts >= JOB_MAX_ATTEMPTS:
+                reason = 'abandoned'
+            else:
+                # Retried before newer jobs (claims pop from the right)
+                redis_store.redis_client.rpush(QUEUE_KEY, job_id)
+                logger.warning(f"Job {job_id} lease expired, requeued (attempt {attempts} of {JOB_MAX_ATTEMPTS})")
+                continue
+            logger.warning(f"Job {job_id} lease expired, dropping it ({reason})")
+            self._finish(job_id)
+            _drop(self.app, job_id, job_type_name, reason)
+
+
+_embedded_worker: Optional[JobWorker] = None
+
+
+def start_embedded_workers(app):
+    """Start JOB_EMBEDDED_WORKERS worker threads inside this (web) process"""
+    global _embedded_worker
+    if _embedded_worker is not None or JOB_EMBEDDED_WORKERS <= 0 or not is_durable():
+        return
+    _embedded_worker = JobWorker(app, concurrency=JOB_EMBEDDED_WORKERS)
+    _embedded_worker.start()
@@ -0,0 +1,18 @@
+-- Indexes for server-side contacts listing (GET /api/contacts, server mode)
+-- Keyset pagination orders by (created_at DESC, id DESC) and seeks past the cursor row
+
+CREATE INDEX IF NOT EXISTS idx_contacts_created_at_id ON contacts (created_at DESC, id DESC);
+
+-- Same ordering within a company filter
+CREATE INDEX IF NOT EXISTS idx_contacts_company_created_at_id ON contacts (company_id, created_at DESC, id DESC);
+
+-- Case-insensitive industry filter (industry ILIKE '<name>')
+CREATE INDEX IF NOT EXISTS idx_contacts_lower_industry ON contacts (lower(industry));
+
+-- Trigram indexes so substring search (ILIKE '%term%') does not scan the whole table
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS idx_contacts_name_trgm ON contacts USING gin (name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_contacts_email_trgm ON contacts USING gin (email gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_contacts_company_trgm ON contacts USING gin (company gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_contacts_role_trgm ON contacts USING gin (role gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_contacts_phone_trgm ON contacts USING gin (phone gin_trgm_ops);
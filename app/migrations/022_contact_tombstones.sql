@@ -0,0 +1,29 @@
+-- Tombstones for deleted contacts, read by the contacts cache delta refresh
+-- (GET /api/contacts fetches rows with updated_at / deleted_at past its high-water mark)
+CREATE TABLE IF NOT EXISTS contact_tombstones (
+    contact_id UUID PRIMARY KEY,
+    deleted_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_contact_tombstones_deleted_at ON contact_tombstones(deleted_at);
+
+-- Delta queries filter on updated_at
+CREATE INDEX IF NOT EXISTS idx_contacts_updated_at ON contacts(updated_at);
+
+CREATE OR REPLACE FUNCTION record_contact_tombstone()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO contact_tombstones (contact_id, deleted_at)
+    VALUES (OLD.id, NOW())
+    ON CONFLICT (contact_id) DO UPDATE SET deleted_at = EXCLUDED.deleted_at;
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS record_contacts_tombstone ON contacts;
+CREATE TRIGGER record_contacts_tombstone AFTER DELETE ON contacts
+    FOR EACH ROW EXECUTE FUNCTION record_contact_tombstone();
+
+-- Tombstones only matter until every cached list has synced past them
+-- (CONTACTS_FULL_RESYNC_INTERVAL, default 1 day); purge older ones periodically:
+--   DELETE FROM contact_tombstones WHERE deleted_at < NOW() - INTERVAL '7 days';
@@ -0,0 +1,5 @@
+-- Unique key for set-based contact upserts (upsert_contacts bulk mode)
+-- PostgREST on_conflict=email needs a plain (non-expression, non-partial) unique index on email;
+-- contacts_email_lower_idx already guarantees there are no case-insensitive duplicates,
+-- and upsert_contacts stores emails lowercased, so both indexes agree
+CREATE UNIQUE INDEX IF NOT EXISTS contacts_email_key ON contacts (email);
@@ -0,0 +1,14 @@
+-- Migration: Resumable import jobs
+-- The uploaded file is stored (app/jobs/file_store.py) and a checkpoint is saved
+-- after every committed batch, so an interrupted import continues where it stopped
+-- instead of starting over.
+
+ALTER TABLE import_jobs ADD COLUMN IF NOT EXISTS file_hash VARCHAR(64);  -- SHA-256 of the uploaded file
+ALTER TABLE import_jobs ADD COLUMN IF NOT EXISTS file_path TEXT;  -- 'local:<name>' or 'supabase:<bucket>/<name>'
+-- {file_hash, sheet, row, batch, parsed_records, processed_records, imported_count, error_count, skipped_count}
+ALTER TABLE import_jobs ADD COLUMN IF NOT EXISTS checkpoint JSONB;
+
+COMMENT ON COLUMN import_jobs.checkpoint IS 'Position of the last committed batch (sheet and row) and counts so far; used to resume the job';
+
+-- For IMPORT_FILE_STORAGE=supabase, create a private storage bucket named
+-- import-files (or IMPORT_FILE_BUCKET) in the Supabase dashboard.
@@ -0,0 +1,17 @@
+-- Migration: Persistent company enrichment cache
+-- One row per normalized domain with the result of the OpenAI enrichment call
+-- (app/services/enrichment_cache.py). Unknown domains are stored as 'not_found'
+-- with a shorter expiry, so re-imports do not pay for the same lookups again.
+
+CREATE TABLE IF NOT EXISTS company_enrichment_cache (
+    domain TEXT PRIMARY KEY,  -- Normalized: lowercase, no scheme/www/path
+    status VARCHAR(20) NOT NULL CHECK (status IN ('found', 'not_found')),
+    data JSONB,  -- {name, industry, location, description} when found
+    model VARCHAR(100),
+    enriched_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_company_enrichment_cache_expires_at ON company_enrichment_cache(expires_at);
+
+COMMENT ON TABLE company_enrichment_cache IS 'Cached company enrichment results per domain, including negative (not_found) results';
@@ -0,0 +1,21 @@
+-- Migration: Persistent per-contact target analysis cache
+-- One row per contact fingerprint: a hash of the contact fields the analysis
+-- prompt uses, the industry, the prompt version and the model
+-- (app/services/target_analysis_cache.py). Re-running AI target identification
+-- only sends new or changed contacts to the LLM.
+
+CREATE TABLE IF NOT EXISTS target_analysis_cache (
+    fingerprint CHAR(64) PRIMARY KEY,  -- Hex SHA-256
+    contact_id TEXT,
+    industry VARCHAR(255),
+    recommendation JSONB,  -- TargetRecommendation; NULL when the contact was analyzed but not recommended
+    model VARCHAR(100),
+    prompt_version VARCHAR(20),
+    analyzed_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_target_analysis_cache_contact_id ON target_analysis_cache(contact_id);
+CREATE INDEX IF NOT EXISTS idx_target_analysis_cache_expires_at ON target_analysis_cache(expires_at);
+
+COMMENT ON TABLE target_analysis_cache IS 'Cached AI target analysis results per contact fingerprint, including contacts that were not recommended';
@@ -25,7 +25,10 @@ class ImportJob:
         file_size: Optional[int] = None,
         options: Optional[Dict[str, Any]] = None,
         progress_message: Optional[str] = None,
-        industry_id: Optional[str] = None
+        industry_id: Optional[str] = None,
+        file_hash: Optional[str] = None,
+        file_path: Optional[str] = None,
+        checkpoint: Optional[Dict[str, Any]] = None
     ):
         self.id = id
         self.user_id = user_id
@@ -44,6 +47,9 @@ class ImportJob:
         self.options = options or {}
         self.progress_message = progress_message
         self.industry_id = industry_id
+        self.file_hash = file_hash
+        self.file_path = file_path  # Stored upload (app/jobs/file_store.py), kept until the job completes
+        self.checkpoint = checkpoint or {}  # Last committed batch, used to resume the job
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'ImportJob':
@@ -65,7 +71,10 @@ class ImportJob:
             file_size=data.get('file_size'),
             options=data.get('options', {}),
             progress_message=data.get('progress_message'),
-            industry_id=str(data.get('industry_id', '')) if data.get('industry_id') else None
+            industry_id=str(data.get('industry_id', '')) if data.get('industry_id') else None,
+            file_hash=data.get('file_hash'),
+            file_path=data.get('file_path'),
+            checkpoint=data.get('checkpoint') or {}
         )
     
     def _format_datetime(self, dt):
@@ -115,6 +124,9 @@ class ImportJob:
             'options': self.options,
             'progress_message': self.progress_message,
             'industry_id': self.industry_id,
+            'file_hash': self.file_hash,
+            'checkpoint': self.checkpoint,
+            'resumable': bool(self.file_path) and self.status in ('pending', 'processing', 'failed'),
             'progress_percent': int((self.processed_records / self.total_records * 100)) if self.total_records > 0 else 0
         }
 
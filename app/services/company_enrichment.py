@@ -1,11 +1,16 @@
 """Company enrichment service using OpenAI to get company details from domain"""
+import json
 import logging
 import os
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable, List, Tuple
 from openai import OpenAI
+from app.services.enrichment_cache import normalize_domain, is_free_mail_domain, get_enrichment_cache
 
 logger = logging.getLogger(__name__)
 
+# Domains per OpenAI call in enrich_domains
+ENRICHMENT_BATCH_SIZE = int(os.getenv('ENRICHMENT_BATCH_SIZE', 20))
+
 
 class CompanyEnrichmentService:
     """Service to enrich company data using OpenAI from domain"""
@@ -27,6 +32,8 @@ class CompanyEnrichmentService:
     ) -> Optional[Dict[str, Any]]:
         """
         Enrich company data from domain using OpenAI.
+        Free-mail/ISP domains are skipped without a call, and results (including
+        "unknown domain") are cached per normalized domain (see enrichment_cache.py).
         
         Args:
             domain: Company domain (e.g., 'example.com')
@@ -36,13 +43,41 @@ class CompanyEnrichmentService:
             Dict with enriched company data: {name, industry, location, description}
             Returns None if enrichment fails or OpenAI is not configured
         """
+        domain = normalize_domain(domain)
+        if not domain:
+            return None
+        
+        if is_free_mail_domain(domain):
+            logger.debug(f"Domain {domain} is a free-mail provider, skipping enrichment")
+            return None
+        
+        cache = get_enrichment_cache()
+        hit, cached = cache.get(domain)
+        if hit:
+            logger.debug(f"Enrichment cache hit for domain {domain}")
+            return dict(cached) if cached else None
+        
         if not self.client:
             logger.debug("OpenAI client not available, skipping enrichment")
             return None
         
-        if not domain:
-            return None
+        enriched, cacheable = self._enrich_domain_uncached(domain, existing_name)
+        if cacheable:
+            cache.set(domain, enriched, self.model)
+        return enriched
+    
+    def _enrich_domain_uncached(
+        self,
+        domain: str,
+        existing_name: Optional[str] = None
+    ) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """
+        One OpenAI call for a domain
         
+        Returns:
+            Tuple of (enriched data or None, whether the answer may be cached);
+            errors are not cacheable, "unknown domain" answers are
+        """
         try:
             # Build prompt for company enrichment
             prompt = f"""Given the domain "{domain}", provide company information in JSON format.
@@ -102,7 +137,7 @@ Domain: {domain}
             # Validate and clean the data
             if enriched_data.get('error') == "Unknown or generic domain":
                 logger.debug(f"Domain {domain} is generic or unknown, skipping enrichment")
-                return None
+                return None, True
             
             # Only return if we got useful data
             if enriched_data.get('name') or enriched_data.get('industry'):
@@ -112,14 +147,128 @@ Domain: {domain}
                     'industry': enriched_data.get('industry'),
                     'location': enriched_data.get('location'),
                     'description': enriched_data.get('description')
-                }
+                }, True
             else:
                 logger.debug(f"No useful enrichment data for domain {domain}")
-                return None
+                return None, True
                 
         except Exception as e:
             logger.warning(f"Failed to enrich company from domain {domain}: {e}")
-            return None
+            return None, False
+    
+    def enrich_domains(self, domains: Iterable[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Enrich many domains at once: cached and free-mail domains cost nothing, and
+        the rest are sent ENRICHMENT_BATCH_SIZE domains per OpenAI call.
+        
+        Args:
+            domains: Company domains
+            
+        Returns:
+            Dict of normalized domain -> enriched data ({name, industry, location, description})
+            or None when unknown; domains that could not be enriched (errors) are omitted
+        """
+        results: Dict[str, Optional[Dict[str, Any]]] = {}
+        unseen = []
+        for domain in dict.fromkeys(normalize_domain(d) for d in domains):
+            if not domain:
+                continue
+            if is_free_mail_domain(domain):
+                results[domain] = None
+            else:
+                unseen.append(domain)
+        if not unseen:
+            return results
+        
+        cache = get_enrichment_cache()
+        cached = cache.get_many(unseen)
+        results.update({d: (dict(v) if v else None) for d, v in cached.items()})
+        unseen = [d for d in unseen if d not in cached]
+        if not unseen or not self.client:
+            return results
+        
+        for start in range(0, len(unseen), ENRICHMENT_BATCH_SIZE):
+            batch = unseen[start:start + ENRICHMENT_BATCH_SIZE]
+            enriched = self._enrich_domains_batch(batch)
+            cache.set_many(enriched, self.model)
+            results.update(enriched)
+        logger.info(f"Enriched {len(unseen)} new domains in {-(-len(unseen) // ENRICHMENT_BATCH_SIZE)} calls "
+                    f"({len(results) - len(unseen)} cached or generic)")
+        return results
+    
+    def _enrich_domains_batch(self, domains: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        One OpenAI call for several domains
+        
+        Returns:
+            Dict of domain -> data or None (unknown/generic) for the domains answered;
+            empty if the call failed
+        """
+        domain_list = '\n'.join(f"- {d}" for d in domains)
+        prompt = f"""For each domain below, provide company information. Return a JSON object with a
+"companies" object keyed by the exact domain as listed:
+
+{{
+    "companies": {{
+        "example.com": {{
+            "name": "Official company name",
+            "industry": "Primary industry/sector",
+            "location": "Headquarters location (city, country)",
+            "description": "Brief company description (1-2 sentences)"
+        }},
+        "unknown-domain.com": null
+    }}
+}}
+
+Requirements:
+- Use real, verifiable information only
+- Use null for a domain you don't recognize or that is a generic email provider
+- If uncertain about a field, set it to null rather than guessing
+- Keep descriptions concise (max 200 characters)
+- Include every listed domain exactly once
+
+Domains:
+{domain_list}
+"""
+        try:
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {
+                        "role": "system",
+                        "content": "You are a business intelligence assistant. Provide accurate company information based on domain names. Return only valid JSON."
+                    },
+                    {
+                        "role": "user",
+                        "content": prompt
+                    }
+                ],
+                temperature=0.3,  # Lower temperature for more factual responses
+                max_tokens=min(4000, 150 * len(domains) + 100),
+                response_format={"type": "json_object"}
+            )
+            companies = json.loads(response.choices[0].message.content.strip()).get('companies') or {}
+        except Exception as e:
+            logger.warning(f"Failed to enrich {len(domains)} domains in batch: {e}")
+            return {}
+        
+        results: Dict[str, Optional[Dict[str, Any]]] = {}
+        answered = {normalize_domain(k): v for k, v in companies.items()} if isinstance(companies, dict) else {}
+        for domain in domains:
+            if domain not in answered:
+                # Left out of the answer: not cached, retried next time
+                continue
+            data = answered[domain]
+            if isinstance(data, dict) and (data.get('name') or data.get('industry')):
+                results[domain] = {
+                    'name': data.get('name'),
+                    'industry': data.get('industry'),
+                    'location': data.get('location'),
+                    'description': data.get('description')
+                }
+            else:
+                results[domain] = None
+        return results
     
     def enrich_contact_from_linkedin(
         self,
@@ -0,0 +1,228 @@
+"""
+Incremental (delta) refresh of the cached contacts list
+The cached list is stored next to a sync state holding the updated_at high-water
+mark of the rows it contains. A refresh fetches only contacts changed since then
+plus tombstones of deleted contacts (contact_tombstones, migration 022) and merges
+them into the previous list, so its cost scales with churn instead of table size.
+Contacts of companies changed since then are re-read too, since the list embeds
+each contact's company name and industry.
+"""
+import os
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.utils.timestamps import parse_timestamp as parse_iso_timestamp
+
+logger = logging.getLogger(__name__)
+
+CONTACTS_DELTA_ENABLED = os.getenv('CONTACTS_DELTA_ENABLED', 'true').lower() == 'true'
+# A full reload is forced after this many seconds
+CONTACTS_FULL_RESYNC_INTERVAL = int(os.getenv('CONTACTS_FULL_RESYNC_INTERVAL', 86400))
+# Changes are re-read this far behind the high-water mark (late-committing transactions)
+CONTACTS_DELTA_OVERLAP_SECONDS = int(os.getenv('CONTACTS_DELTA_OVERLAP_SECONDS', 60))
+# Above this many changed rows a full reload is cheaper than merging
+CONTACTS_DELTA_MAX_ROWS = int(os.getenv('CONTACTS_DELTA_MAX_ROWS', 10000))
+# Company IDs per contacts company_id IN (...) query
+_COMPANY_BATCH_SIZE = 100
+
+_EPOCH = datetime.min.replace(tzinfo=timezone.utc)
+
+
+def parse_timestamp(value: Any) -> datetime:
+    """Parse a Postgres/ISO timestamp (missing or invalid values sort first)"""
+    return parse_iso_timestamp(value, _EPOCH)
+
+
+def get_sync_state_key(industry_partition: Optional[str]) -> str:
+    """
+    Sync state key for a shared contacts dataset (independent of the contacts:all generation,
+    so a list orphaned by invalidate_cache can still serve as the base of a delta)
+    """
+    return f"contacts:sync:industry:{industry_partition}"
+
+
+def new_sync_state(data_key: str, rows: List[Dict[str, Any]], industry_filter: Optional[str],
+                   full_synced_at: Optional[float] = None, high_water_mark: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Build the sync state stored next to a cached contacts list
+    Args:
+        data_key: Cache key of the list
+        rows: Raw rows loaded (or changed rows merged) into the list
+        industry_filter: Resolved industry filter the list was loaded with
+        full_synced_at: Epoch seconds of the last full load (default: now)
+        high_water_mark: Previous high-water mark to advance from
+    Returns:
+        Sync state dict
+    """
+    marks = [parse_timestamp(r.get('updated_at') or r.get('created_at')) for r in rows]
+    if high_water_mark:
+        marks.append(parse_timestamp(high_water_mark))
+    latest = max(marks) if marks else None
+    return {
+        'data_key': data_key,
+        'industry_filter': industry_filter,
+        'high_water_mark': latest.isoformat() if latest and latest != _EPOCH else None,
+        'full_synced_at': full_synced_at or datetime.now(timezone.utc).timestamp()
+    }
+
+
+def can_delta_refresh(state: Optional[Dict[str, Any]], industry_filter: Optional[str]) -> bool:
+    """Whether a sync state can be advanced with a delta instead of a full reload"""
+    if not CONTACTS_DELTA_ENABLED or not isinstance(state, dict) or not state.get('high_water_mark'):
+        return False
+    if state.get('industry_filter') != industry_filter:
+        return False
+    age = datetime.now(timezone.utc).timestamp() - state.get('full_synced_at', 0)
+    return age < CONTACTS_FULL_RESYNC_INTERVAL
+
+
+def fetch_contact_changes(supabase, since: str) -> Optional[Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]]:
+    """
+    Fetch contacts changed (directly or through their company) and deleted since a high-water mark
+    Args:
+        supabase: Supabase client
+        since: ISO high-water mark
+    Returns:
+        Tuple of (changed raw rows with companies embed, tombstone rows, changed company
+        rows), or None if more than CONTACTS_DELTA_MAX_ROWS changed
+    """
+    since_ts = (parse_timestamp(since) - timedelta(seconds=CONTACTS_DELTA_OVERLAP_SECONDS)).isoformat()
+
+    changed = []
+    page_size = 1000
+    while True:
+        response = supabase.table('contacts').select('*, companies!left(name, industry, domain)')\
+            .gte('updated_at', since_ts)\
+            .order('updated_at').order('id')\
+            .range(len(changed), len(changed) + page_size - 1).execute()
+        rows = response.data or []
+        changed.extend(rows)
+        if len(changed) > CONTACTS_DELTA_MAX_ROWS:
+            return None
+        if len(rows) < page_size:
+            break
+
+    # Contacts whose company was renamed or re-classified (companies.updated_at trigger, migration 007)
+    companies = supabase.table('companies').select('id, updated_at')\
+        .gte('updated_at', since_ts).limit(CONTACTS_DELTA_MAX_ROWS + 1).execute().data or []
+    if len(companies) > CONTACTS_DELTA_MAX_ROWS:
+        return None
+    seen = {str(row.get('id')) for row in changed}
+    company_ids = [str(c['id']) for c in companies]
+    for start in range(0, len(company_ids), _COMPANY_BATCH_SIZE):
+        batch = company_ids[start:start + _COMPANY_BATCH_SIZE]
+        fetched = 0
+        while True:
+            response = supabase.table('contacts').select('*, companies!left(name, industry, domain)')\
+                .in_('company_id', batch).order('id')\
+                .range(fetched, fetched + page_size - 1).execute()
+            rows = response.data or []
+            fetched += len(rows)
+            for row in rows:
+                if str(row.get('id')) not in seen:
+                    seen.add(str(row.get('id')))
+                    changed.append(row)
+            if len(changed) > CONTACTS_DELTA_MAX_ROWS:
+                return None
+            if len(rows) < page_size:
+                break
+
+    tombstones = supabase.table('contact_tombstones').select('contact_id, deleted_at')\
+        .gte('deleted_at', since_ts).limit(CONTACTS_DELTA_MAX_ROWS + 1).execute().data or []
+    if len(tombstones) > CONTACTS_DELTA_MAX_ROWS:
+        return None
+    return changed, tombstones, companies
+
+
+def matches_list_filter(row: Dict[str, Any], company_id: Optional[str], industry_filter: Optional[str]) -> bool:
+    """Python equivalent of the list query's company_id eq / industry ilike filters"""
+    if company_id and str(row.get('company_id') or '') != str(company_id):
+        return False
+    if industry_filter and (row.get('industry') or '').lower() != industry_filter.strip().lower():
+        return False
+    return True
+
+
+def merge_contact_changes(contacts: List[Dict[str, Any]], changed: List[Dict[str, Any]],
+                          deleted_ids: List[str], company_id: Optional[str], industry_filter: Optional[str],
+                          row_to_dict: Callable[[Dict[str, Any]], Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Merge changed rows and deletions into a cached contacts list
+    Args:
+        contacts: Previous cached list (created_at descending); not modified
+        changed: Changed raw rows
+        deleted_ids: IDs of deleted contacts
+        company_id: List company filter
+        industry_filter: List industry filter
+        row_to_dict: Converts a raw row into a cached contact dict
+    Returns:
+        New list, created_at descending
+    """
+    removed = set(str(i) for i in deleted_ids)
+    updates: Dict[str, Dict[str, Any]] = {}
+    for row in changed:
+        row_id = str(row.get('id'))
+        if matches_list_filter(row, company_id, industry_filter):
+            try:
+                updates[row_id] = row_to_dict(row)
+                removed.discard(row_id)
+            except Exception as e:
+                logger.warning(f"Error processing contact {row_id}: {e}")
+        else:
+            # Moved out of this list's filters
+            removed.add(row_id)
+
+    merged = []
+    resort = False
+    for contact in contacts:
+        contact_id = str(contact.get('id'))
+        if contact_id in removed:
+            continue
+        update = updates.pop(contact_id, None)
+        if update is not None:
+            resort = resort or update.get('created_at') != contact.get('created_at')
+            merged.append(update)
+        else:
+            merged.append(contact)
+    if updates:
+        merged.extend(updates.values())
+        resort = True
+    if resort:
+        merged.sort(key=lambda c: parse_timestamp(c.get('created_at')), reverse=True)
+    return merged
+
+
+def delta_refresh(supabase, state: Dict[str, Any], contacts: List[Dict[str, Any]], data_key: str,
+                  company_id: Optional[str], industry_filter: Optional[str],
+                  row_to_dict: Callable[[Dict[str, Any]], Dict[str, Any]]) -> Optional[Tuple[List[Dict[str, Any]], Dict[str, Any]]]:
+    """
+    Bring a cached contacts list up to date with a delta
+    Args:
+        supabase: Supabase client
+        state: Sync state of the previous list
+        contacts: Previous cached list
+        data_key: Cache key the refreshed list will be stored under
+        company_id: List company filter
+        industry_filter: List industry filter
+        row_to_dict: Converts a raw row into a cached contact dict
+    Returns:
+        Tuple of (refreshed list, new sync state), or None if a full reload is needed
+    """
+    changes = fetch_contact_changes(supabase, state['high_water_mark'])
+    if changes is None:
+        logger.info("Contacts delta too large, doing a full reload")
+        return None
+    changed, tombstones, companies = changes
+    merged = merge_contact_changes(
+        contacts, changed, [t['contact_id'] for t in tombstones],
+        company_id, industry_filter, row_to_dict
+    )
+    marks = changed + [{'updated_at': t.get('deleted_at')} for t in tombstones] + companies
+    new_state = new_sync_state(
+        data_key, marks, industry_filter,
+        full_synced_at=state.get('full_synced_at'), high_water_mark=state['high_water_mark']
+    )
+    logger.info(f"🔄 Contacts delta refresh: {len(changed)} changed, {len(tombstones)} deleted, "
+                f"{len(companies)} companies changed, {len(merged)} total")
+    return merged, new_state
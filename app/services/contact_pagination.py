@@ -0,0 +1,123 @@
+"""
+Server-side contacts listing helpers
+Keyset pagination on (created_at, id) with opaque cursors, and PostgREST
+filters for the contacts search box
+"""
+import os
+import json
+import base64
+import binascii
+from uuid import UUID
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Contact columns matched by the server-side search (case-insensitive substring)
+SERVER_SEARCH_FIELDS = ('name', 'email', 'phone', 'lead_source', 'role', 'company', 'industry')
+# Columns of the contact's company matched too (company_name / company_industry in the cache search)
+SERVER_SEARCH_COMPANY_FIELDS = ('name', 'industry')
+# Most matching companies a server-side search filters on (36-char IDs in the request URL);
+# broader searches are served from the cache instead
+SERVER_SEARCH_MAX_COMPANIES = int(os.getenv('CONTACTS_SERVER_SEARCH_MAX_COMPANIES', 100))
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+
+class SearchTooBroadError(Exception):
+    """Raised when a search matches more companies than a server-side search can filter on"""
+
+
+def encode_cursor(row: Dict[str, Any]) -> str:
+    """
+    Build an opaque cursor pointing just after a row
+    Args:
+        row: Last contact row of a page (needs created_at and id)
+    Returns:
+        URL-safe cursor string
+    """
+    payload = json.dumps([row['created_at'], str(row['id'])], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """
+    Decode a cursor built by encode_cursor
+    Args:
+        cursor: Cursor string from the client
+    Returns:
+        Tuple of (created_at, id)
+    Raises:
+        InvalidCursorError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, contact_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if not isinstance(created_at, str) or not created_at:
+            raise ValueError('created_at')
+        return created_at, str(UUID(contact_id))
+    except (ValueError, TypeError, binascii.Error, UnicodeError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {cursor}") from e
+
+
+def _quote(value: str) -> str:
+    """Quote a value for use inside a PostgREST logic filter (or=/and=)"""
+    return '"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def _search_pattern(search: str) -> str:
+    # Escape LIKE wildcards so the search stays a literal substring match
+    literal = search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return _quote(f"*{literal}*")
+
+
+def matching_company_ids(supabase, search: str) -> Tuple[List[str], bool]:
+    """
+    IDs of the companies whose name or industry contains a search string
+    Args:
+        supabase: Supabase client
+        search: Raw search string
+    Returns:
+        Tuple of (company IDs, complete); complete is False when more than
+        SERVER_SEARCH_MAX_COMPANIES companies match (only that many are returned)
+    """
+    pattern = _search_pattern(search)
+    response = supabase.table('companies').select('id')\
+        .or_(','.join(f"{field}.ilike.{pattern}" for field in SERVER_SEARCH_COMPANY_FIELDS))\
+        .limit(SERVER_SEARCH_MAX_COMPANIES + 1).execute()
+    ids = [str(row['id']) for row in response.data or []]
+    return ids[:SERVER_SEARCH_MAX_COMPANIES], len(ids) <= SERVER_SEARCH_MAX_COMPANIES
+
+
+def search_filter(search: str, company_ids: Iterable[str] = ()) -> str:
+    """
+    Build the or= filter for a search string
+    Args:
+        search: Raw search string
+        company_ids: Companies matching the search (see matching_company_ids); their contacts match too
+    Returns:
+        PostgREST filter string for query.or_()
+    """
+    pattern = _search_pattern(search)
+    filters = [f"{field}.ilike.{pattern}" for field in SERVER_SEARCH_FIELDS]
+    company_ids = list(company_ids)
+    if company_ids:
+        filters.append(f"company_id.in.({','.join(company_ids)})")
+    return ','.join(filters)
+
+
+def apply_keyset(query, cursor: Optional[Tuple[str, str]]):
+    """
+    Order by (created_at, id) descending and start after the cursor row
+    Args:
+        query: PostgREST query builder on contacts
+        cursor: Decoded cursor or None for the first page
+    Returns:
+        Query builder
+    """
+    if cursor:
+        created_at, contact_id = cursor
+        query = query.or_(
+            f"created_at.lt.{_quote(created_at)},"
+            f"and(created_at.eq.{_quote(created_at)},id.lt.{contact_id})"
+        )
+    return query.order('created_at', desc=True).order('id', desc=True)
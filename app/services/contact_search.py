@@ -0,0 +1,136 @@
+"""Search index over the cached contacts list used by list_contacts"""
+import os
+import logging
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from app.integrations.cache_client import InMemoryCache
+
+logger = logging.getLogger(__name__)
+
+# Fields matched by the contacts search box (substring, case-insensitive)
+SEARCH_FIELDS = (
+    'name', 'email', 'phone', 'lead_source', 'role',
+    'company', 'company_name', 'industry', 'company_industry'
+)
+
+# Joins fields in the precomputed search text; a query can never match across
+# two fields because it cannot contain this character (checked in search())
+FIELD_SEPARATOR = '\x00'
+
+
+def build_search_text(contact: Dict[str, Any]) -> str:
+    """Lowercased, separator-joined search fields of a contact"""
+    return FIELD_SEPARATOR.join(str(contact.get(field, '')).lower() for field in SEARCH_FIELDS)
+
+
+def matches_search(contact: Dict[str, Any], search_lower: str) -> bool:
+    """Reference semantics: substring match on any single search field"""
+    return any(str(contact.get(field, '')).lower().find(search_lower) >= 0 for field in SEARCH_FIELDS)
+
+
+class ContactSearchIndex:
+    """
+    Precomputed lowercase search text per contact, plus a small cache of recent
+    query results (row ID arrays). When the user keeps typing, a new query that
+    contains an earlier one only rescans that query's matches instead of every row.
+    """
+
+    def __init__(self, contacts: List[Dict[str, Any]], max_cached_queries: int = 32):
+        """
+        Build the index
+        Args:
+            contacts: Cached contact dicts (not copied; must not be mutated afterwards)
+            max_cached_queries: Recent query results kept for refinement
+        """
+        self._contacts = contacts
+        self._texts = [build_search_text(c) for c in contacts]
+        self._results: "OrderedDict[str, array]" = OrderedDict()
+        self._max_cached_queries = max_cached_queries
+        self._lock = threading.Lock()
+
+    def _candidates(self, search_lower: str) -> Optional[array]:
+        """Smallest cached result set whose query is a substring of this one"""
+        best = None
+        with self._lock:
+            for query, row_ids in self._results.items():
+                if query in search_lower and (best is None or len(row_ids) < len(best)):
+                    best = row_ids
+        return best
+
+    def search_ids(self, search: str) -> array:
+        """
+        Find matching row positions
+        Args:
+            search: Raw search string
+        Returns:
+            Array of row positions in original order
+        """
+        search_lower = search.lower()
+        with self._lock:
+            cached = self._results.get(search_lower)
+            if cached is not None:
+                self._results.move_to_end(search_lower)
+                return cached
+
+        texts = self._texts
+        candidates = self._candidates(search_lower)
+        if candidates is None:
+            row_ids = array('I', [i for i, text in enumerate(texts) if search_lower in text])
+        else:
+            row_ids = array('I', [i for i in candidates if search_lower in texts[i]])
+
+        with self._lock:
+            self._results[search_lower] = row_ids
+            while len(self._results) > self._max_cached_queries:
+                self._results.popitem(last=False)
+        return row_ids
+
+    def search(self, search: str) -> List[Dict[str, Any]]:
+        """
+        Filter contacts with the same results as matches_search on every row
+        Args:
+            search: Raw search string
+        Returns:
+            Matching contacts in original order
+        """
+        search_lower = search.lower()
+        if FIELD_SEPARATOR in search_lower:
+            return [c for c in self._contacts if matches_search(c, search_lower)]
+        return [self._contacts[i] for i in self.search_ids(search)]
+
+    def size_bytes(self) -> int:
+        """Approximate memory held by the search texts"""
+        return sum(len(text) for text in self._texts) + 8 * len(self._texts)
+
+
+# Indexes keyed by contacts cache key + cached list version; the cache key embeds the
+# contacts:all generation, so invalidating the contacts cache also orphans its index
+_indexes = InMemoryCache(
+    default_ttl=3600,
+    max_entries=int(os.getenv('CONTACT_SEARCH_INDEX_MAX', 8)),
+    max_bytes=int(os.getenv('CONTACT_SEARCH_INDEX_MAX_MB', 128)) * 1024 * 1024
+)
+
+
+def get_search_index(cache_key: str, version: Optional[float], contacts: List[Dict[str, Any]]) -> ContactSearchIndex:
+    """
+    Get or build the search index for a cached contacts list
+    Args:
+        cache_key: Contacts cache key
+        version: Version of the cached list (get_cached_list_version); None builds an unshared index
+        contacts: The cached contacts list
+    Returns:
+        ContactSearchIndex over contacts
+    """
+    if version is None:
+        return ContactSearchIndex(contacts)
+    index_key = f"{cache_key}:v:{version}"
+    index = _indexes.get(index_key)
+    if index is None:
+        index = ContactSearchIndex(contacts)
+        _indexes.set(index_key, index, size=index.size_bytes())
+        logger.debug(f"Built contacts search index: {cache_key} ({len(contacts)} contacts)")
+    return index
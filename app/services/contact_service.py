@@ -1,8 +1,12 @@
 """Contact service module for company and contact management"""
+import os
 import logging
 import re
-from typing import Optional, Dict, Any, List, Tuple
+import threading
+from concurrent.futures import Future
+from typing import Optional, Dict, Any, Iterable, List, Tuple
 from uuid import UUID
+from urllib.parse import quote
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +27,15 @@ except ImportError:
 #     logger.warning("Hunter.io integration not available")
 HUNTER_AVAILABLE = False  # Disabled - no Hunter.io subscription
 
+# Bulk upserts write whole chunks with PostgREST upsert (needs migration 023);
+# the per-row path is kept as a fallback for chunks that fail
+CONTACTS_BULK_UPSERT = os.getenv('CONTACTS_BULK_UPSERT', 'true').lower() == 'true'
+BULK_UPSERT_CHUNK_SIZE = int(os.getenv('CONTACTS_BULK_UPSERT_CHUNK_SIZE', 500))
+# Values per IN (...) lookup (keeps the request URL short)
+LOOKUP_BATCH_SIZE = 100
+# URL-encoded characters per IN (...) filter in find_duplicates (proxies commonly cap URLs at 8KB)
+IN_FILTER_MAX_CHARS = int(os.getenv('CONTACTS_IN_FILTER_MAX_CHARS', 6000))
+
 
 def normalize_email(email: Optional[str]) -> str:
     """Normalize email to lowercase and trim"""
@@ -228,58 +241,440 @@ def find_or_create_company(
     return None
 
 
+def _escape_like(value: str) -> str:
+    """Escape LIKE wildcards so value matches literally"""
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+class CompanyResolver:
+    """
+    Resolves companies for a whole import with a few bulk queries instead of
+    find_or_create_company per row. Lookups (domain, then name substring, then
+    create) follow find_or_create_company; results are memoized for the resolver's
+    lifetime, so reuse one instance per import job. Thread-safe: the lock only
+    guards the memo dicts, never a network or LLM call.
+    """
+    
+    # Values per IN (...) / ilike(any) lookup
+    LOOKUP_BATCH_SIZE = 50
+    # Rows per ilike(any) name lookup (PostgREST's default max-rows is 1000)
+    NAME_LOOKUP_MAX_ROWS = 1000
+    
+    def __init__(self, supabase):
+        """
+        Initialize resolver
+        Args:
+            supabase: Supabase client
+        """
+        self._supabase = supabase
+        self._lock = threading.RLock()
+        self._by_domain: Dict[str, Dict[str, Any]] = {}  # domain -> company row
+        self._by_name: Dict[str, Optional[Dict[str, Any]]] = {}  # lowercased name -> company row (None = not found)
+        self._missing_domains = set()
+        self._by_id: Dict[str, Dict[str, Any]] = {}
+        self._results: Dict[Tuple[str, str], Optional[str]] = {}
+        self._enriched: Dict[str, Optional[Dict[str, Any]]] = {}  # domain -> enrichment data (None = unknown)
+        self._inflight: Dict[str, Future] = {}  # claim key -> resolution in progress on another thread
+        self._industry_checked = set()  # company IDs ensure_industry has handled
+        self.stats = {'queries': 0, 'created': 0, 'fallbacks': 0}
+    
+    @staticmethod
+    def _key(company_name: Optional[str], domain: Optional[str]) -> Tuple[str, str]:
+        return (str(company_name).strip().lower() if company_name else '',
+                str(domain).strip().lower() if domain else '')
+    
+    def _count(self, stat: str, n: int = 1):
+        with self._lock:
+            self.stats[stat] += n
+    
+    def _remember(self, row: Dict[str, Any]):
+        # Called with self._lock held
+        self._by_id[row['id']] = row
+        if row.get('domain'):
+            self._by_domain[str(row['domain']).strip().lower()] = row
+    
+    def _lookup_domains(self, domains: List[str]):
+        """Bulk lookup of companies by exact domain"""
+        for start in range(0, len(domains), self.LOOKUP_BATCH_SIZE):
+            batch = domains[start:start + self.LOOKUP_BATCH_SIZE]
+            self._count('queries')
+            response = self._supabase.table('companies').select('id, name, domain, industry').in_('domain', batch).execute()
+            with self._lock:
+                for row in response.data or []:
+                    self._remember(row)
+                self._missing_domains.update(d for d in batch if d not in self._by_domain)
+    
+    def _query_names(self, patterns: List[str]) -> List[Dict[str, Any]]:
+        """Companies whose name matches any of the ILIKE patterns (oldest first, at most NAME_LOOKUP_MAX_ROWS)"""
+        array = ','.join('"' + p.replace('\\', '\\\\').replace('"', '\\"') + '"' for p in patterns)
+        self._count('queries')
+        response = self._supabase.table('companies').select('id, name, domain, industry')\
+            .filter('name', 'ilike(any)', '{' + array + '}').order('created_at').limit(self.NAME_LOOKUP_MAX_ROWS).execute()
+        return response.data or []
+    
+    def _lookup_names(self, names: List[str]):
+        """
+        Bulk lookup of companies by name: exact (case-insensitive) matches first, then
+        companies whose name contains the name (ilike '%name%', as find_or_create_company).
+        Names whose substring lookup may have been cut off by the row cap are queried one by one.
+        """
+        found: Dict[str, Optional[Dict[str, Any]]] = {}
+        for start in range(0, len(names), self.LOOKUP_BATCH_SIZE):
+            batch = names[start:start + self.LOOKUP_BATCH_SIZE]
+            try:
+                rows = self._query_names([_escape_like(n) for n in batch])
+                exact = {}
+                for row in rows:
+                    exact.setdefault(str(row.get('name') or '').strip().lower(), row)
+                leftovers = []
+                for name in batch:
+                    if name in exact:
+                        found[name] = exact[name]
+                    else:
+                        leftovers.append(name)
+                unsure = []
+                if leftovers:
+                    rows = self._query_names(['%' + _escape_like(n) + '%' for n in leftovers])
+                    truncated = len(rows) >= self.NAME_LOOKUP_MAX_ROWS
+                    for name in leftovers:
+                        # Patterns are escaped, so ILIKE '%name%' is a case-insensitive substring test
+                        found[name] = next((r for r in rows if name in str(r.get('name') or '').lower()), None)
+                        if found[name] is None and truncated:
+                            unsure.append(name)
+            except Exception as e:
+                # Older PostgREST without ilike(any): one query per distinct name
+                logger.debug(f"Bulk company name lookup failed, querying names individually: {e}")
+                unsure = [n for n in batch if n not in found]
+            for name in unsure:
+                self._count('queries')
+                response = self._supabase.table('companies').select('id, name, domain, industry')\
+                    .ilike('name', f'%{_escape_like(name)}%').order('created_at').limit(1).execute()
+                found[name] = response.data[0] if response.data else None
+        with self._lock:
+            for name, row in found.items():
+                self._by_name[name] = row
+                if row:
+                    self._remember(row)
+    
+    def _backfill_domain(self, row: Dict[str, Any], domain: str):
+        """Set a company's missing domain (found by name), as find_or_create_company does"""
+        if row.get('domain'):
+            return
+        if not domain:
+            # Extract domain from a contact of this company
+            try:
+                contact_with_email = self._supabase.table('contacts').select('email').eq('company_id', row['id'])\
+                    .not_.is_('email', 'null').limit(1).execute()
+                if contact_with_email.data and contact_with_email.data[0].get('email'):
+                    domain = extract_domain_from_email(contact_with_email.data[0]['email'])
+            except Exception as backfill_error:
+                logger.debug(f"Could not backfill company domain: {backfill_error}")
+        if not domain:
+            row['domain'] = None
+            return
+        try:
+            self._supabase.table('companies').update({'domain': domain}).eq('id', row['id']).execute()
+            with self._lock:
+                row['domain'] = domain
+                self._remember(row)
+            logger.debug(f"Updated company domain to '{domain}'")
+        except Exception as update_error:
+            logger.debug(f"Could not update company domain: {update_error}")
+            row['domain'] = None
+    
+    def _build_insert(self, domain: str, company_name: Optional[str],
+                      industry: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Insert payload for a company that was not found (enriching the name from the domain)"""
+        enriched_data = None
+        if not company_name and domain and ENRICHMENT_AVAILABLE:
+            try:
+                with self._lock:
+                    known = domain in self._enriched
+                    enriched_data = self._enriched.get(domain)
+                if not known:
+                    enriched_data = get_enrichment_service().enrich_from_domain(domain)
+                if enriched_data and enriched_data.get('name'):
+                    company_name = enriched_data.get('name')
+                    logger.info(f"Enriched company name '{company_name}' from domain '{domain}'")
+                    if not industry and enriched_data.get('industry'):
+                        industry = enriched_data.get('industry')
+            except Exception as enrich_error:
+                logger.debug(f"Enrichment failed for domain {domain}: {enrich_error}")
+        if not company_name and domain:
+            domain_parts = domain.split('.')
+            company_name = domain_parts[0].title() if domain_parts else domain.title()
+        insert_data = {}
+        if company_name and str(company_name).strip():
+            insert_data['name'] = str(company_name).strip()
+        if domain:
+            insert_data['domain'] = domain
+        if industry:
+            insert_data['industry'] = str(industry).strip()
+        if enriched_data and enriched_data.get('location'):
+            insert_data['location'] = enriched_data.get('location')
+        return insert_data or None
+    
+    def _enrich_domains(self, domains: List[str]):
+        """Enrich the domains of companies about to be created, in batched calls"""
+        if not domains or not ENRICHMENT_AVAILABLE:
+            return
+        try:
+            enriched = get_enrichment_service().enrich_domains(domains)
+        except Exception as enrich_error:
+            # _build_insert enriches per domain instead
+            logger.debug(f"Batch enrichment failed for {len(domains)} domains: {enrich_error}")
+            return
+        with self._lock:
+            self._enriched.update(enriched)
+    
+    @staticmethod
+    def _claim_key(key: Tuple[str, str]) -> str:
+        """Company a lookup key would create: one per domain, or per name when there is no domain"""
+        name_key, domain = key
+        return domain or f"name:{name_key}"
+    
+    def prefetch(self, companies: Iterable[Tuple[Optional[str], Optional[str], Optional[str]]]):
+        """
+        Resolve every distinct company not resolved yet
+        Lookups, enrichment and inserts run without holding the resolver lock, so
+        concurrent batches only wait for each other on the same company: a company
+        being resolved by another thread is waited for instead of created twice.
+        Args:
+            companies: (company_name, domain, industry) tuples
+        """
+        pending: Dict[Tuple[str, str], Tuple[Optional[str], Optional[str]]] = {}
+        for company_name, domain, industry in companies:
+            key = self._key(company_name, domain)
+            if key != ('', '') and key not in pending:
+                pending[key] = (company_name, industry)
+        
+        while pending:
+            mine: Dict[Tuple[str, str], Tuple[Optional[str], Optional[str]]] = {}
+            claimed: Dict[str, Future] = {}
+            waiting: List[Future] = []
+            with self._lock:
+                pending = {k: v for k, v in pending.items() if k not in self._results}
+                for key, value in pending.items():
+                    claim = self._claim_key(key)
+                    if claim in claimed:
+                        mine[key] = value
+                    elif claim in self._inflight:
+                        waiting.append(self._inflight[claim])
+                    else:
+                        claimed[claim] = self._inflight[claim] = Future()
+                        mine[key] = value
+            if mine:
+                try:
+                    self._resolve_pending(mine)
+                finally:
+                    with self._lock:
+                        for claim, future in claimed.items():
+                            del self._inflight[claim]
+                            future.set_result(None)
+                # Keys that failed to resolve are not retried here
+                pending = {k: v for k, v in pending.items() if k not in mine}
+            for future in waiting:
+                future.result()
+            if not waiting:
+                break
+    
+    def _resolve_pending(self, pending: Dict[Tuple[str, str], Tuple[Optional[str], Optional[str]]]):
+        """Resolve keys claimed by this thread (domain, then name substring, then create)"""
+        # 1. By domain
+        with self._lock:
+            domains = sorted({d for _, d in pending if d and d not in self._by_domain and d not in self._missing_domains})
+        if domains:
+            self._lookup_domains(domains)
+        unresolved = {}
+        with self._lock:
+            for key, value in pending.items():
+                name_key, domain = key
+                if domain and domain in self._by_domain:
+                    self._results[key] = self._by_domain[domain]['id']
+                else:
+                    unresolved[key] = value
+            
+            # 2. By name (substring match, as find_or_create_company)
+            names = sorted({n for n, _ in unresolved if n and n not in self._by_name})
+        if names:
+            self._lookup_names(names)
+        # Companies to be created without a name: enrich their domains together
+        with self._lock:
+            to_enrich = sorted({
+                domain for (name_key, domain), (company_name, _) in unresolved.items()
+                if domain and not company_name and domain not in self._enriched
+            })
+        self._enrich_domains(to_enrich)
+        to_create: Dict[str, Tuple[Tuple[str, str], Dict[str, Any]]] = {}
+        create_keys: Dict[str, List[Tuple[str, str]]] = {}
+        for key, (company_name, industry) in unresolved.items():
+            name_key, domain = key
+            with self._lock:
+                row = self._by_name.get(name_key) if name_key else None
+            if row:
+                self._backfill_domain(row, domain)
+                with self._lock:
+                    self._results[key] = row['id']
+                continue
+            # 3. Create (one insert per distinct domain, or per name when there is no domain)
+            create_key = self._claim_key(key)
+            if create_key not in to_create:
+                insert_data = self._build_insert(domain, company_name, industry)
+                if not insert_data:
+                    with self._lock:
+                        self._results[key] = None
+                    continue
+                to_create[create_key] = (key, insert_data)
+            create_keys.setdefault(create_key, []).append(key)
+        
+        if to_create:
+            self._create(to_create, create_keys, unresolved)
+    
+    def _create(self, to_create, create_keys, unresolved):
+        """Bulk insert missing companies; falls back to find_or_create_company per company"""
+        groups: Dict[Tuple[str, ...], List[str]] = {}
+        for create_key, (_, insert_data) in to_create.items():
+            groups.setdefault(tuple(sorted(insert_data.keys())), []).append(create_key)
+        for create_group in groups.values():
+            created: Dict[str, Dict[str, Any]] = {}
+            try:
+                self._count('queries')
+                response = self._supabase.table('companies').insert([to_create[k][1] for k in create_group]).execute()
+                for row in response.data or []:
+                    domain = str(row.get('domain') or '').strip().lower()
+                    created[domain or f"name:{str(row.get('name') or '').strip().lower()}"] = row
+                self._count('created', len(created))
+            except Exception as e:
+                # e.g. a company created concurrently by another job
+                logger.debug(f"Bulk company insert failed, resolving individually: {e}")
+            for create_key in create_group:
+                row = created.get(create_key)
+                if row:
+                    with self._lock:
+                        self._remember(row)
+                    company_id = row['id']
+                else:
+                    self._count('fallbacks')
+                    key = to_create[create_key][0]
+                    company_name, industry = unresolved[key]
+                    company_id = find_or_create_company(self._supabase, company_name, key[1] or None, industry)
+                with self._lock:
+                    for key in create_keys[create_key]:
+                        self._results[key] = company_id
+    
+    def resolve(self, company_name: Optional[str] = None, domain: Optional[str] = None,
+                industry: Optional[str] = None) -> Optional[str]:
+        """
+        Resolve one company (memoized; prefetch a batch first to resolve it in bulk)
+        Returns:
+            Company ID or None
+        """
+        key = self._key(company_name, domain)
+        if key == ('', ''):
+            return None
+        with self._lock:
+            if key in self._results:
+                return self._results[key]
+        self.prefetch([(company_name, domain, industry)])
+        with self._lock:
+            return self._results.get(key)
+    
+    def ensure_industry(self, company_id: str, industry: Optional[str]):
+        """Set a company's industry if it has none (checked once per company)"""
+        if not industry or not company_id:
+            return
+        with self._lock:
+            if company_id in self._industry_checked:
+                return
+            self._industry_checked.add(company_id)
+            row = self._by_id.get(company_id)
+        if row is None:
+            try:
+                company_check = self._supabase.table('companies').select('id, industry').eq('id', company_id).limit(1).execute()
+            except Exception as check_error:
+                logger.debug(f"Could not check company industry: {check_error}")
+                return
+            if not company_check.data:
+                return
+            row = company_check.data[0]
+            with self._lock:
+                row = self._by_id.setdefault(company_id, row)
+        if row.get('industry'):
+            return
+        try:
+            self._supabase.table('companies').update({'industry': str(industry).strip()}).eq('id', company_id).execute()
+        except Exception as update_error:
+            logger.debug(f"Could not update company industry: {update_error}")
+        with self._lock:
+            row['industry'] = str(industry).strip()
+
+
+def _chunk_in_values(values: List[str], max_chars: int = IN_FILTER_MAX_CHARS) -> List[List[str]]:
+    """
+    Split values for in_() filters so each request's filter stays under max_chars
+    once URL-encoded (and under LOOKUP_BATCH_SIZE values)
+    """
+    chunks = []
+    chunk = []
+    size = 0
+    for value in values:
+        # Quotes and separator around each URL-encoded value
+        value_size = len(quote(value, safe='')) + 5
+        if chunk and (size + value_size > max_chars or len(chunk) >= LOOKUP_BATCH_SIZE):
+            chunks.append(chunk)
+            chunk = []
+            size = 0
+        chunk.append(value)
+        size += value_size
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+def _index_existing_contacts(supabase, column: str, values: List[str], normalize) -> Dict[str, Dict[str, Any]]:
+    """
+    Look up existing contacts whose column is one of values (chunked IN queries)
+    Returns:
+        Normalized column value -> first matching contact
+    """
+    index: Dict[str, Dict[str, Any]] = {}
+    for chunk in _chunk_in_values(values):
+        try:
+            response = supabase.table('contacts').select('*').in_(column, chunk).execute()
+        except Exception as e:
+            logger.warning(f"Error checking existing {column}s: {e}")
+            continue
+        for contact in response.data or []:
+            key = normalize(contact.get(column))
+            if key:
+                index.setdefault(key, contact)
+    return index
+
+
 def find_duplicates(
     supabase,
     rows: List[Dict[str, Any]]
 ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
     """
     Find duplicate contacts by email/phone.
+    Existing contacts are fetched with chunked IN queries and indexed by normalized
+    email/phone once, so each row is answered with a dict lookup.
     Returns tuple of (duplicates, uniques).
     """
-    emails = [normalize_email(r.get('email')) for r in rows if r.get('email')]
-    phones = [normalize_phone(r.get('phone')) for r in rows if r.get('phone')]
-
-    existing_emails = []
-    existing_phones = []
+    row_keys = [(normalize_email(r.get('email')), normalize_phone(r.get('phone'))) for r in rows]
+    emails = list(dict.fromkeys(email for email, _ in row_keys if email))
+    phones = list(dict.fromkeys(phone for _, phone in row_keys if phone))
 
     # Guard against empty arrays
-    if emails:
-        try:
-            # Supabase Python client uses .in_() method
-            response = supabase.table('contacts').select('*').in_('email', emails).execute()
-            existing_emails = response.data or []
-        except Exception as e:
-            logger.warning(f"Error checking existing emails: {e}")
-            existing_emails = []
-
-    if phones:
-        try:
-            response = supabase.table('contacts').select('*').in_('phone', phones).execute()
-            existing_phones = response.data or []
-        except Exception as e:
-            logger.warning(f"Error checking existing phones: {e}")
-            existing_phones = []
+    existing_by_email = _index_existing_contacts(supabase, 'email', emails, normalize_email) if emails else {}
+    existing_by_phone = _index_existing_contacts(supabase, 'phone', phones, normalize_phone) if phones else {}
 
     duplicates = []
     uniques = []
 
-    for row in rows:
-        row_email = normalize_email(row.get('email'))
-        row_phone = normalize_phone(row.get('phone'))
-        
-        email_match = None
-        if row_email:
-            email_match = next(
-                (e for e in existing_emails if e.get('email') and normalize_email(e['email']) == row_email),
-                None
-            )
-        
-        phone_match = None
-        if row_phone:
-            phone_match = next(
-                (p for p in existing_phones if p.get('phone') and normalize_phone(p['phone']) == row_phone),
-                None
-            )
+    for row, (row_email, row_phone) in zip(rows, row_keys):
+        email_match = existing_by_email.get(row_email) if row_email else None
+        phone_match = existing_by_phone.get(row_phone) if row_phone else None
 
         if email_match or phone_match:
             match_type = 'email' if email_match else 'phone'
@@ -294,6 +689,285 @@ def find_duplicates(
     return duplicates, uniques
 
 
+def _upsert_rows_individually(supabase, chunk: List[Dict[str, Any]], prepared: List[Dict[str, Any]], i: int) -> Dict[str, Any]:
+    """
+    Per-row upsert of one prepared chunk (one request per row)
+    Fallback for chunks the bulk path cannot write
+    Args:
+        supabase: Supabase client
+        chunk: Original prepared rows of the chunk (with __ fields)
+        prepared: Final rows to write
+        i: Offset of the chunk in the import
+    Returns:
+        Dict with imported, data, report, errors
+    """
+    result = {'imported': 0, 'data': [], 'report': [], 'errors': []}
+    # Split into email-keyed and phone-only rows
+    email_rows = [r for r in prepared if r.get('email')]
+    phone_only_rows = [r for r in prepared if not r.get('email') and r.get('phone')]
+    
+    # Upsert email-keyed rows - optimized batch processing
+    if email_rows:
+        try:
+            # Batch fetch all existing emails at once
+            email_norms = [normalize_email(erow.get('email')) for erow in email_rows if normalize_email(erow.get('email'))]
+            existing_emails_map = {}
+            
+            if email_norms:
+                # Query all existing emails in one go (Supabase supports IN queries)
+                try:
+                    # Split into smaller batches if too many (Supabase has query size limits)
+                    batch_size = 50
+                    for batch_start in range(0, len(email_norms), batch_size):
+                        batch_emails = email_norms[batch_start:batch_start + batch_size]
+                        existing_query = supabase.table('contacts').select('id, email').in_('email', batch_emails).execute()
+                        if existing_query.data:
+                            for existing_contact in existing_query.data:
+                                existing_emails_map[normalize_email(existing_contact.get('email'))] = existing_contact.get('id')
+                except Exception as batch_error:
+                    logger.warning(f"Batch email lookup failed, falling back to individual queries: {batch_error}")
+                    existing_emails_map = {}
+            
+            # Now process each row
+            for erow_idx, erow in enumerate(email_rows):
+                try:
+                    email_norm = normalize_email(erow.get('email'))
+                    if not email_norm:
+                        continue
+                    
+                    contact_id = existing_emails_map.get(email_norm)
+                    
+                    if contact_id:
+                        # Update existing
+                        try:
+                            update_response = supabase.table('contacts').update(erow).eq('id', contact_id).execute()
+                            if update_response.data:
+                                result['imported'] += 1
+                                result['data'].extend(update_response.data)
+                                # Find original index from the chunk
+                                orig_idx = i + erow_idx
+                                for orig_row in chunk:
+                                    if orig_row.get('__normalized_email') == email_norm:
+                                        orig_idx = orig_row.get('__orig_index', orig_idx)
+                                        break
+                                
+                                result['report'].append({
+                                    'index': orig_idx,
+                                    'email': erow.get('email'),
+                                    'phone': erow.get('phone'),
+                                    'status': 'ok',
+                                    'id': contact_id
+                                })
+                        except Exception as update_error:
+                            logger.error(f"Error updating contact {contact_id}: {update_error}")
+                            result['report'].append({
+                                'index': i + erow_idx,
+                                'email': erow.get('email'),
+                                'phone': erow.get('phone'),
+                                'status': 'error',
+                                'error': str(update_error)
+                            })
+                    else:
+                        # Insert new - batch insert if possible
+                        try:
+                            insert_response = supabase.table('contacts').insert([erow]).execute()
+                            if insert_response.data:
+                                result['imported'] += 1
+                                result['data'].extend(insert_response.data)
+                                new_id = insert_response.data[0].get('id')
+                                # Update map for potential duplicates in same batch
+                                existing_emails_map[email_norm] = new_id
+                                result['report'].append({
+                                    'index': i + erow_idx,
+                                    'email': erow.get('email'),
+                                    'phone': erow.get('phone'),
+                                    'status': 'ok',
+                                    'id': new_id
+                                })
+                        except Exception as insert_error:
+                            logger.error(f"Error inserting contact: {insert_error}")
+                            result['report'].append({
+                                'index': i + erow_idx,
+                                'email': erow.get('email'),
+                                'phone': erow.get('phone'),
+                                'status': 'error',
+                                'error': str(insert_error)
+                            })
+                except Exception as row_error:
+                    logger.error(f"Error processing email row {erow_idx}: {row_error}")
+                    result['report'].append({
+                        'index': i + erow_idx,
+                        'email': erow.get('email', ''),
+                        'phone': erow.get('phone', ''),
+                        'status': 'error',
+                        'error': str(row_error)
+                    })
+        except Exception as e:
+            logger.error(f"Error upserting email rows: {e}")
+            import traceback
+            logger.error(traceback.format_exc())
+            result['errors'].append({'index': i, 'message': str(e)})
+    
+    # Handle phone-only rows (find and update or insert)
+    for pidx, row in enumerate(phone_only_rows):
+        try:
+            phone_norm = normalize_phone(row.get('phone'))
+            if not phone_norm:
+                continue
+            
+            # Look for existing contact by phone
+            existing_response = supabase.table('contacts').select('*').eq('phone', phone_norm).limit(1).execute()
+            
+            if existing_response.data and len(existing_response.data) > 0:
+                # Update existing
+                contact_id = existing_response.data[0]['id']
+                update_response = supabase.table('contacts').update(row).eq('id', contact_id).execute()
+                if update_response.data:
+                    result['imported'] += 1
+                    result['data'].extend(update_response.data)
+                    result['report'].append({
+                        'index': i + len(email_rows) + pidx,
+                        'email': row.get('email'),
+                        'phone': row.get('phone'),
+                        'status': 'ok',
+                        'id': contact_id
+                    })
+            else:
+                # Insert new
+                insert_response = supabase.table('contacts').insert([row]).execute()
+                if insert_response.data:
+                    result['imported'] += 1
+                    result['data'].extend(insert_response.data)
+                    result['report'].append({
+                        'index': i + len(email_rows) + pidx,
+                        'email': row.get('email'),
+                        'phone': row.get('phone'),
+                        'status': 'ok',
+                        'id': insert_response.data[0].get('id')
+                    })
+        except Exception as e:
+            logger.error(f"Error processing phone-only row: {e}")
+            result['errors'].append({'index': i + len(email_rows) + pidx, 'message': str(e)})
+    return result
+
+
+def _group_by_columns(rows: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """
+    Group rows by their set of columns
+    PostgREST bulk writes use the union of all rows' keys and null out the ones a row lacks,
+    so rows with different columns are written in separate requests
+    """
+    groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+    for row in rows:
+        groups.setdefault(tuple(sorted(row.keys())), []).append(row)
+    return list(groups.values())
+
+
+def _merge_by_key(rows: List[Dict[str, Any]], indexes: List[int], key_fn) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, List[int]]]:
+    """
+    Collapse rows sharing a key into one (later values win, as sequential updates would)
+    One upsert statement cannot touch the same row twice
+    """
+    merged: Dict[str, Dict[str, Any]] = {}
+    merged_indexes: Dict[str, List[int]] = {}
+    for row, idx in zip(rows, indexes):
+        key = key_fn(row)
+        merged[key] = {**merged.get(key, {}), **row}
+        merged_indexes.setdefault(key, []).append(idx)
+    return merged, merged_indexes
+
+
+def _report_written(written: Dict[str, Dict[str, Any]], merged: Dict[str, Dict[str, Any]],
+                    merged_indexes: Dict[str, List[int]], result: Dict[str, Any]):
+    """Add per-row report entries for rows written by a bulk request"""
+    for key, row in merged.items():
+        db_row = written.get(key)
+        for idx in merged_indexes[key]:
+            if db_row:
+                result['imported'] += 1
+                result['report'].append({
+                    'index': idx,
+                    'email': row.get('email'),
+                    'phone': row.get('phone'),
+                    'status': 'ok',
+                    'id': db_row.get('id')
+                })
+            else:
+                result['report'].append({
+                    'index': idx,
+                    'email': row.get('email'),
+                    'phone': row.get('phone'),
+                    'status': 'error',
+                    'error': 'row not returned by bulk upsert'
+                })
+    result['data'].extend(written.values())
+
+
+def _bulk_upsert_chunk(supabase, prepared: List[Dict[str, Any]], indexes: List[int]) -> Dict[str, Any]:
+    """
+    Set-based upsert of one prepared chunk
+    Email rows: upsert(on_conflict='email'). Phone-only rows: one IN lookup of existing
+    phones, then upsert(on_conflict='id') for matches and a bulk insert for the rest.
+    Args:
+        supabase: Supabase client
+        prepared: Final rows to write (email and phone already normalized)
+        indexes: Original import index of each prepared row
+    Returns:
+        Dict with imported, data, report, and failed (rows to retry per-row)
+    """
+    result = {'imported': 0, 'data': [], 'report': [], 'failed': []}
+    
+    email_pairs = [(r, idx) for r, idx in zip(prepared, indexes) if r.get('email')]
+    phone_pairs = [(r, idx) for r, idx in zip(prepared, indexes) if not r.get('email') and r.get('phone')]
+    
+    if email_pairs:
+        merged, merged_indexes = _merge_by_key(
+            [r for r, _ in email_pairs], [idx for _, idx in email_pairs], lambda r: normalize_email(r['email'])
+        )
+        try:
+            written = {}
+            for group in _group_by_columns(list(merged.values())):
+                response = supabase.table('contacts').upsert(group, on_conflict='email').execute()
+                for db_row in response.data or []:
+                    written[normalize_email(db_row.get('email'))] = db_row
+            _report_written(written, merged, merged_indexes, result)
+        except Exception as e:
+            logger.warning(f"Bulk email upsert failed ({len(merged)} rows): {e}")
+            result['failed'].extend(email_pairs)
+    
+    if phone_pairs:
+        merged, merged_indexes = _merge_by_key(
+            [r for r, _ in phone_pairs], [idx for _, idx in phone_pairs], lambda r: normalize_phone(r['phone'])
+        )
+        try:
+            # Same matching as the per-row path: any existing contact with this phone
+            existing_ids: Dict[str, str] = {}
+            phones = list(merged.keys())
+            for batch_start in range(0, len(phones), LOOKUP_BATCH_SIZE):
+                batch = phones[batch_start:batch_start + LOOKUP_BATCH_SIZE]
+                response = supabase.table('contacts').select('id, phone').in_('phone', batch).execute()
+                for existing in response.data or []:
+                    existing_ids.setdefault(normalize_phone(existing.get('phone')), existing.get('id'))
+            
+            updates = [{**row, 'id': existing_ids[phone]} for phone, row in merged.items() if phone in existing_ids]
+            inserts = [row for phone, row in merged.items() if phone not in existing_ids]
+            written = {}
+            for group in _group_by_columns(updates):
+                response = supabase.table('contacts').upsert(group, on_conflict='id').execute()
+                for db_row in response.data or []:
+                    written[normalize_phone(db_row.get('phone'))] = db_row
+            for group in _group_by_columns(inserts):
+                response = supabase.table('contacts').insert(group).execute()
+                for db_row in response.data or []:
+                    written[normalize_phone(db_row.get('phone'))] = db_row
+            _report_written(written, merged, merged_indexes, result)
+        except Exception as e:
+            logger.warning(f"Bulk phone-only upsert failed ({len(merged)} rows): {e}")
+            result['failed'].extend(phone_pairs)
+    
+    return result
+
+
 def upsert_contacts(
     supabase,
     rows: List[Dict[str, Any]],
@@ -303,10 +977,23 @@ def upsert_contacts(
     Bulk upsert contacts with deduplication logic.
     Similar to Next.js implementation with chunked processing.
     
-    Returns dict with: imported, errors, data, report
+    Options:
+        bulk: Write whole chunks with set-based upserts (default: CONTACTS_BULK_UPSERT);
+              chunks that fail are retried row by row
+        company_resolver: CompanyResolver to share across calls of one import job
+        enrich_linkedin: Queue written contacts that have a LinkedIn URL but no company or
+              industry for deferred enrichment (default: True)
+    
+    Returns dict with: imported, errors, data, report, enrichment_queued
     """
     update_existing = options.get('updateExisting', False) if options else False
-    chunk_size = 25  # Reduced chunk size to avoid ON CONFLICT collisions
+    bulk = options.get('bulk', CONTACTS_BULK_UPSERT) if options else CONTACTS_BULK_UPSERT
+    company_resolver = (options or {}).get('company_resolver') or CompanyResolver(supabase)
+    defer_enrichment = ENRICHMENT_AVAILABLE and (options or {}).get('enrich_linkedin', True)
+    enrichment_indexes = set()
+    enrichment_rows: Dict[int, Dict[str, Any]] = {}  # index -> row as written, for deferred enrichment
+    # Per-row path: small chunks to avoid ON CONFLICT collisions
+    chunk_size = BULK_UPSERT_CHUNK_SIZE if bulk else 25
     
     errors = []
     imported = 0
@@ -363,6 +1050,8 @@ def upsert_contacts(
             logger.info(f"Processing chunk {chunk_idx + 1}/{total_chunks}: {len(chunk)} contacts")
         
         prepared = []
+        prepared_indexes = []
+        pending = []
         for r in chunk:
             if r['__skip_no_key']:
                 per_row_report.append({
@@ -388,29 +1077,10 @@ def upsert_contacts(
             industry = row.get('industry')
             linkedin = row.get('linkedin')
             
-            # Try to enrich contact from LinkedIn if available
-            if linkedin and ENRICHMENT_AVAILABLE and (not company_name or not industry):
-                try:
-                    enrichment_service = get_enrichment_service()
-                    contact_enriched = enrichment_service.enrich_contact_from_linkedin(
-                        linkedin_url=linkedin,
-                        name=row.get('name'),
-                        email=row.get('email')
-                    )
-                    if contact_enriched:
-                        # Use enriched company name if we don't have one
-                        if not company_name and contact_enriched.get('company'):
-                            company_name = contact_enriched.get('company')
-                            logger.debug(f"Enriched company name '{company_name}' from LinkedIn")
-                        # Use enriched industry if we don't have one
-                        if not industry and contact_enriched.get('industry'):
-                            industry = contact_enriched.get('industry')
-                            logger.debug(f"Enriched industry '{industry}' from LinkedIn")
-                        # Update role if missing
-                        if not row.get('role') and contact_enriched.get('role'):
-                            row['role'] = contact_enriched.get('role')
-                except Exception as enrich_error:
-                    logger.debug(f"LinkedIn enrichment failed: {enrich_error}")
+            # LinkedIn enrichment runs after the write (see linkedin_enrichment), so a slow
+            # enrichment call never holds up the chunk
+            if linkedin and defer_enrichment and (not company_name or not industry):
+                enrichment_indexes.add(r['__orig_index'])
             
             # Hunter.io integration: DISABLED - no paid subscription
             # if HUNTER_AVAILABLE:
@@ -491,24 +1161,26 @@ def upsert_contacts(
             #     except Exception as hunter_error:
             #         logger.debug(f"Hunter.io integration error: {hunter_error}")
             
-            # Don't generate fallback name here - let find_or_create_company handle enrichment
-            # It will use OpenAI to enrich from domain if name is missing
-            
+            pending.append((r, row, company_name, domain, industry))
+        
+        # Resolve all companies of the chunk at once (memoized across chunks and batches)
+        try:
+            company_resolver.prefetch(
+                (company_name, domain, industry) for _, _, company_name, domain, industry in pending
+                if domain or company_name
+            )
+        except Exception as company_error:
+            logger.error(f"Error resolving companies for chunk {chunk_idx + 1}: {company_error}")
+        
+        for r, row, company_name, domain, industry in pending:
             if domain or company_name:
                 try:
-                    company_id = find_or_create_company(supabase, company_name, domain, industry)
+                    company_id = company_resolver.resolve(company_name, domain, industry)
                     if company_id:
                         row['company_id'] = company_id
                         logger.debug(f"Resolved company_id {company_id} for company '{company_name}' / domain '{domain}'")
                         # Also update company industry if contact has industry and company doesn't
-                        if industry and company_id:
-                            try:
-                                # Check if company has industry, if not update it
-                                company_check = supabase.table('companies').select('industry').eq('id', company_id).limit(1).execute()
-                                if company_check.data and not company_check.data[0].get('industry'):
-                                    supabase.table('companies').update({'industry': str(industry).strip()}).eq('id', company_id).execute()
-                            except Exception as update_error:
-                                logger.debug(f"Could not update company industry: {update_error}")
+                        company_resolver.ensure_industry(company_id, industry)
                     else:
                         logger.warning(f"Failed to create/find company for '{company_name}' / domain '{domain}'")
                 except Exception as company_error:
@@ -525,170 +1197,84 @@ def upsert_contacts(
             if clean_row.get('industry'):
                 clean_row['industry'] = str(clean_row['industry']).strip().lower()
             
+            if r['__orig_index'] in enrichment_indexes:
+                enrichment_rows[r['__orig_index']] = clean_row
+            
             # Pick only allowed columns
             final_row = {k: v for k, v in clean_row.items() if k in allowed_columns}
             prepared.append(final_row)
+            prepared_indexes.append(r['__orig_index'])
         
         if not prepared:
             continue
         
         # Perform upsert
         try:
-            # Split into email-keyed and phone-only rows
-            email_rows = [r for r in prepared if r.get('email')]
-            phone_only_rows = [r for r in prepared if not r.get('email') and r.get('phone')]
-            
-            # Upsert email-keyed rows - optimized batch processing
-            if email_rows:
-                try:
-                    # Batch fetch all existing emails at once
-                    email_norms = [normalize_email(erow.get('email')) for erow in email_rows if normalize_email(erow.get('email'))]
-                    existing_emails_map = {}
-                    
-                    if email_norms:
-                        # Query all existing emails in one go (Supabase supports IN queries)
-                        try:
-                            # Split into smaller batches if too many (Supabase has query size limits)
-                            batch_size = 50
-                            for batch_start in range(0, len(email_norms), batch_size):
-                                batch_emails = email_norms[batch_start:batch_start + batch_size]
-                                existing_query = supabase.table('contacts').select('id, email').in_('email', batch_emails).execute()
-                                if existing_query.data:
-                                    for existing_contact in existing_query.data:
-                                        existing_emails_map[normalize_email(existing_contact.get('email'))] = existing_contact.get('id')
-                        except Exception as batch_error:
-                            logger.warning(f"Batch email lookup failed, falling back to individual queries: {batch_error}")
-                            existing_emails_map = {}
-                    
-                    # Now process each row
-                    for erow_idx, erow in enumerate(email_rows):
-                        try:
-                            email_norm = normalize_email(erow.get('email'))
-                            if not email_norm:
-                                continue
-                            
-                            contact_id = existing_emails_map.get(email_norm)
-                            
-                            if contact_id:
-                                # Update existing
-                                try:
-                                    update_response = supabase.table('contacts').update(erow).eq('id', contact_id).execute()
-                                    if update_response.data:
-                                        imported += 1
-                                        returned_rows.extend(update_response.data)
-                                        # Find original index from the chunk
-                                        orig_idx = i + erow_idx
-                                        for orig_row in chunk:
-                                            if orig_row.get('__normalized_email') == email_norm:
-                                                orig_idx = orig_row.get('__orig_index', orig_idx)
-                                                break
-                                        
-                                        per_row_report.append({
-                                            'index': orig_idx,
-                                            'email': erow.get('email'),
-                                            'phone': erow.get('phone'),
-                                            'status': 'ok',
-                                            'id': contact_id
-                                        })
-                                except Exception as update_error:
-                                    logger.error(f"Error updating contact {contact_id}: {update_error}")
-                                    per_row_report.append({
-                                        'index': i + erow_idx,
-                                        'email': erow.get('email'),
-                                        'phone': erow.get('phone'),
-                                        'status': 'error',
-                                        'error': str(update_error)
-                                    })
-                            else:
-                                # Insert new - batch insert if possible
-                                try:
-                                    insert_response = supabase.table('contacts').insert([erow]).execute()
-                                    if insert_response.data:
-                                        imported += 1
-                                        returned_rows.extend(insert_response.data)
-                                        new_id = insert_response.data[0].get('id')
-                                        # Update map for potential duplicates in same batch
-                                        existing_emails_map[email_norm] = new_id
-                                        per_row_report.append({
-                                            'index': i + erow_idx,
-                                            'email': erow.get('email'),
-                                            'phone': erow.get('phone'),
-                                            'status': 'ok',
-                                            'id': new_id
-                                        })
-                                except Exception as insert_error:
-                                    logger.error(f"Error inserting contact: {insert_error}")
-                                    per_row_report.append({
-                                        'index': i + erow_idx,
-                                        'email': erow.get('email'),
-                                        'phone': erow.get('phone'),
-                                        'status': 'error',
-                                        'error': str(insert_error)
-                                    })
-                        except Exception as row_error:
-                            logger.error(f"Error processing email row {erow_idx}: {row_error}")
-                            per_row_report.append({
-                                'index': i + erow_idx,
-                                'email': erow.get('email', ''),
-                                'phone': erow.get('phone', ''),
-                                'status': 'error',
-                                'error': str(row_error)
-                            })
-                except Exception as e:
-                    logger.error(f"Error upserting email rows: {e}")
-                    import traceback
-                    logger.error(traceback.format_exc())
-                    errors.append({'index': i, 'message': str(e)})
+            if bulk:
+                bulk_result = _bulk_upsert_chunk(supabase, prepared, prepared_indexes)
+                imported += bulk_result['imported']
+                returned_rows.extend(bulk_result['data'])
+                per_row_report.extend(bulk_result['report'])
+                if not bulk_result['failed']:
+                    continue
+                # Retry only the rows the bulk requests could not write
+                logger.warning(f"Falling back to per-row upserts for {len(bulk_result['failed'])} rows of chunk {chunk_idx + 1}")
+                failed_indexes = {idx for _, idx in bulk_result['failed']}
+                chunk = [r for r in chunk if r['__orig_index'] in failed_indexes]
+                prepared = [row for row, _ in bulk_result['failed']]
             
-            # Handle phone-only rows (find and update or insert)
-            for pidx, row in enumerate(phone_only_rows):
-                try:
-                    phone_norm = normalize_phone(row.get('phone'))
-                    if not phone_norm:
-                        continue
-                    
-                    # Look for existing contact by phone
-                    existing_response = supabase.table('contacts').select('*').eq('phone', phone_norm).limit(1).execute()
-                    
-                    if existing_response.data and len(existing_response.data) > 0:
-                        # Update existing
-                        contact_id = existing_response.data[0]['id']
-                        update_response = supabase.table('contacts').update(row).eq('id', contact_id).execute()
-                        if update_response.data:
-                            imported += 1
-                            returned_rows.extend(update_response.data)
-                            per_row_report.append({
-                                'index': i + len(email_rows) + pidx,
-                                'email': row.get('email'),
-                                'phone': row.get('phone'),
-                                'status': 'ok',
-                                'id': contact_id
-                            })
-                    else:
-                        # Insert new
-                        insert_response = supabase.table('contacts').insert([row]).execute()
-                        if insert_response.data:
-                            imported += 1
-                            returned_rows.extend(insert_response.data)
-                            per_row_report.append({
-                                'index': i + len(email_rows) + pidx,
-                                'email': row.get('email'),
-                                'phone': row.get('phone'),
-                                'status': 'ok',
-                                'id': insert_response.data[0].get('id')
-                            })
-                except Exception as e:
-                    logger.error(f"Error processing phone-only row: {e}")
-                    errors.append({'index': i + len(email_rows) + pidx, 'message': str(e)})
+            chunk_result = _upsert_rows_individually(supabase, chunk, prepared, i)
+            imported += chunk_result['imported']
+            returned_rows.extend(chunk_result['data'])
+            per_row_report.extend(chunk_result['report'])
+            errors.extend(chunk_result['errors'])
         
         except Exception as e:
             logger.error(f"Error in chunk processing: {e}")
             errors.append({'index': i, 'message': str(e)})
     
+    enrichment_queued = 0
+    if enrichment_rows:
+        enrichment_queued = _queue_linkedin_enrichment(supabase, enrichment_rows, per_row_report)
+    
     return {
         'imported': imported,
         'errors': errors,
         'data': returned_rows,
-        'report': per_row_report
+        'report': per_row_report,
+        'enrichment_queued': enrichment_queued
     }
 
+
+def _queue_linkedin_enrichment(supabase, rows: Dict[int, Dict[str, Any]], report: List[Dict[str, Any]]) -> int:
+    """Queue the written contacts among rows (import index -> row) for deferred LinkedIn enrichment"""
+    from app.services.linkedin_enrichment import get_linkedin_enrichment_queue
+    
+    if not get_enrichment_service().client:
+        return 0
+    contacts = []
+    seen_ids = set()
+    for entry in report:
+        row = rows.get(entry.get('index'))
+        if row is None or entry.get('status') != 'ok' or not entry.get('id') or entry['id'] in seen_ids:
+            continue
+        seen_ids.add(entry['id'])
+        # Values as written; only empty fields are filled later
+        contacts.append({
+            'id': entry['id'],
+            'name': row.get('name'),
+            'email': row.get('email'),
+            'linkedin': row.get('linkedin'),
+            'role': row.get('role'),
+            'industry': row.get('industry'),
+            'company_id': row.get('company_id'),
+            'domain': row.get('domain')
+        })
+    if not contacts:
+        return 0
+    try:
+        return get_linkedin_enrichment_queue().submit(supabase, contacts)
+    except Exception as e:
+        logger.warning(f"Could not queue LinkedIn enrichment for {len(contacts)} contacts: {e}")
+        return 0
+
@@ -0,0 +1,200 @@
+"""
+Persistent cache of company enrichment results, keyed by normalized domain
+Results live in the company_enrichment_cache table (migration 025) with Redis
+in front. Domains the model did not recognize are cached too ("negative"
+results) with a shorter TTL, and free-mail/ISP domains are recognized without
+any lookup at all, so re-importing known domains costs no LLM calls.
+"""
+import os
+import re
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.integrations.redis_client import get_cached, get_cached_many, set_cached
+from app.services.table_cache import TableBackedCache
+from app.utils.timestamps import parse_timestamp
+
+logger = logging.getLogger(__name__)
+
+ENRICHMENT_CACHE_TTL_DAYS = int(os.getenv('ENRICHMENT_CACHE_TTL_DAYS', 90))
+ENRICHMENT_NEGATIVE_TTL_DAYS = int(os.getenv('ENRICHMENT_NEGATIVE_TTL_DAYS', 7))
+# Redis copy of a table entry (capped by the entry's own expiry)
+ENRICHMENT_REDIS_TTL = int(os.getenv('ENRICHMENT_REDIS_TTL', 86400))
+
+# Personal email and ISP mailbox domains: never a company
+FREE_MAIL_DOMAINS = frozenset({
+    'gmail.com', 'googlemail.com', 'yahoo.com', 'ymail.com', 'rocketmail.com',
+    'outlook.com', 'hotmail.com', 'live.com', 'msn.com', 'passport.com',
+    'icloud.com', 'me.com', 'mac.com', 'aol.com', 'aim.com',
+    'protonmail.com', 'proton.me', 'pm.me', 'tutanota.com', 'tuta.io',
+    'zohomail.com', 'zoho.in', 'yandex.com', 'yandex.ru', 'mail.ru', 'inbox.ru', 'bk.ru', 'list.ru',
+    'gmx.com', 'gmx.net', 'gmx.de', 'web.de', 'mail.com', 'email.com', 'inbox.com',
+    'fastmail.com', 'fastmail.fm', 'hushmail.com', 'lycos.com', 'excite.com',
+    'qq.com', '163.com', '126.com', 'sina.com', 'sohu.com', 'yeah.net',
+    'naver.com', 'hanmail.net', 'daum.net',
+    'rediffmail.com', 'sify.com', 'vsnl.net', 'vsnl.com', 'indiatimes.com', 'airtelmail.in',
+    'comcast.net', 'verizon.net', 'att.net', 'sbcglobal.net', 'bellsouth.net', 'cox.net',
+    'charter.net', 'earthlink.net', 'optonline.net', 'btinternet.com', 'sky.com',
+    'virginmedia.com', 'ntlworld.com', 'talktalk.net', 'orange.fr', 'wanadoo.fr', 'free.fr',
+    'laposte.net', 'sfr.fr', 't-online.de', 'libero.it', 'virgilio.it', 'tiscali.it',
+    'bigpond.com', 'optusnet.com.au', 'shaw.ca', 'rogers.com', 'sympatico.ca', 'telus.net',
+    'uol.com.br', 'bol.com.br', 'terra.com.br',
+})
+# Providers with a domain per country (yahoo.co.in, hotmail.co.uk, outlook.de, ...)
+FREE_MAIL_BRANDS = frozenset({'yahoo', 'hotmail', 'outlook', 'live', 'gmx', 'ymail', 'rediffmail'})
+
+# Domains per table IN (...) lookup
+_TABLE_LOOKUP_BATCH = 100
+
+_SCHEME_RE = re.compile(r'^[a-z][a-z0-9+.-]*://')
+
+
+def normalize_domain(domain: Optional[str]) -> str:
+    """
+    Normalize a domain, URL or email address to a bare lowercase domain
+    ('https://www.Example.com/about' -> 'example.com', 'a@b.com' -> 'b.com')
+    """
+    if not domain:
+        return ''
+    value = str(domain).strip().lower()
+    value = value.rsplit('@', 1)[-1]
+    value = _SCHEME_RE.sub('', value)
+    value = value.split('/', 1)[0].split('?', 1)[0].split(':', 1)[0].strip('.')
+    if value.startswith('www.'):
+        value = value[4:]
+    return value
+
+
+def is_free_mail_domain(domain: str) -> bool:
+    """Whether a normalized domain belongs to a free-mail or ISP mailbox provider"""
+    if domain in FREE_MAIL_DOMAINS:
+        return True
+    # Brand followed by a (country) suffix such as .de, .co.in, .com.au
+    labels = domain.split('.')
+    return (labels[0] in FREE_MAIL_BRANDS and 1 <= len(labels) - 1 <= 2
+            and all(len(label) <= 3 for label in labels[1:]))
+
+
+def _redis_key(domain: str) -> str:
+    return f"enrichment:domain:{domain}"
+
+
+class DomainEnrichmentCache(TableBackedCache):
+    """Two-level (Redis, then Supabase table) cache of domain enrichment results"""
+
+    TABLE = 'company_enrichment_cache'
+    MIGRATION = '025'
+
+    def get(self, domain: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """
+        Look up a normalized domain
+        Returns:
+            Tuple of (hit, data); data is None for a cached negative result
+        """
+        entry, _ = get_cached(_redis_key(domain))
+        if entry is not None:
+            return True, entry.get('data')
+
+        supabase = self._client()
+        if supabase is None:
+            return False, None
+        try:
+            response = supabase.table(self.TABLE).select('status, data, expires_at')\
+                .eq('domain', domain).limit(1).execute()
+        except Exception as e:
+            self._table_error(e)
+            return False, None
+        if not response.data:
+            return False, None
+        row = response.data[0]
+        expires_at = parse_timestamp(row.get('expires_at'))
+        remaining = int((expires_at - datetime.now(timezone.utc)).total_seconds()) if expires_at else 0
+        if remaining <= 0:
+            return False, None
+        data = row.get('data') if row.get('status') == 'found' else None
+        set_cached(_redis_key(domain), {'data': data}, min(remaining, ENRICHMENT_REDIS_TTL))
+        return True, data
+
+    def get_many(self, domains: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Look up several normalized domains (one Redis MGET, then chunked table queries)
+        Returns:
+            Domain -> data (None for cached negative results) for the domains found
+        """
+        domains = list(dict.fromkeys(domains))
+        entries = get_cached_many(_redis_key(domain) for domain in domains)
+        found: Dict[str, Optional[Dict[str, Any]]] = {}
+        missing = []
+        for domain in domains:
+            entry = entries.get(_redis_key(domain))
+            if entry is not None:
+                found[domain] = entry.get('data')
+            else:
+                missing.append(domain)
+
+        supabase = self._client()
+        if not missing or supabase is None:
+            return found
+        now = datetime.now(timezone.utc)
+        for start in range(0, len(missing), _TABLE_LOOKUP_BATCH):
+            chunk = missing[start:start + _TABLE_LOOKUP_BATCH]
+            try:
+                response = supabase.table(self.TABLE).select('domain, status, data, expires_at')\
+                    .in_('domain', chunk).gt('expires_at', now.isoformat()).execute()
+            except Exception as e:
+                self._table_error(e)
+                break
+            for row in response.data or []:
+                remaining = int((parse_timestamp(row.get('expires_at')) - now).total_seconds())
+                data = row.get('data') if row.get('status') == 'found' else None
+                found[row['domain']] = data
+                set_cached(_redis_key(row['domain']), {'data': data}, max(1, min(remaining, ENRICHMENT_REDIS_TTL)))
+        return found
+
+    def set_many(self, results: Dict[str, Optional[Dict[str, Any]]], model: Optional[str] = None):
+        """Store several results (domain -> data or None) with one table upsert"""
+        if not results:
+            return
+        now = datetime.now(timezone.utc)
+        rows = []
+        for domain, data in results.items():
+            ttl_days = ENRICHMENT_CACHE_TTL_DAYS if data else ENRICHMENT_NEGATIVE_TTL_DAYS
+            set_cached(_redis_key(domain), {'data': data}, min(ttl_days * 86400, ENRICHMENT_REDIS_TTL))
+            rows.append({
+                'domain': domain,
+                'status': 'found' if data else 'not_found',
+                'data': data,
+                'model': model,
+                'enriched_at': now.isoformat(),
+                'expires_at': (now + timedelta(days=ttl_days)).isoformat()
+            })
+
+        supabase = self._client()
+        if supabase is None:
+            return
+        try:
+            supabase.table(self.TABLE).upsert(rows, on_conflict='domain').execute()
+        except Exception as e:
+            self._table_error(e)
+
+    def set(self, domain: str, data: Optional[Dict[str, Any]], model: Optional[str] = None):
+        """
+        Store a result (None stores a negative result with the shorter TTL)
+        Args:
+            domain: Normalized domain
+            data: Enrichment data, or None if the domain is unknown
+            model: Model that produced the result
+        """
+        self.set_many({domain: data}, model)
+
+
+_enrichment_cache = None
+
+
+def get_enrichment_cache() -> DomainEnrichmentCache:
+    """Get or create the global domain enrichment cache"""
+    global _enrichment_cache
+    if _enrichment_cache is None:
+        _enrichment_cache = DomainEnrichmentCache()
+    return _enrichment_cache
@@ -0,0 +1,89 @@
+"""Flexible matching of contact/company industry strings against requested industries"""
+import logging
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_industry(value: str) -> str:
+    """Lowercased industry with '&' -> 'and' and commas removed ('Travel & Tourism' -> 'travel and tourism')"""
+    return value.strip().lower().replace('&', 'and').replace(',', ' ').replace('  ', ' ').strip()
+
+
+class _RequestedIndustry:
+    """One requested industry, normalized once"""
+
+    __slots__ = ('name', 'clean', 'normalized', 'words')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.clean = name.strip().lower()
+        self.normalized = normalize_industry(name)
+        # Key words (> 3 characters)
+        self.words = [w for w in self.normalized.split() if len(w) > 3]
+
+    def matches(self, value: str, value_normalized: str, value_words: List[str]) -> bool:
+        """Exact, normalized, substring or key-word match of a lowercased industry value"""
+        if value == self.clean or value_normalized == self.normalized:
+            return True
+        if (self.clean in value or value in self.clean or
+                self.normalized in value_normalized or value_normalized in self.normalized):
+            return True
+        if self.words:
+            return (any(word in value for word in self.words) or
+                    any(word in self.clean for word in value_words))
+        return False
+
+
+class IndustryMatcher:
+    """
+    Matches contacts to a set of requested industries
+    The requested industries are normalized once, and the result for each distinct
+    industry string is memoized, so filtering many contacts only does string work
+    per distinct industry value. Not thread-safe; build one per request.
+    """
+
+    def __init__(self, industries: List[str]):
+        """
+        Args:
+            industries: Requested industry names (in priority order)
+        """
+        self.industries = [_RequestedIndustry(ind) for ind in industries]
+        self._memo: Dict[str, Tuple[bool, ...]] = {}
+
+    def _matches(self, raw: str) -> Tuple[bool, ...]:
+        """Which requested industries match an industry string (memoized per raw string)"""
+        result = self._memo.get(raw)
+        if result is None:
+            value = raw.strip().lower()
+            value_normalized = normalize_industry(value)
+            value_words = [w for w in value.split() if len(w) > 3]
+            result = tuple(ind.matches(value, value_normalized, value_words) for ind in self.industries)
+            self._memo[raw] = result
+        return result
+
+    def match(self, contact_industry: Optional[str], company_industry: Optional[str] = None) -> Optional[str]:
+        """
+        First requested industry matching a contact
+        Args:
+            contact_industry: Contact's industry (the company's industry is used when empty)
+            company_industry: Industry of the contact's company
+        Returns:
+            Matched requested industry name, or None
+        Note:
+            A contact with neither industry matches (an empty value is contained in
+            every requested industry), as ai_identify_targets has always filtered.
+        """
+        company = (company_industry or '').strip()
+        contact = (contact_industry or '').strip() or company
+        contact_matches = self._matches(contact)
+        company_matches = self._matches(company) if company else None
+        for i, ind in enumerate(self.industries):
+            if contact_matches[i] or (company_matches and company_matches[i]):
+                return ind.name
+        return None
+
+    @property
+    def distinct_values(self) -> int:
+        """Distinct industry strings evaluated so far"""
+        return len(self._memo)
@@ -0,0 +1,250 @@
+"""
+Deferred LinkedIn enrichment of imported contacts
+upsert_contacts writes contacts right away and queues the ones with a LinkedIn
+URL but no company or industry here. A small pool of worker threads calls
+enrich_contact_from_linkedin under a shared rate limit and buffers the results;
+they are written back in bulk (one UPDATE per distinct set of enriched values)
+every LINKEDIN_ENRICHMENT_FLUSH_SIZE results or LINKEDIN_ENRICHMENT_FLUSH_SECONDS,
+only filling fields that were empty at import time.
+The pool lives in memory: processes that exit with work queued (the job worker on
+shutdown) drain it with drain() and hand the rest to the durable job queue
+(app/jobs/linkedin_enrichment_job.py).
+"""
+import os
+import queue
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+from app.utils.rate_limiter import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+LINKEDIN_ENRICHMENT_WORKERS = int(os.getenv('LINKEDIN_ENRICHMENT_WORKERS', 4))
+# OpenAI calls per second across all workers
+LINKEDIN_ENRICHMENT_RATE = float(os.getenv('LINKEDIN_ENRICHMENT_RATE', 5))
+LINKEDIN_ENRICHMENT_QUEUE_SIZE = int(os.getenv('LINKEDIN_ENRICHMENT_QUEUE_SIZE', 10000))
+LINKEDIN_ENRICHMENT_FLUSH_SIZE = int(os.getenv('LINKEDIN_ENRICHMENT_FLUSH_SIZE', 50))
+LINKEDIN_ENRICHMENT_FLUSH_SECONDS = float(os.getenv('LINKEDIN_ENRICHMENT_FLUSH_SECONDS', 2.0))
+
+
+class LinkedInEnrichmentQueue:
+    """Worker pool that enriches queued contacts and writes the results back in bulk"""
+
+    def __init__(self, workers: int = LINKEDIN_ENRICHMENT_WORKERS, rate: float = LINKEDIN_ENRICHMENT_RATE,
+                 max_queued: int = LINKEDIN_ENRICHMENT_QUEUE_SIZE, flush_size: int = LINKEDIN_ENRICHMENT_FLUSH_SIZE,
+                 flush_seconds: float = LINKEDIN_ENRICHMENT_FLUSH_SECONDS):
+        """
+        Args:
+            workers: Enrichment threads
+            rate: Enrichment calls per second (shared by all workers)
+            max_queued: Contacts waiting for enrichment; further contacts are not enriched
+            flush_size: Results buffered before a bulk write
+            flush_seconds: Maximum seconds a result waits for its bulk write
+        """
+        self.workers = max(1, workers)
+        self.flush_size = max(1, flush_size)
+        self.flush_seconds = flush_seconds
+        self._limiter = RateLimiter(rate)
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queued)
+        self._results: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._flush_wakeup = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+        self.stats = {'queued': 0, 'dropped': 0, 'enriched': 0, 'empty': 0, 'failed': 0, 'written': 0}
+
+    def submit(self, supabase, contacts: List[Dict[str, Any]]) -> int:
+        """
+        Queue contacts for enrichment
+        Args:
+            supabase: Supabase client used for the write-back
+            contacts: Dicts with id, name, email, linkedin, and the import-time values of
+                role, industry, company_id and domain (empty values are filled)
+        Returns:
+            Number of contacts queued
+        """
+        if not contacts:
+            return 0
+        self._start()
+        queued = 0
+        for contact in contacts:
+            try:
+                self._queue.put_nowait((supabase, contact))
+                queued += 1
+            except queue.Full:
+                break
+        with self._lock:
+            self.stats['queued'] += queued
+            self.stats['dropped'] += len(contacts) - queued
+        if queued < len(contacts):
+            logger.warning(f"LinkedIn enrichment queue full, {len(contacts) - queued} contacts will not be enriched")
+        return queued
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every queued contact is enriched and written (for scripts that exit after an import)
+        Returns:
+            True if the queue drained within timeout
+        """
+        done = threading.Event()
+
+        def join():
+            self._queue.join()
+            done.set()
+
+        threading.Thread(target=join, daemon=True).start()
+        drained = done.wait(timeout)
+        self.flush()
+        return drained
+
+    def drain(self, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Enrich and write queued contacts for up to timeout seconds, then take the rest off
+        the queue (for processes shutting down)
+        Returns:
+            Contacts that were still waiting for enrichment
+        """
+        if self.wait(timeout):
+            return []
+        remaining = []
+        while True:
+            try:
+                _, contact = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            remaining.append(contact)
+            self._queue.task_done()
+        # Let the calls already in flight finish and write their results
+        self.wait(self.flush_seconds)
+        return remaining
+
+    def flush(self):
+        """Write buffered results now"""
+        with self._flush_lock:
+            with self._lock:
+                results, self._results = self._results, []
+            if results:
+                self._write(results)
+
+    def _start(self):
+        with self._lock:
+            if self._threads:
+                return
+            for n in range(self.workers):
+                thread = threading.Thread(target=self._work_loop, name=f'linkedin-enrichment-{n}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+            flusher = threading.Thread(target=self._flush_loop, name='linkedin-enrichment-flusher', daemon=True)
+            flusher.start()
+            self._threads.append(flusher)
+
+    def _work_loop(self):
+        from app.services.company_enrichment import get_enrichment_service
+        while True:
+            supabase, contact = self._queue.get()
+            try:
+                self._limiter.acquire()
+                enriched = get_enrichment_service().enrich_contact_from_linkedin(
+                    linkedin_url=contact.get('linkedin'),
+                    name=contact.get('name'),
+                    email=contact.get('email')
+                )
+                update = self._changes(contact, enriched)
+                with self._lock:
+                    self.stats['enriched' if update else 'empty'] += 1
+                    if update:
+                        self._results.append({'supabase': supabase, 'contact': contact, 'update': update})
+                    full = len(self._results) >= self.flush_size
+                if full:
+                    self._flush_wakeup.set()
+            except Exception as e:
+                with self._lock:
+                    self.stats['failed'] += 1
+                logger.debug(f"LinkedIn enrichment failed for contact {contact.get('id')}: {e}")
+            finally:
+                self._queue.task_done()
+
+    @staticmethod
+    def _changes(contact: Dict[str, Any], enriched: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Fields enrichment can fill: only those the contact had no value for"""
+        if not enriched:
+            return {}
+        update = {}
+        if not contact.get('role') and enriched.get('role'):
+            update['role'] = enriched['role']
+        if not contact.get('industry') and enriched.get('industry'):
+            update['industry'] = str(enriched['industry']).strip().lower()
+        if not contact.get('company_id') and enriched.get('company'):
+            update['company'] = enriched['company']
+        return update
+
+    def _flush_loop(self):
+        while True:
+            self._flush_wakeup.wait(self.flush_seconds)
+            self._flush_wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"LinkedIn enrichment write-back failed: {e}")
+
+    def _write(self, results: List[Dict[str, Any]]):
+        """Resolve enriched companies and update the enriched fields, one request per distinct payload"""
+        from app.services.contact_service import CompanyResolver, LOOKUP_BATCH_SIZE
+
+        by_client: Dict[int, List[Dict[str, Any]]] = {}
+        for result in results:
+            by_client.setdefault(id(result['supabase']), []).append(result)
+
+        for client_results in by_client.values():
+            supabase = client_results[0]['supabase']
+            resolver = CompanyResolver(supabase)
+            companies = [(r['update']['company'], r['contact'].get('domain'), r['update'].get('industry'))
+                         for r in client_results if r['update'].get('company')]
+            try:
+                resolver.prefetch(companies)
+            except Exception as e:
+                logger.warning(f"Could not resolve {len(companies)} enriched companies: {e}")
+
+            # Only the enriched columns are sent, with an UPDATE: a contact deleted or
+            # edited since the import is not re-created or overwritten with import-time values
+            by_payload: Dict[tuple, List[str]] = {}
+            for result in client_results:
+                contact, update = result['contact'], dict(result['update'])
+                company_name = update.pop('company', None)
+                if company_name:
+                    company_id = resolver.resolve(company_name, contact.get('domain'), update.get('industry'))
+                    if company_id:
+                        update['company_id'] = company_id
+                        resolver.ensure_industry(company_id, update.get('industry'))
+                if update:
+                    by_payload.setdefault(tuple(sorted(update.items())), []).append(contact['id'])
+
+            written = 0
+            for payload, contact_ids in by_payload.items():
+                for start in range(0, len(contact_ids), LOOKUP_BATCH_SIZE):
+                    ids = contact_ids[start:start + LOOKUP_BATCH_SIZE]
+                    try:
+                        query = supabase.table('contacts').update(dict(payload))
+                        query = query.eq('id', ids[0]) if len(ids) == 1 else query.in_('id', ids)
+                        query.execute()
+                        written += len(ids)
+                    except Exception as e:
+                        logger.warning(f"LinkedIn enrichment write-back failed ({len(ids)} contacts): {e}")
+            with self._lock:
+                self.stats['written'] += written
+            if written:
+                logger.info(f"Wrote LinkedIn enrichment for {written} contacts")
+
+
+_linkedin_enrichment_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_linkedin_enrichment_queue() -> LinkedInEnrichmentQueue:
+    """Get or create the process-wide LinkedIn enrichment queue"""
+    global _linkedin_enrichment_queue
+    with _queue_lock:
+        if _linkedin_enrichment_queue is None:
+            _linkedin_enrichment_queue = LinkedInEnrichmentQueue()
+        return _linkedin_enrichment_queue
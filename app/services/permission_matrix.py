@@ -0,0 +1,168 @@
+"""Precomputed use case permission matrix for require_use_case checks"""
+import os
+import time
+import logging
+import threading
+from typing import Any, Dict, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Redis key holding the global permissions version (bumped on every grant/revoke)
+PERMISSIONS_VERSION_KEY = 'permissions:version'
+
+
+class PermissionMatrix:
+    """
+    In-memory permission matrix
+    Loads the use_cases code->id map once and one compact permission set per user
+    (global use case IDs + (use_case_id, industry_id) pairs), answering checks with
+    set lookups. Entries are dropped when the shared version counter changes.
+    """
+
+    def __init__(self, ttl: int = 300, version_check_interval: float = 5.0):
+        """
+        Initialize permission matrix
+        Args:
+            ttl: Max seconds a user's permission set is trusted (default: 5 minutes)
+            version_check_interval: Seconds between reads of the shared version counter
+        """
+        self._ttl = ttl
+        self._version_check_interval = version_check_interval
+        self._use_case_ids: Dict[str, str] = {}
+        self._users: Dict[str, Dict[str, Any]] = {}
+        self._local_version = 0
+        self._version = None
+        self._version_checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _get_redis(self):
+        try:
+            from app.integrations.redis_client import REDIS_AVAILABLE, redis_client
+            return redis_client if REDIS_AVAILABLE else None
+        except Exception:
+            return None
+
+    def _current_version(self) -> str:
+        """Get the shared permissions version (Redis counter, polled at most every version_check_interval)"""
+        now = time.time()
+        if self._version is not None and now - self._version_checked_at < self._version_check_interval:
+            return self._version
+        version = f"local:{self._local_version}"
+        redis_client = self._get_redis()
+        if redis_client:
+            try:
+                version = f"{redis_client.get(PERMISSIONS_VERSION_KEY) or 0}:{self._local_version}"
+            except Exception as e:
+                logger.warning(f"Redis read error for permissions version: {e}")
+        with self._lock:
+            if version != self._version:
+                if self._version is not None:
+                    logger.debug(f"Permissions version changed ({self._version} -> {version}), dropping cached permission sets")
+                self._users.clear()
+                self._version = version
+            self._version_checked_at = now
+        return version
+
+    def _load_use_cases(self, supabase):
+        response = supabase.table('use_cases').select('id, code').execute()
+        use_case_ids = {uc['code']: str(uc['id']) for uc in (response.data or [])}
+        with self._lock:
+            self._use_case_ids = use_case_ids
+        logger.info(f"Permission matrix: loaded {len(use_case_ids)} use cases")
+
+    def get_use_case_id(self, supabase, use_case_code: str) -> Optional[str]:
+        """
+        Resolve a use case code to its ID (loaded once, reloaded on unknown codes)
+        Returns:
+            Use case ID or None if the code does not exist
+        """
+        use_case_id = self._use_case_ids.get(use_case_code)
+        if use_case_id is None:
+            self._load_use_cases(supabase)
+            use_case_id = self._use_case_ids.get(use_case_code)
+        return use_case_id
+
+    def _get_user_permissions(self, supabase, user_id: str) -> Tuple[Set[str], Set[Tuple[str, str]]]:
+        version = self._current_version()
+        entry = self._users.get(user_id)
+        if entry and entry['version'] == version and time.time() < entry['expires_at']:
+            return entry['global'], entry['industry']
+
+        response = supabase.table('user_permissions').select('use_case_id, industry_id').eq('user_id', user_id).execute()
+        global_ids: Set[str] = set()
+        industry_pairs: Set[Tuple[str, str]] = set()
+        for perm in response.data or []:
+            if perm.get('industry_id'):
+                industry_pairs.add((str(perm['use_case_id']), str(perm['industry_id'])))
+            else:
+                global_ids.add(str(perm['use_case_id']))
+
+        with self._lock:
+            self._users[user_id] = {
+                'global': global_ids,
+                'industry': industry_pairs,
+                'version': version,
+                'expires_at': time.time() + self._ttl
+            }
+        return global_ids, industry_pairs
+
+    def check(self, supabase, user_id: str, use_case_code: str, industry_id: Optional[str] = None) -> Optional[str]:
+        """
+        Check whether a user holds a use case permission
+        Args:
+            supabase: Supabase client
+            user_id: app_users.id
+            use_case_code: Use case code (e.g. 'contact_management')
+            industry_id: Active industry ID for industry-scoped permissions
+        Returns:
+            'global' or 'industry' if granted, None if denied
+        Raises:
+            KeyError: If the use case code does not exist
+        """
+        use_case_id = self.get_use_case_id(supabase, use_case_code)
+        if use_case_id is None:
+            raise KeyError(use_case_code)
+
+        global_ids, industry_pairs = self._get_user_permissions(supabase, str(user_id))
+        if use_case_id in global_ids:
+            return 'global'
+        if industry_id and (use_case_id, str(industry_id)) in industry_pairs:
+            return 'industry'
+        return None
+
+    def bump_version(self):
+        """Invalidate all cached permission sets (this process and, via Redis, all others)"""
+        redis_client = self._get_redis()
+        if redis_client:
+            try:
+                redis_client.incr(PERMISSIONS_VERSION_KEY)
+            except Exception as e:
+                logger.warning(f"Redis error bumping permissions version: {e}")
+        with self._lock:
+            self._local_version += 1
+            self._users.clear()
+            self._version = None
+        logger.debug("Permissions version bumped")
+
+    def size(self) -> int:
+        """Get number of cached user permission sets"""
+        return len(self._users)
+
+
+# Global instance
+_permission_matrix = None
+
+def get_permission_matrix() -> PermissionMatrix:
+    """Get or create the global permission matrix instance"""
+    global _permission_matrix
+    if _permission_matrix is None:
+        _permission_matrix = PermissionMatrix(
+            ttl=int(os.getenv('PERMISSION_CACHE_TTL', 300)),
+            version_check_interval=float(os.getenv('PERMISSION_VERSION_CHECK_INTERVAL', 5))
+        )
+    return _permission_matrix
+
+
+def bump_permissions_version():
+    """Invalidate cached permissions after user_permissions changes"""
+    get_permission_matrix().bump_version()
@@ -0,0 +1,45 @@
+"""
+Base class for caches kept in a Supabase table with Redis in front
+Subclasses name their table and the migration that creates it; until that
+migration is applied the cache keeps working with Redis only.
+"""
+import logging
+
+from app.supabase_client import get_supabase_client
+
+logger = logging.getLogger(__name__)
+
+
+class TableBackedCache:
+    """Supabase client and missing-table handling shared by the two-level caches"""
+
+    TABLE = ''
+    MIGRATION = ''  # Migration that creates TABLE, named in the warning when it is missing
+
+    def __init__(self, supabase=None):
+        """
+        Args:
+            supabase: Supabase client (default: the current app's client when available)
+        """
+        self._supabase = supabase
+        self._table_available = True
+
+    def _client(self):
+        """Supabase client for the table layer (None: Redis layer only)"""
+        if not self._table_available:
+            return None
+        if self._supabase is not None:
+            return self._supabase
+        try:
+            return get_supabase_client()
+        except Exception:
+            # Outside an app context
+            return None
+
+    def _table_error(self, error: Exception):
+        message = str(error)
+        if self.TABLE in message and ('does not exist' in message or 'PGRST205' in message):
+            logger.warning(f"{self.TABLE} table missing (run migration {self.MIGRATION}), using Redis only")
+            self._table_available = False
+        else:
+            logger.warning(f"{self.TABLE} table error: {error}")
@@ -0,0 +1,161 @@
+"""
+Persistent cache of per-contact AI target analysis results
+Entries are keyed by a fingerprint of everything the analysis prompt sees about
+a contact, plus the industry, prompt version and model, so a contact is only
+sent to the LLM again when one of those changes. Results live in the
+target_analysis_cache table (migration 026) with Redis in front; contacts the
+model did not recommend are cached too, so they are not re-sent either.
+"""
+import os
+import json
+import hashlib
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from app.integrations.redis_client import get_cached_many, set_cached_many
+from app.services.table_cache import TableBackedCache
+from app.utils.timestamps import parse_timestamp
+
+logger = logging.getLogger(__name__)
+
+TARGET_ANALYSIS_CACHE_ENABLED = os.getenv('TARGET_ANALYSIS_CACHE', 'true').lower() == 'true'
+TARGET_ANALYSIS_CACHE_TTL_DAYS = int(os.getenv('TARGET_ANALYSIS_CACHE_TTL_DAYS', 30))
+# Redis copy of a table entry (capped by the entry's own expiry)
+TARGET_ANALYSIS_REDIS_TTL = int(os.getenv('TARGET_ANALYSIS_REDIS_TTL', 86400))
+
+# Fingerprints per table IN (...) lookup (64-char hex each)
+_TABLE_LOOKUP_BATCH = 50
+
+# Contact fields the analysis prompt includes (first non-empty alias wins)
+_FINGERPRINT_FIELDS = (
+    ('id', ('id', 'contact_id')),
+    ('name', ('name',)),
+    ('role', ('role',)),
+    ('company', ('company', 'company_name')),
+    ('email', ('email',)),
+    ('linkedin', ('linkedin', 'linkedin_url')),
+    ('industry', ('industry',)),
+)
+
+
+def contact_fingerprint(contact: Dict[str, Any], industry: str, prompt_version: Any, model: str) -> str:
+    """
+    Cache key of one contact's analysis
+    Args:
+        contact: Contact dict as passed to identify_targets
+        industry: Industry the contact is analyzed for
+        prompt_version: Version of the analysis prompt and parsing
+        model: Provider and model, e.g. 'gemini:gemini-1.5-flash'
+    Returns:
+        Hex SHA-256 digest
+    """
+    fields = {}
+    for field, aliases in _FINGERPRINT_FIELDS:
+        value = next((contact.get(alias) for alias in aliases if contact.get(alias)), None)
+        fields[field] = str(value).strip() if value is not None else None
+    payload = json.dumps({
+        'contact': fields,
+        'industry': str(industry or '').strip().lower(),
+        'prompt_version': prompt_version,
+        'model': model
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _redis_key(fingerprint: str) -> str:
+    return f"target_analysis:{fingerprint}"
+
+
+class TargetAnalysisCache(TableBackedCache):
+    """Two-level (Redis, then Supabase table) cache of per-contact analysis results"""
+
+    TABLE = 'target_analysis_cache'
+    MIGRATION = '026'
+
+    def get_many(self, fingerprints: Iterable[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Look up several fingerprints (one Redis MGET, then chunked table queries)
+        Returns:
+            Fingerprint -> recommendation dict (None: analyzed, not recommended) for the entries found
+        """
+        fingerprints = list(dict.fromkeys(fingerprints))
+        entries = get_cached_many(_redis_key(fingerprint) for fingerprint in fingerprints)
+        found: Dict[str, Optional[Dict[str, Any]]] = {}
+        missing = []
+        for fingerprint in fingerprints:
+            entry = entries.get(_redis_key(fingerprint))
+            if entry is not None:
+                found[fingerprint] = entry.get('recommendation')
+            else:
+                missing.append(fingerprint)
+
+        supabase = self._client()
+        if not missing or supabase is None:
+            return found
+        now = datetime.now(timezone.utc)
+        for start in range(0, len(missing), _TABLE_LOOKUP_BATCH):
+            chunk = missing[start:start + _TABLE_LOOKUP_BATCH]
+            try:
+                response = supabase.table(self.TABLE).select('fingerprint, recommendation, expires_at')\
+                    .in_('fingerprint', chunk).gt('expires_at', now.isoformat()).execute()
+            except Exception as e:
+                self._table_error(e)
+                break
+            ttl = TARGET_ANALYSIS_REDIS_TTL
+            for row in response.data or []:
+                expires_at = parse_timestamp(row.get('expires_at'))
+                ttl = min(ttl, int((expires_at - now).total_seconds()) if expires_at else 0)
+                found[row['fingerprint']] = row.get('recommendation')
+            # Copied to Redis together, so no copy outlives the earliest table expiry of the chunk
+            set_cached_many({_redis_key(row['fingerprint']): {'recommendation': row.get('recommendation')}
+                             for row in response.data or []}, max(1, ttl))
+        return found
+
+    def set_many(self, entries: Dict[str, Tuple[str, str, Optional[Dict[str, Any]]]], model: str,
+                 prompt_version: Any):
+        """
+        Store analysis results with one table upsert
+        Args:
+            entries: Fingerprint -> (contact_id, industry, recommendation dict or None)
+            model: Provider and model the fingerprints were computed with
+            prompt_version: Prompt version the fingerprints were computed with
+        """
+        if not entries:
+            return
+        now = datetime.now(timezone.utc)
+        expires_at = now + timedelta(days=TARGET_ANALYSIS_CACHE_TTL_DAYS)
+        set_cached_many({_redis_key(fingerprint): {'recommendation': recommendation}
+                         for fingerprint, (_, _, recommendation) in entries.items()},
+                        min(TARGET_ANALYSIS_CACHE_TTL_DAYS * 86400, TARGET_ANALYSIS_REDIS_TTL))
+        rows = []
+        for fingerprint, (contact_id, industry, recommendation) in entries.items():
+            rows.append({
+                'fingerprint': fingerprint,
+                'contact_id': contact_id or None,
+                'industry': industry,
+                'recommendation': recommendation,
+                'model': model,
+                'prompt_version': str(prompt_version),
+                'analyzed_at': now.isoformat(),
+                'expires_at': expires_at.isoformat()
+            })
+
+        supabase = self._client()
+        if supabase is None:
+            return
+        try:
+            supabase.table(self.TABLE).upsert(rows, on_conflict='fingerprint').execute()
+        except Exception as e:
+            self._table_error(e)
+
+
+_target_analysis_cache = None
+
+
+def get_target_analysis_cache() -> TargetAnalysisCache:
+    """Get or create the global target analysis cache"""
+    global _target_analysis_cache
+    if _target_analysis_cache is None:
+        _target_analysis_cache = TargetAnalysisCache()
+    return _target_analysis_cache
@@ -3,16 +3,107 @@ import logging
 import os
 import json
 import re
-from typing import List, Optional, Dict, Any
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Dict, Any, Tuple, TypeVar
 from openai import OpenAI
 import google.generativeai as genai
 from app.models.target_recommendation import TargetRecommendation
 from app.services.industry_context import get_industry_context
 from app.integrations.rag_client import get_rag_client
 from app.integrations.gemini_client import get_gemini_client
+from app.services.target_analysis_cache import (
+    TARGET_ANALYSIS_CACHE_ENABLED,
+    contact_fingerprint,
+    get_target_analysis_cache
+)
+from app.utils.rate_limiter import RateLimiter
 
 logger = logging.getLogger(__name__)
 
+# Bump when _build_analysis_prompt or _parse_recommendations change meaning:
+# cached per-contact analyses from older versions are then ignored
+ANALYSIS_PROMPT_VERSION = 1
+# Contacts per AI analysis call
+TARGET_ANALYSIS_BATCH_SIZE = int(os.getenv('TARGET_ANALYSIS_BATCH_SIZE', 10))
+# Batches analyzed at once by identify_targets
+TARGET_ANALYSIS_CONCURRENCY = int(os.getenv('TARGET_ANALYSIS_CONCURRENCY', 4))
+# Analysis calls per second per provider (shared by all requests in this process)
+TARGET_ANALYSIS_RATE_LIMITS = {
+    'gemini': float(os.getenv('TARGET_ANALYSIS_GEMINI_RATE', 1.0)),
+    'openai': float(os.getenv('TARGET_ANALYSIS_OPENAI_RATE', 3.0)),
+}
+# Retries of a call the provider rejected with 429, with exponential backoff
+TARGET_ANALYSIS_MAX_RETRIES = int(os.getenv('TARGET_ANALYSIS_MAX_RETRIES', 3))
+TARGET_ANALYSIS_BACKOFF_SECONDS = float(os.getenv('TARGET_ANALYSIS_BACKOFF_SECONDS', 2.0))
+
+_provider_limiters = {
+    provider: RateLimiter(rate, burst=max(1, TARGET_ANALYSIS_CONCURRENCY))
+    for provider, rate in TARGET_ANALYSIS_RATE_LIMITS.items()
+}
+
+T = TypeVar('T')
+
+
+@dataclass
+class BatchAnalysis:
+    """Outcome of analyzing one batch of contacts"""
+    recommendations: List[TargetRecommendation] = field(default_factory=list)
+    # Provider and model that answered, e.g. 'openai:gpt-4o-mini' (None: no provider answered)
+    model_id: Optional[str] = None
+    # The response was complete and every recommendation in it parsed, so contacts it
+    # leaves out were analyzed and not recommended
+    complete: bool = False
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """Whether an OpenAI/Gemini error means the request was rate limited (HTTP 429)"""
+    if getattr(error, 'status_code', None) == 429 or getattr(error, 'code', None) == 429:
+        return True
+    error_lower = str(error).lower()
+    return ('429' in error_lower or 'rate limit' in error_lower or 'rate_limit' in error_lower or
+            'resource_exhausted' in error_lower or 'resource exhausted' in error_lower or
+            'too many requests' in error_lower or 'quota exceeded' in error_lower)
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Retry-After seconds sent with a 429, if any"""
+    headers = getattr(getattr(error, 'response', None), 'headers', None)
+    try:
+        return float(headers.get('retry-after')) if headers and headers.get('retry-after') else None
+    except (TypeError, ValueError):
+        return None
+
+
+def call_with_backoff(provider: str, call: Callable[[], T]) -> T:
+    """
+    Run one AI provider call under the provider's rate limit, retrying 429s with backoff
+    Args:
+        provider: 'gemini' or 'openai'
+        call: The API call
+    Returns:
+        The call's result (other errors, and 429s after TARGET_ANALYSIS_MAX_RETRIES, are raised)
+    """
+    limiter = _provider_limiters.get(provider)
+    for attempt in range(TARGET_ANALYSIS_MAX_RETRIES + 1):
+        if limiter:
+            limiter.acquire()
+        try:
+            return call()
+        except Exception as e:
+            if not is_rate_limit_error(e) or attempt == TARGET_ANALYSIS_MAX_RETRIES:
+                raise
+            delay = _retry_after(e) or TARGET_ANALYSIS_BACKOFF_SECONDS * (2 ** attempt) * random.uniform(1.0, 1.5)
+            logger.warning(f"{provider} rate limited, retrying in {delay:.1f}s (attempt {attempt + 1}/{TARGET_ANALYSIS_MAX_RETRIES})")
+            if limiter:
+                # Every concurrent caller of this provider backs off, not just this one
+                limiter.pause(delay)
+            else:
+                time.sleep(delay)
+
 
 def repair_json(text: str) -> str:
     """
@@ -149,6 +240,16 @@ class TargetIdentificationService:
             self.gemini_client = None
             self.gemini_available = False
         
+        # Gemini model used for contact analysis. Batches run concurrently, so a working
+        # fallback model is recorded here (under the lock) instead of on the shared client
+        self._gemini_model_lock = threading.Lock()
+        self._gemini_model = self.gemini_client.model if self.gemini_available else None
+        if self.gemini_available:
+            # Ensure genai is configured (it should be, but just in case)
+            gemini_api_key = os.getenv('GEMINI_API_KEY')
+            if gemini_api_key:
+                genai.configure(api_key=gemini_api_key.strip())
+        
         # Validate at least one AI provider is available
         if not self.openai_available and not self.gemini_available:
             raise ValueError("No AI providers available. Configure OPENAI_API_KEY or GEMINI_API_KEY.")
@@ -158,7 +259,8 @@ class TargetIdentificationService:
         industry: str,
         contacts: List[Dict[str, Any]],
         limit: int = 50,
-        min_seniority: float = 0.5
+        min_seniority: float = 0.5,
+        use_cache: bool = True
     ) -> List[TargetRecommendation]:
         """
         Identify high-value targets from contacts using AI
@@ -168,6 +270,7 @@ class TargetIdentificationService:
             contacts: List of contact dictionaries from database
             limit: Maximum number of recommendations to return
             min_seniority: Minimum seniority score (0-1)
+            use_cache: Reuse cached analyses of unchanged contacts (see target_analysis_cache)
             
         Returns:
             List of TargetRecommendation objects
@@ -188,90 +291,50 @@ class TargetIdentificationService:
         # Query Gemini for customer examples
         gemini_insights = self._get_gemini_insights(industry)
         
-        # Analyze contacts in batches
-        recommendations = []
-        batch_size = 10  # Process contacts in batches to avoid token limits
+        # Contacts analyzed before with the same fields, industry, prompt and model reuse that result
+        cache = get_target_analysis_cache() if use_cache and TARGET_ANALYSIS_CACHE_ENABLED else None
+        model_id = self._analysis_model_id()
+        fingerprints = [contact_fingerprint(c, industry, ANALYSIS_PROMPT_VERSION, model_id) for c in contacts]
+        cached: Dict[str, Optional[Dict[str, Any]]] = {}
+        if cache:
+            try:
+                cached = cache.get_many(fingerprints)
+            except Exception as e:
+                logger.warning(f"Target analysis cache lookup failed: {e}")
+        pending = [c for c, fingerprint in zip(contacts, fingerprints) if fingerprint not in cached]
+        if cached:
+            logger.info(f"Reusing cached analysis for {len(contacts) - len(pending)} of {len(contacts)} contacts")
         
+        # Analyze the rest in batches, TARGET_ANALYSIS_CONCURRENCY at once
         # Process ALL contacts first, then filter and rank
         # This ensures we don't miss contacts that might rank higher after full analysis
-        for i in range(0, len(contacts), batch_size):
-            batch = contacts[i:i + batch_size]
-            
-            # Get company names from this batch for more specific RAG queries
-            company_names = [c.get('company', c.get('company_name', '')) for c in batch if c.get('company') or c.get('company_name')]
-            company_names = [name for name in company_names if name and name.strip()]  # Filter out empty names
-            
-            # Enhance RAG knowledge with company-specific queries if companies are available
-            # Create a copy to avoid mutating the original
-            batch_rag_knowledge = {
-                'case_studies': list(rag_knowledge.get('case_studies', [])),
-                'services': list(rag_knowledge.get('services', [])),
-                'insights': list(rag_knowledge.get('insights', [])),
-                'platforms': list(rag_knowledge.get('platforms', [])),
-                'company_profiles': list(rag_knowledge.get('company_profiles', [])),
-                'raw_results': rag_knowledge.get('raw_results', {})
-            }
-            if company_names and self.rag_client:
-                try:
-                    # Build company-specific collection names (e.g., "easemytrip_company_profiles")
-                    company_specific_collections = []
-                    for company_name in company_names[:3]:  # Limit to first 3 companies to avoid too many queries
-                        # Normalize company name to match collection naming: lowercase, replace spaces with nothing
-                        normalized_name = company_name.lower().replace(' ', '').replace('-', '').replace('_', '')
-                        company_collection = f"{normalized_name}_company_profiles"
-                        company_specific_collections.append(company_collection)
-                    
-                    # Query RAG with company-specific terms and company-specific collections
-                    company_query = f"{industry} {' '.join(company_names[:3])} case study solution analysis"
-                    logger.debug(f"Querying RAG for company-specific knowledge: {company_query}")
-                    logger.debug(f"Using company-specific collections: {company_specific_collections}")
-                    
-                    # Query both generic and company-specific collections
-                    all_collections = ['case_studies', 'company_profiles'] + company_specific_collections
-                    company_rag_result = self.rag_client.query(
-                        query=company_query,
-                        industry=industry,
-                        collections=all_collections,
-                        top_k=5
-                    )
-                    
-                    company_results = company_rag_result.get('results', {})
-                    
-                    # Merge results from all collections (including company-specific ones)
-                    # Company-specific collections will be in results with their collection name as key
-                    for collection_name in all_collections:
-                        if collection_name in company_results:
-                            results = company_results[collection_name]
-                            if results:
-                                # Add to company_profiles if it's a company-specific collection
-                                if collection_name.endswith('_company_profiles'):
-                                    batch_rag_knowledge['company_profiles'] = (batch_rag_knowledge.get('company_profiles', []) + results)[:10]
-                                elif collection_name == 'case_studies':
-                                    batch_rag_knowledge['case_studies'] = (batch_rag_knowledge.get('case_studies', []) + results)[:10]
-                    
-                    # Also check for results in company-specific collection keys directly
-                    for collection_name, results in company_results.items():
-                        if collection_name.endswith('_company_profiles') and results:
-                            batch_rag_knowledge['company_profiles'] = (batch_rag_knowledge.get('company_profiles', []) + results)[:10]
-                    
-                    total_company_results = sum(len(company_results.get(c, [])) for c in all_collections)
-                    logger.info(f"Enhanced RAG knowledge with {total_company_results} company-specific results from collections: {all_collections}")
-                    logger.debug(f"Company-specific results breakdown: {[(c, len(company_results.get(c, []))) for c in all_collections]}")
-                except Exception as e:
-                    logger.warning(f"Error querying company-specific RAG knowledge: {e}")
-                    import traceback
-                    logger.debug(traceback.format_exc())
-                    # Continue with base knowledge if company query fails
-            
-            batch_recommendations = self._analyze_contact_batch(
-                batch,
-                industry,
-                industry_context,
-                batch_rag_knowledge,
-                gemini_insights
-            )
-            recommendations.extend(batch_recommendations)
-            logger.debug(f"Processed batch {i//batch_size + 1}: {len(batch_recommendations)} recommendations from {len(batch)} contacts")
+        batch_size = TARGET_ANALYSIS_BATCH_SIZE  # Process contacts in batches to avoid token limits
+        batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+        
+        def analyze(batch_number: int) -> BatchAnalysis:
+            batch = batches[batch_number]
+            try:
+                result = self._analyze_batch_with_context(
+                    batch, industry, industry_context, rag_knowledge, gemini_insights
+                )
+            except Exception as e:
+                logger.error(f"Error analyzing batch {batch_number + 1}: {e}")
+                return BatchAnalysis()
+            logger.debug(f"Processed batch {batch_number + 1}: {len(result.recommendations)} recommendations from {len(batch)} contacts")
+            return result
+        
+        batch_results: List[BatchAnalysis] = []
+        if batches:
+            started = time.monotonic()
+            workers = max(1, min(TARGET_ANALYSIS_CONCURRENCY, len(batches)))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='target-analysis') as executor:
+                # map() yields in batch order, so the merged list does not depend on completion order
+                batch_results = list(executor.map(analyze, range(len(batches))))
+            logger.info(f"Analyzed {len(batches)} batches with {workers} workers in {time.monotonic() - started:.1f}s")
+        
+        recommendations = self._merge_with_cache(
+            contacts, fingerprints, cached, batches, batch_results, cache, industry
+        )
         
         logger.info(f"Total recommendations generated: {len(recommendations)} from {len(contacts)} contacts")
         
@@ -301,6 +364,174 @@ class TargetIdentificationService:
         
         return sorted_recommendations[:limit]
     
+    def _analysis_model_id(self) -> str:
+        """
+        Provider and model that analyze contacts first (part of the analysis cache key)
+        Cached results are looked up under this model; a result a fallback provider
+        produced is cached under the fallback's model instead
+        """
+        for provider in self.ai_providers:
+            if provider == 'gemini' and self.gemini_available:
+                with self._gemini_model_lock:
+                    return f"gemini:{self._gemini_model}"
+            if provider == 'openai' and self.openai_available:
+                return f"openai:{self.model}"
+        return 'none'
+    
+    def _merge_with_cache(
+        self,
+        contacts: List[Dict[str, Any]],
+        fingerprints: List[str],
+        cached: Dict[str, Optional[Dict[str, Any]]],
+        batches: List[List[Dict[str, Any]]],
+        batch_results: List[BatchAnalysis],
+        cache: Any,
+        industry: str
+    ) -> List[TargetRecommendation]:
+        """
+        Combine cached and fresh recommendations in contact order, caching the fresh ones
+        
+        Contacts a batch did not recommend are cached as not recommended only when the
+        batch's response was complete; otherwise they are analyzed again next time.
+        Fresh results are cached under the provider and model that produced them.
+        
+        Returns:
+            Recommendations ordered by the contact's position in contacts; fresh
+            recommendations that match no contact follow in batch order
+        """
+        by_contact: Dict[str, List[TargetRecommendation]] = {}
+        unmatched: List[TargetRecommendation] = []
+        # Contact ID -> (model that analyzed it, whether a missing recommendation means "not recommended")
+        analyzed: Dict[str, Tuple[str, bool]] = {}
+        for batch, result in zip(batches, batch_results):
+            if not result.recommendations and not result.complete:
+                # Failed batches are not cached: retried next time
+                continue
+            batch_ids = {str(c.get('id', c.get('contact_id', ''))) for c in batch}
+            for contact_id in batch_ids:
+                analyzed[contact_id] = (result.model_id or self._analysis_model_id(), result.complete)
+            for recommendation in result.recommendations:
+                if recommendation.contact_id in batch_ids:
+                    by_contact.setdefault(recommendation.contact_id, []).append(recommendation)
+                else:
+                    unmatched.append(recommendation)
+        
+        recommendations: List[TargetRecommendation] = []
+        to_cache: Dict[str, Dict[str, Any]] = {}  # model -> {fingerprint: entry}
+        emitted = set()
+        for contact, fingerprint in zip(contacts, fingerprints):
+            contact_id = str(contact.get('id', contact.get('contact_id', '')))
+            if fingerprint in cached:
+                data = cached[fingerprint]
+                if data and fingerprint not in emitted:
+                    try:
+                        recommendations.append(TargetRecommendation(**{**data, 'contact_id': contact_id}))
+                    except Exception as e:
+                        logger.debug(f"Ignoring unreadable cached analysis for contact {contact_id}: {e}")
+                emitted.add(fingerprint)
+            elif contact_id in analyzed and fingerprint not in emitted:
+                fresh = by_contact.get(contact_id, [])
+                recommendations.extend(fresh)
+                emitted.add(fingerprint)
+                model_id, complete = analyzed[contact_id]
+                if fresh or complete:
+                    answered_fingerprint = contact_fingerprint(contact, industry, ANALYSIS_PROMPT_VERSION, model_id)
+                    to_cache.setdefault(model_id, {})[answered_fingerprint] = (
+                        contact_id, industry, fresh[0].to_dict() if fresh else None
+                    )
+        recommendations.extend(unmatched)
+        
+        if cache:
+            for model_id, entries in to_cache.items():
+                try:
+                    cache.set_many(entries, model_id, ANALYSIS_PROMPT_VERSION)
+                except Exception as e:
+                    logger.warning(f"Target analysis cache write failed: {e}")
+        return recommendations
+    
+    def _analyze_batch_with_context(
+        self,
+        batch: List[Dict[str, Any]],
+        industry: str,
+        industry_context: Any,
+        rag_knowledge: Dict[str, Any],
+        gemini_insights: Dict[str, Any]
+    ) -> BatchAnalysis:
+        """Add company-specific RAG knowledge for one batch, then analyze it"""
+        # Get company names from this batch for more specific RAG queries
+        company_names = [c.get('company', c.get('company_name', '')) for c in batch if c.get('company') or c.get('company_name')]
+        company_names = [name for name in company_names if name and name.strip()]  # Filter out empty names
+        
+        # Enhance RAG knowledge with company-specific queries if companies are available
+        # Create a copy to avoid mutating the original
+        batch_rag_knowledge = {
+            'case_studies': list(rag_knowledge.get('case_studies', [])),
+            'services': list(rag_knowledge.get('services', [])),
+            'insights': list(rag_knowledge.get('insights', [])),
+            'platforms': list(rag_knowledge.get('platforms', [])),
+            'company_profiles': list(rag_knowledge.get('company_profiles', [])),
+            'raw_results': rag_knowledge.get('raw_results', {})
+        }
+        if company_names and self.rag_client:
+            try:
+                # Build company-specific collection names (e.g., "easemytrip_company_profiles")
+                company_specific_collections = []
+                for company_name in company_names[:3]:  # Limit to first 3 companies to avoid too many queries
+                    # Normalize company name to match collection naming: lowercase, replace spaces with nothing
+                    normalized_name = company_name.lower().replace(' ', '').replace('-', '').replace('_', '')
+                    company_collection = f"{normalized_name}_company_profiles"
+                    company_specific_collections.append(company_collection)
+                
+                # Query RAG with company-specific terms and company-specific collections
+                company_query = f"{industry} {' '.join(company_names[:3])} case study solution analysis"
+                logger.debug(f"Querying RAG for company-specific knowledge: {company_query}")
+                logger.debug(f"Using company-specific collections: {company_specific_collections}")
+                
+                # Query both generic and company-specific collections
+                all_collections = ['case_studies', 'company_profiles'] + company_specific_collections
+                company_rag_result = self.rag_client.query(
+                    query=company_query,
+                    industry=industry,
+                    collections=all_collections,
+                    top_k=5
+                )
+                
+                company_results = company_rag_result.get('results', {})
+                
+                # Merge results from all collections (including company-specific ones)
+                # Company-specific collections will be in results with their collection name as key
+                for collection_name in all_collections:
+                    if collection_name in company_results:
+                        results = company_results[collection_name]
+                        if results:
+                            # Add to company_profiles if it's a company-specific collection
+                            if collection_name.endswith('_company_profiles'):
+                                batch_rag_knowledge['company_profiles'] = (batch_rag_knowledge.get('company_profiles', []) + results)[:10]
+                            elif collection_name == 'case_studies':
+                                batch_rag_knowledge['case_studies'] = (batch_rag_knowledge.get('case_studies', []) + results)[:10]
+                
+                # Also check for results in company-specific collection keys directly
+                for collection_name, results in company_results.items():
+                    if collection_name.endswith('_company_profiles') and results:
+                        batch_rag_knowledge['company_profiles'] = (batch_rag_knowledge.get('company_profiles', []) + results)[:10]
+                
+                total_company_results = sum(len(company_results.get(c, [])) for c in all_collections)
+                logger.info(f"Enhanced RAG knowledge with {total_company_results} company-specific results from collections: {all_collections}")
+                logger.debug(f"Company-specific results breakdown: {[(c, len(company_results.get(c, []))) for c in all_collections]}")
+            except Exception as e:
+                logger.warning(f"Error querying company-specific RAG knowledge: {e}")
+                import traceback
+                logger.debug(traceback.format_exc())
+                # Continue with base knowledge if company query fails
+        
+        return self._analyze_contact_batch(
+            batch,
+            industry,
+            industry_context,
+            batch_rag_knowledge,
+            gemini_insights
+        )
+    
     def _get_rag_knowledge(self, industry: str) -> Dict[str, Any]:
         """Get RAG knowledge for industry - enhanced with multiple collections"""
         if not self.rag_client:
@@ -399,7 +630,7 @@ class TargetIdentificationService:
         industry_context: Any,
         rag_knowledge: Dict[str, Any],
         gemini_insights: Dict[str, Any]
-    ) -> List[TargetRecommendation]:
+    ) -> BatchAnalysis:
         """Analyze a batch of contacts using configured AI provider priority"""
         # Build prompt with all context
         prompt = self._build_analysis_prompt(
@@ -433,7 +664,7 @@ class TargetIdentificationService:
             elif provider == 'openai' and self.openai_available:
                 try:
                     logger.info("Using OpenAI for contact analysis")
-                    response = self.openai_client.chat.completions.create(
+                    response = call_with_backoff('openai', lambda: self.openai_client.chat.completions.create(
                         model=self.model,
                         messages=[
                             {
@@ -448,12 +679,18 @@ class TargetIdentificationService:
                         temperature=0.3,
                         max_tokens=4000,
                         response_format={"type": "json_object"}
-                    )
+                    ))
                     
                     result_text = response.choices[0].message.content.strip()
                     analysis = json.loads(result_text)
                     
-                    return self._parse_recommendations(analysis, industry, rag_knowledge, contacts_map)
+                    recommendations = self._parse_recommendations(analysis, industry, rag_knowledge, contacts_map)
+                    return BatchAnalysis(
+                        recommendations=recommendations,
+                        model_id=f"openai:{self.model}",
+                        complete=(response.choices[0].finish_reason != 'length' and
+                                  self._parsed_all(analysis, recommendations))
+                    )
                     
                 except Exception as e:
                     error_msg = str(e).lower()
@@ -462,7 +699,13 @@ class TargetIdentificationService:
         
         # If all providers failed
         logger.error("All AI providers failed. Cannot analyze contacts.")
-        return []
+        return BatchAnalysis()
+    
+    @staticmethod
+    def _parsed_all(analysis: Dict[str, Any], recommendations: List[TargetRecommendation]) -> bool:
+        """Whether every recommendation in a parsed response became a TargetRecommendation"""
+        raw = analysis.get('recommendations') if isinstance(analysis, dict) else None
+        return isinstance(raw, list) and len(recommendations) == len(raw)
     
     def _parse_recommendations(
         self,
@@ -591,7 +834,7 @@ class TargetIdentificationService:
         rag_knowledge: Dict[str, Any],
         gemini_insights: Dict[str, Any],
         contacts_map: Optional[Dict[str, Dict[str, Any]]] = None
-    ) -> List[TargetRecommendation]:
+    ) -> BatchAnalysis:
         """Analyze a batch of contacts using Gemini"""
         if not contacts_map:
             contacts_map = {str(c.get('id', c.get('contact_id', ''))): c for c in contacts if c.get('id') or c.get('contact_id')}
@@ -645,30 +888,28 @@ Return your response as a valid JSON object with a 'recommendations' array. Each
             result_text = None
             # Get fallback models - use common fallbacks
             fallback_models = ['gemini-pro', 'gemini-1.5-pro-latest', 'gemini-2.0-flash-exp']
-            models_to_try = [self.gemini_client.model] + [m for m in fallback_models if m != self.gemini_client.model]
-            
-            # Ensure genai is configured (it should be, but just in case)
-            gemini_api_key = os.getenv('GEMINI_API_KEY')
-            if gemini_api_key:
-                genai.configure(api_key=gemini_api_key)
+            with self._gemini_model_lock:
+                current_model = self._gemini_model
+            models_to_try = [current_model] + [m for m in fallback_models if m != current_model]
             
             for model_name in models_to_try:
                 try:
                     # Create a new model instance for this attempt
                     model = genai.GenerativeModel(model_name)
-                    response = model.generate_content(
+                    response = call_with_backoff('gemini', lambda: model.generate_content(
                         full_prompt,
                         generation_config={
                             'temperature': 0.3,
                             'max_output_tokens': 8000,  # Increased for larger responses
                         }
-                    )
+                    ))
                     result_text = response.text.strip()
-                    if model_name != self.gemini_client.model:
-                        logger.warning(f"Original model {self.gemini_client.model} failed, successfully used {model_name} instead")
-                        # Update the client to use the working model
-                        self.gemini_client.client = model
-                        self.gemini_client.model = model_name
+                    if model_name != current_model:
+                        logger.warning(f"Original model {current_model} failed, successfully used {model_name} instead")
+                        # Later batches start with the working model (unless another batch already switched)
+                        with self._gemini_model_lock:
+                            if self._gemini_model == current_model:
+                                self._gemini_model = model_name
                     break
                 except Exception as model_error:
                     error_str = str(model_error)
@@ -685,6 +926,8 @@ Return your response as a valid JSON object with a 'recommendations' array. Each
             if not response or not result_text:
                 raise ValueError("Failed to generate content with any available model")
             
+            # Repaired or partial JSON may have lost recommendations
+            complete = self._gemini_finished(response)
             # Try to extract and repair JSON from response
             try:
                 # First, try to extract JSON
@@ -704,6 +947,7 @@ Return your response as a valid JSON object with a 'recommendations' array. Each
                     # If parsing fails, try to repair the JSON
                     logger.warning("JSON parsing failed, attempting to repair...")
                     repaired_json = repair_json(result_text)
+                    complete = False
                     try:
                         analysis = json.loads(repaired_json)
                         logger.info("Successfully repaired JSON")
@@ -736,11 +980,16 @@ Return your response as a valid JSON object with a 'recommendations' array. Each
                 raise
             
             logger.info("Successfully used Gemini fallback for contact analysis")
-            return self._parse_recommendations(analysis, industry, rag_knowledge, contacts_map)
+            recommendations = self._parse_recommendations(analysis, industry, rag_knowledge, contacts_map)
+            return BatchAnalysis(
+                recommendations=recommendations,
+                model_id=f"gemini:{model_name}",
+                complete=complete and self._parsed_all(analysis, recommendations)
+            )
             
         except json.JSONDecodeError as e:
             logger.error(f"Failed to parse Gemini JSON response: {e}. Response: {result_text[:500]}")
-            return []
+            return BatchAnalysis()
         except Exception as e:
             error_str = str(e)
             # Check for API key invalid errors
@@ -754,12 +1003,25 @@ Return your response as a valid JSON object with a 'recommendations' array. Each
                 logger.error("=" * 60)
                 # Don't return empty list - let the caller handle fallback
                 raise
+            elif is_rate_limit_error(e):
+                # Still rate limited after backoff: let the caller fall back to the next provider
+                logger.warning(f"Gemini rate limited after retries: {e}")
+                raise
             else:
                 logger.error(f"Error analyzing contact batch with Gemini: {e}")
                 import traceback
                 logger.error(traceback.format_exc())
                 # For other errors, return empty list to allow fallback
-                return []
+                return BatchAnalysis()
+    
+    @staticmethod
+    def _gemini_finished(response: Any) -> bool:
+        """Whether Gemini ended its response normally (not cut off at max_output_tokens)"""
+        try:
+            finish_reason = response.candidates[0].finish_reason
+        except (AttributeError, IndexError, TypeError):
+            return True
+        return getattr(finish_reason, 'name', str(finish_reason)) != 'MAX_TOKENS'
     
     def _build_analysis_prompt(
         self,
@@ -0,0 +1,52 @@
+"""Thread-safe token bucket rate limiter for calls to external APIs"""
+import time
+import threading
+from typing import Optional
+
+
+class RateLimiter:
+    """Allows `rate` calls per second on average, with bursts of up to `burst` calls"""
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        """
+        Args:
+            rate: Calls per second (<= 0 disables limiting)
+            burst: Calls allowed at once after a quiet period (default: max(1, rate))
+        """
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1, int(rate))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for a call slot
+        Args:
+            timeout: Maximum seconds to wait (None = wait as long as needed)
+        Returns:
+            True if a slot was taken, False on timeout
+        """
+        if self.rate <= 0:
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if now >= self._paused_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = max(self._paused_until - now, (1 - self._tokens) / self.rate)
+            if deadline is not None:
+                if time.monotonic() + wait > deadline:
+                    return False
+            time.sleep(wait)
+
+    def pause(self, seconds: float):
+        """Hold every caller for `seconds` (e.g. after the provider answered 429)"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
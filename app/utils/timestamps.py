@@ -0,0 +1,19 @@
+"""Parsing of Postgres/ISO timestamps as returned by Supabase"""
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+
+def parse_timestamp(value: Any, default: Optional[datetime] = None) -> Optional[datetime]:
+    """
+    Parse a Postgres/ISO timestamp into an aware datetime (naive values are UTC)
+    Args:
+        value: Timestamp string (a trailing 'Z' is accepted)
+        default: Returned for missing or invalid values
+    """
+    if not value:
+        return default
+    try:
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return default
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
@@ -0,0 +1,165 @@
+"""
+Cache Codec Benchmark
+Compares today's plain-JSON contacts cache against the binary cache codecs
+(msgpack/orjson + zstd/lz4/zlib) and the chunked list layout used by
+list_contacts: encoded size, encode time, full decode time, and the decode
+time for reading a single 50-row page.
+
+Usage:
+    python scripts/benchmark_cache_codecs.py [options]
+
+Options:
+    --contacts: Number of synthetic contacts (default: 50000)
+    --page-size: Rows per page read (default: 50)
+    --chunk-size: Items per cache chunk (default: CACHE_CHUNK_SIZE or 500)
+    --repeat: Timing repetitions, best run is reported (default: 5)
+    --redis: Also store each payload in Redis and report MEMORY USAGE
+"""
+
+import sys
+import os
+import json
+import time
+import random
+import argparse
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.integrations.cache_codec import CacheCodec, SERIALIZERS, COMPRESSORS
+
+
+def make_contacts(count: int) -> list:
+    """Build synthetic contacts shaped like list_contacts cache entries"""
+    random.seed(42)
+    industries = ['FMCG', 'Banking', 'Retail', 'Pharma', 'Telecom', 'Automotive', 'IT Services']
+    roles = ['CEO', 'CMO', 'Head of Marketing', 'VP Sales', 'Brand Manager', 'CTO']
+    contacts = []
+    for i in range(count):
+        industry = random.choice(industries)
+        company = f"Company {random.randint(1, count // 20 or 1)}"
+        contacts.append({
+            'id': f"{i:08d}-0000-4000-8000-{random.getrandbits(48):012x}",
+            'name': f"Contact {i}",
+            'email': f"contact{i}@company{i % 997}.com",
+            'phone': f"+9198{random.randint(10000000, 99999999)}",
+            'role': random.choice(roles),
+            'company': company,
+            'company_id': f"{i % 2000:08d}-0000-4000-8000-000000000000",
+            'company_name': company,
+            'company_industry': industry,
+            'industry': industry,
+            'lead_source': random.choice(['Sheet1', 'Events', 'LinkedIn', 'Referral']),
+            'linkedin': f"https://linkedin.com/in/contact-{i}" if i % 3 else None,
+            'city': random.choice(['Mumbai', 'Delhi', 'Bengaluru', 'Pune']),
+            'created_at': f"2025-{(i % 12) + 1:02d}-{(i % 28) + 1:02d}T10:00:00+00:00",
+            'updated_at': f"2025-{(i % 12) + 1:02d}-{(i % 28) + 1:02d}T10:00:00+00:00",
+        })
+    return contacts
+
+
+def best_of(repeat: int, fn) -> float:
+    """Return the fastest of `repeat` runs in milliseconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def get_redis():
+    """Connect to Redis using the app's environment variables"""
+    import redis
+    from dotenv import load_dotenv
+    basedir = Path(__file__).parent.parent
+    load_dotenv(basedir / '.env')
+    load_dotenv(basedir / '.env.local', override=True)
+    config = {
+        'host': os.getenv('REDIS_HOST', '127.0.0.1'),
+        'port': int(os.getenv('REDIS_PORT', 6379)),
+        'db': int(os.getenv('REDIS_DB', 0)),
+    }
+    if os.getenv('REDIS_PASSWORD', '').strip():
+        config['password'] = os.getenv('REDIS_PASSWORD').strip()
+    client = redis.Redis(**config)
+    client.ping()
+    return client
+
+
+def redis_memory(client, key: str, values: list) -> int:
+    """Store values under key (chunked when more than one) and return total MEMORY USAGE"""
+    total = 0
+    for i, value in enumerate(values):
+        chunk_key = f"{key}:{i}"
+        client.set(chunk_key, value, ex=60)
+        total += client.memory_usage(chunk_key, samples=0) or 0
+        client.delete(chunk_key)
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark cache codecs for the contacts cache')
+    parser.add_argument('--contacts', type=int, default=50000, help='Number of synthetic contacts')
+    parser.add_argument('--page-size', type=int, default=50, help='Rows per page read')
+    parser.add_argument('--chunk-size', type=int, default=int(os.getenv('CACHE_CHUNK_SIZE', 500)), help='Items per cache chunk')
+    parser.add_argument('--repeat', type=int, default=5, help='Timing repetitions (best run reported)')
+    parser.add_argument('--redis', action='store_true', help='Measure Redis MEMORY USAGE')
+    args = parser.parse_args()
+
+    contacts = make_contacts(args.contacts)
+    redis_client = get_redis() if args.redis else None
+    chunk_size = args.chunk_size
+
+    print(f"Contacts: {args.contacts}, page size: {args.page_size}, chunk size: {chunk_size}")
+    print(f"Available serializers: {', '.join(n for n, _, _ in SERIALIZERS.values())}")
+    print(f"Available compressors: {', '.join(n for n, _, _ in COMPRESSORS.values())}\n")
+
+    header = f"{'layout':<26}{'size KB':>10}{'encode ms':>11}{'full decode ms':>16}{'page decode ms':>16}"
+    if redis_client:
+        header += f"{'redis KB':>10}"
+    print(header)
+    print('-' * len(header))
+
+    # Baseline: today's json.dumps of the whole list, json.loads on every page request
+    blob = json.dumps(contacts)
+    encode_ms = best_of(args.repeat, lambda: json.dumps(contacts))
+    decode_ms = best_of(args.repeat, lambda: json.loads(blob))
+    row = f"{'json (current)':<26}{len(blob) / 1024:>10.0f}{encode_ms:>11.1f}{decode_ms:>16.1f}{decode_ms:>16.1f}"
+    if redis_client:
+        row += f"{redis_memory(redis_client, 'bench:json', [blob]) / 1024:>10.0f}"
+    print(row)
+
+    chunks = [contacts[i:i + chunk_size] for i in range(0, len(contacts), chunk_size)]
+    for serializer, _, _ in SERIALIZERS.values():
+        for compressor, _, _ in COMPRESSORS.values():
+            codec = CacheCodec(serializer, compressor)
+
+            # Single blob
+            encoded = codec.encode(contacts)
+            encode_ms = best_of(args.repeat, lambda: codec.encode(contacts))
+            decode_ms = best_of(args.repeat, lambda: codec.decode(encoded))
+            row = f"{codec.name:<26}{len(encoded) / 1024:>10.0f}{encode_ms:>11.1f}{decode_ms:>16.1f}{decode_ms:>16.1f}"
+            if redis_client:
+                row += f"{redis_memory(redis_client, 'bench:blob', [encoded]) / 1024:>10.0f}"
+            print(row)
+
+            # Chunked: a page read decodes only the chunk(s) covering the page
+            encoded_chunks = [codec.encode(chunk) for chunk in chunks]
+            encode_ms = best_of(args.repeat, lambda: [codec.encode(chunk) for chunk in chunks])
+            full_ms = best_of(args.repeat, lambda: [codec.decode(chunk) for chunk in encoded_chunks])
+            pages_per_chunk = max(chunk_size // args.page_size, 1)
+            page_ms = best_of(args.repeat, lambda: codec.decode(encoded_chunks[0])[:args.page_size])
+            size_kb = sum(len(chunk) for chunk in encoded_chunks) / 1024
+            row = f"{codec.name + ' chunked':<26}{size_kb:>10.0f}{encode_ms:>11.1f}{full_ms:>16.1f}{page_ms:>16.2f}"
+            if redis_client:
+                row += f"{redis_memory(redis_client, 'bench:chunk', encoded_chunks) / 1024:>10.0f}"
+            print(row)
+
+    print(f"\nPage decode = work per GET /api/contacts page without search "
+          f"(chunked reads decode 1 chunk of {chunk_size}, ~{pages_per_chunk} pages).")
+
+
+if __name__ == '__main__':
+    main()
@@ -11,6 +11,17 @@ dot_env_local_path = os.path.join(basedir, '.env.local')
 load_dotenv(dot_env_path)
 load_dotenv(dot_env_local_path, override=True)
 
+def invalidate_permissions_cache():
+    """Bump the app's shared permissions version so running servers reload permission sets"""
+    try:
+        if basedir not in sys.path:
+            sys.path.insert(0, basedir)
+        from app.services.permission_matrix import bump_permissions_version
+        bump_permissions_version()
+        print("Permissions cache invalidated")
+    except Exception as e:
+        print(f"WARNING: Could not invalidate permissions cache ({e}). Changes apply once PERMISSION_CACHE_TTL expires.")
+
 def manage_permissions(email: str, action: str = 'grant', use_case_codes: list = None):
     """
     Grant or revoke use case permissions for a user
@@ -194,6 +205,9 @@ def manage_permissions(email: str, action: str = 'grant', use_case_codes: list =
                         print(f"  [X] {use_case_code}: Failed to grant - {e}")
                         failed_list.append(use_case_code)
         
+        if success_list:
+            invalidate_permissions_cache()
+        
         # Print summary
         action_past = {'grant': 'Granted', 'revoke': 'Revoked', 'toggle': 'Toggled'}.get(action, 'Processed')
         print(f"\nSUMMARY:")
@@ -23,7 +23,8 @@ load_dotenv(basedir / '.env')
 load_dotenv(basedir / '.env.local', override=True)
 
 from app.supabase_client import init_supabase
-from app.services.contact_service import upsert_contacts, normalize_email, normalize_phone
+from app.services.contact_service import upsert_contacts, normalize_email, normalize_phone, CompanyResolver
+from app.services.linkedin_enrichment import get_linkedin_enrichment_queue
 
 # Setup logging
 logging.basicConfig(
@@ -399,6 +400,9 @@ Industry (one word, lowercase):"""
             logger.error("Failed to initialize Supabase client")
             return False
         
+        # Companies are resolved once for the whole import
+        company_resolver = CompanyResolver(supabase)
+        
         # Process in batches
         for i in range(0, len(unique_contacts), self.batch_size):
             batch = unique_contacts[i:i + self.batch_size]
@@ -408,13 +412,19 @@ Industry (one word, lowercase):"""
             logger.info(f"Importing batch {batch_num}/{total_batches}: {len(batch)} contacts")
             
             try:
-                result = upsert_contacts(supabase, batch, {'updateExisting': False})
+                result = upsert_contacts(supabase, batch, {'updateExisting': False, 'company_resolver': company_resolver})
                 self.stats['imported'] += result.get('imported', 0)
                 self.stats['errors'] += len(result.get('errors', []))
             except Exception as e:
                 logger.error(f"Batch {batch_num} error: {e}")
                 self.stats['errors'] += len(batch)
         
+        # Deferred LinkedIn enrichment runs on background threads: finish it before exiting
+        enrichment_queue = get_linkedin_enrichment_queue()
+        if enrichment_queue.stats['queued']:
+            logger.info(f"Waiting for LinkedIn enrichment of {enrichment_queue.stats['queued']} contacts...")
+            enrichment_queue.wait()
+        
         # Print summary
         logger.info(f"\n{'='*70}")
         logger.info(f"IMPORT SUMMARY")
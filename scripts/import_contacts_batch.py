@@ -33,12 +33,14 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from app.supabase_client import get_supabase_client
 from app.services.contact_service import (
+    CompanyResolver,
     upsert_contacts,
     find_duplicates,
     resolve_best_domain,
     normalize_email,
     normalize_phone
 )
+from app.services.linkedin_enrichment import get_linkedin_enrichment_queue
 from flask import Flask
 
 # Setup logging
@@ -94,6 +96,10 @@ class BatchContactImporter:
         self.stats_lock = threading.Lock()
         self.errors: List[Dict[str, Any]] = []
         self.errors_lock = threading.Lock()
+        
+        # Company resolution shared by all batches/threads (memoized per import)
+        self.company_resolver: Optional[CompanyResolver] = None
+        self.company_resolver_lock = threading.Lock()
     
     def load_excel_file(self) -> List[Dict[str, Any]]:
         """Load and parse Excel file"""
@@ -233,7 +239,13 @@ class BatchContactImporter:
                     }
                 
                 # Import batch
-                result = upsert_contacts(supabase, rows_to_import, {'updateExisting': self.update_existing})
+                with self.company_resolver_lock:
+                    if self.company_resolver is None:
+                        self.company_resolver = CompanyResolver(supabase)
+                result = upsert_contacts(supabase, rows_to_import, {
+                    'updateExisting': self.update_existing,
+                    'company_resolver': self.company_resolver
+                })
                 
                 imported = result.get('imported', 0)
                 errors = result.get('errors', [])
@@ -318,6 +330,12 @@ class BatchContactImporter:
                     except Exception as e:
                         logger.error(f"Batch {batch_num} exception: {e}", exc_info=True)
             
+            # Deferred LinkedIn enrichment runs on background threads: finish it before exiting
+            enrichment_queue = get_linkedin_enrichment_queue()
+            if enrichment_queue.stats['queued']:
+                logger.info(f"Waiting for LinkedIn enrichment of {enrichment_queue.stats['queued']} contacts...")
+                enrichment_queue.wait()
+            
             self.stats['end_time'] = datetime.now()
             duration = (self.stats['end_time'] - self.stats['start_time']).total_seconds()
             
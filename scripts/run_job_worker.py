@@ -0,0 +1,62 @@
+"""
+Background Job Worker
+Runs queued background jobs (contact imports, ...) outside the web process.
+Jobs are claimed from the Redis queue (app/jobs/queue.py); set
+JOB_EMBEDDED_WORKERS=0 on the web processes when running dedicated workers.
+On SIGTERM the worker stops its jobs, then keeps writing pending LinkedIn
+enrichment until WORKER_STOP_GRACE_SECONDS have passed (keep it below the
+container's stop_grace_period); what is left goes back on the job queue.
+
+Usage:
+    python scripts/run_job_worker.py [options]
+
+Options:
+    --concurrency: Jobs run at the same time (default: JOB_WORKER_CONCURRENCY or 2)
+    --name: Worker name used in logs and leases (default: host:pid)
+"""
+
+import os
+import sys
+import argparse
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Never start the embedded workers in this process
+os.environ['JOB_EMBEDDED_WORKERS'] = '0'
+
+from app import create_app
+from app.jobs.queue import JobWorker, JOB_WORKER_CONCURRENCY, is_durable
+
+# Shutdown budget, within docker-compose's stop_grace_period (60s)
+WORKER_STOP_GRACE_SECONDS = float(os.getenv('WORKER_STOP_GRACE_SECONDS', 50))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run background job workers')
+    parser.add_argument('--concurrency', type=int, default=JOB_WORKER_CONCURRENCY,
+                        help='Jobs run at the same time')
+    parser.add_argument('--name', default=None, help='Worker name')
+    args = parser.parse_args()
+    
+    app = create_app()
+    if not is_durable():
+        print("❌ Redis job queue unavailable (check REDIS_HOST and JOB_QUEUE_BACKEND)")
+        sys.exit(1)
+    
+    print(f"🚀 Job worker starting ({args.concurrency} concurrent jobs)")
+    worker = JobWorker(app, concurrency=args.concurrency, name=args.name)
+    # Half the budget for running jobs to stop, half for the enrichment they queued
+    worker.run_forever(stop_timeout=WORKER_STOP_GRACE_SECONDS / 2)
+    
+    from app.jobs.linkedin_enrichment_job import drain_linkedin_enrichment
+    with app.app_context():
+        handed_off = drain_linkedin_enrichment(WORKER_STOP_GRACE_SECONDS / 2)
+    if handed_off:
+        print(f"⏸️  {handed_off} contacts left for LinkedIn enrichment by another worker")
+    print("✅ Job worker stopped")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,5 @@
+"""Shared pytest setup: make the app package importable from the repository root"""
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -0,0 +1,77 @@
+"""Tests for OrderedBatchExecutor (app/jobs/batch_executor.py)"""
+import threading
+import time
+
+from app.jobs.batch_executor import OrderedBatchExecutor
+
+
+def run_all(executor, batches):
+    outcomes = []
+    for tag, batch in batches:
+        outcomes.extend(executor.submit(tag, batch))
+    outcomes.extend(executor.finish())
+    executor.close()
+    return outcomes
+
+
+def test_outcomes_come_back_in_submission_order():
+    # Earlier batches take longer, so they finish last
+    def slow_first(n):
+        time.sleep(0.02 * (5 - n))
+        return n * 10
+
+    outcomes = run_all(OrderedBatchExecutor(slow_first, max_in_flight=4), [(n, n) for n in range(5)])
+    assert outcomes == [(n, n * 10, None) for n in range(5)]
+
+
+def test_failed_batch_is_reported_in_place_and_later_batches_still_run():
+    def fn(n):
+        if n == 2:
+            raise RuntimeError('batch 2 failed')
+        return n
+
+    outcomes = run_all(OrderedBatchExecutor(fn, max_in_flight=3), [(f"b{n}", n) for n in range(5)])
+    assert [tag for tag, _, _ in outcomes] == ['b0', 'b1', 'b2', 'b3', 'b4']
+    assert [result for _, result, _ in outcomes] == [0, 1, None, 3, 4]
+    errors = [error for _, _, error in outcomes]
+    assert isinstance(errors[2], RuntimeError) and str(errors[2]) == 'batch 2 failed'
+    assert errors[:2] == [None, None] and errors[3:] == [None, None]
+
+
+def test_in_flight_batches_are_bounded():
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def fn(n):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.01)
+        with lock:
+            running -= 1
+        return n
+
+    outcomes = run_all(OrderedBatchExecutor(fn, max_in_flight=2), [(n, n) for n in range(8)])
+    assert [result for _, result, _ in outcomes] == list(range(8))
+    assert peak <= 2
+
+
+def test_submit_waits_for_the_oldest_batch_when_full():
+    release = threading.Event()
+
+    def fn(n):
+        if n == 0:
+            release.wait(1)
+        return n
+
+    executor = OrderedBatchExecutor(fn, max_in_flight=1)
+    assert executor.submit('first', 0) == []
+    threading.Timer(0.05, release.set).start()
+    # Blocks until 'first' is done, then hands its outcome back
+    outcomes = executor.submit('second', 1)
+    assert outcomes[0] == ('first', 0, None)
+    outcomes.extend(executor.finish())
+    executor.close()
+    assert [tag for tag, _, _ in outcomes] == ['first', 'second']
@@ -0,0 +1,108 @@
+"""Tests for the contacts cache delta merge and sync state (app/services/contact_cache_sync.py)"""
+from app.services.contact_cache_sync import merge_contact_changes, new_sync_state
+
+
+def row_to_dict(row):
+    return {'id': row['id'], 'name': row.get('name'), 'industry': row.get('industry'),
+            'created_at': row.get('created_at')}
+
+
+def contact(contact_id, created_at, name=None, industry='retail'):
+    return {'id': contact_id, 'name': name or contact_id, 'industry': industry, 'created_at': created_at}
+
+
+CACHED = [
+    contact('c3', '2026-01-03T00:00:00+00:00'),
+    contact('c2', '2026-01-02T00:00:00+00:00'),
+    contact('c1', '2026-01-01T00:00:00+00:00'),
+]
+
+
+def ids(contacts):
+    return [c['id'] for c in contacts]
+
+
+def test_merge_updates_in_place_without_touching_the_input():
+    changed = [dict(contact('c2', '2026-01-02T00:00:00+00:00', name='Renamed'))]
+    merged = merge_contact_changes(CACHED, changed, [], None, None, row_to_dict)
+    assert ids(merged) == ['c3', 'c2', 'c1']
+    assert merged[1]['name'] == 'Renamed'
+    assert CACHED[1]['name'] == 'c2'
+
+
+def test_merge_inserts_new_rows_in_created_at_order():
+    changed = [contact('c4', '2026-01-04T00:00:00Z'), contact('c0', '2025-12-31T00:00:00+00:00')]
+    merged = merge_contact_changes(CACHED, changed, [], None, None, row_to_dict)
+    assert ids(merged) == ['c4', 'c3', 'c2', 'c1', 'c0']
+
+
+def test_merge_resorts_when_created_at_changes():
+    changed = [contact('c1', '2026-01-05T00:00:00+00:00')]
+    merged = merge_contact_changes(CACHED, changed, [], None, None, row_to_dict)
+    assert ids(merged) == ['c1', 'c3', 'c2']
+
+
+def test_merge_drops_tombstoned_contacts():
+    merged = merge_contact_changes(CACHED, [], ['c2', 'unknown'], None, None, row_to_dict)
+    assert ids(merged) == ['c3', 'c1']
+
+
+def test_changed_row_wins_over_an_older_tombstone():
+    # Deleted and re-created with the same ID within one delta window
+    changed = [contact('c2', '2026-01-02T00:00:00+00:00', name='Back')]
+    merged = merge_contact_changes(CACHED, changed, ['c2'], None, None, row_to_dict)
+    assert ids(merged) == ['c3', 'c2', 'c1']
+    assert merged[1]['name'] == 'Back'
+
+
+def test_merge_removes_rows_that_moved_out_of_the_filter():
+    changed = [
+        contact('c3', '2026-01-03T00:00:00+00:00', industry='Banking'),
+        contact('c5', '2026-01-06T00:00:00+00:00', industry='banking'),
+    ]
+    merged = merge_contact_changes(CACHED, changed, [], None, 'Retail', row_to_dict)
+    assert ids(merged) == ['c2', 'c1']
+
+
+def test_merge_applies_the_company_filter():
+    cached = [dict(c, company_id='co1') for c in CACHED]
+    changed = [dict(contact('c2', '2026-01-02T00:00:00+00:00'), company_id='co2'),
+               dict(contact('c6', '2026-01-07T00:00:00+00:00'), company_id='co1')]
+    merged = merge_contact_changes(cached, changed, [], 'co1', None, row_to_dict)
+    assert ids(merged) == ['c6', 'c3', 'c1']
+
+
+def test_merge_keeps_the_cached_row_when_conversion_fails():
+    def failing(row):
+        raise ValueError('bad row')
+    merged = merge_contact_changes(CACHED, [contact('c2', '2026-01-02T00:00:00+00:00')], [], None, None, failing)
+    assert ids(merged) == ['c3', 'c2', 'c1']
+
+
+def test_sync_state_high_water_mark_is_the_latest_change():
+    rows = [
+        {'updated_at': '2026-02-01T10:00:00+00:00'},
+        {'updated_at': None, 'created_at': '2026-02-03T08:00:00Z'},
+        {'updated_at': '2026-02-02T00:00:00'},
+    ]
+    state = new_sync_state('contacts:all:gen:1', rows, 'retail', full_synced_at=123.0)
+    assert state == {
+        'data_key': 'contacts:all:gen:1',
+        'industry_filter': 'retail',
+        'high_water_mark': '2026-02-03T08:00:00+00:00',
+        'full_synced_at': 123.0,
+    }
+
+
+def test_sync_state_high_water_mark_never_moves_back():
+    previous = '2026-03-01T00:00:00+00:00'
+    state = new_sync_state('key', [{'updated_at': '2026-02-01T00:00:00+00:00'}], None, high_water_mark=previous)
+    assert state['high_water_mark'] == previous
+    state = new_sync_state('key', [], None, high_water_mark=previous)
+    assert state['high_water_mark'] == previous
+
+
+def test_sync_state_without_timestamps_has_no_high_water_mark():
+    state = new_sync_state('key', [{'updated_at': None}, {'updated_at': 'garbage'}], None)
+    assert state['high_water_mark'] is None
+    assert state['full_synced_at'] > 0
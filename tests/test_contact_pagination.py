@@ -0,0 +1,55 @@
+"""Tests for the contacts keyset cursors and search filters (app/services/contact_pagination.py)"""
+import base64
+import json
+
+import pytest
+
+from app.services.contact_pagination import (
+    InvalidCursorError, decode_cursor, encode_cursor, search_filter
+)
+
+CONTACT_ID = '0b5e6c1e-8f1d-4b7a-9a3e-2f4c5d6e7f80'
+
+
+def raw_cursor(value) -> str:
+    return base64.urlsafe_b64encode(json.dumps(value).encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def test_cursor_round_trip():
+    row = {'created_at': '2026-01-02T03:04:05.123456+00:00', 'id': CONTACT_ID, 'name': 'ignored'}
+    cursor = encode_cursor(row)
+    assert '=' not in cursor
+    assert decode_cursor(cursor) == (row['created_at'], CONTACT_ID)
+
+
+def test_cursor_round_trip_normalizes_uuid():
+    row = {'created_at': '2026-01-02T03:04:05+00:00', 'id': CONTACT_ID.upper()}
+    assert decode_cursor(encode_cursor(row)) == (row['created_at'], CONTACT_ID)
+
+
+@pytest.mark.parametrize('cursor', [
+    '',
+    'not-base64!!',
+    base64.urlsafe_b64encode(b'\xff\xfe').decode('ascii'),
+    raw_cursor({'created_at': '2026-01-01', 'id': CONTACT_ID}),
+    raw_cursor(['2026-01-01T00:00:00+00:00']),
+    raw_cursor(['2026-01-01T00:00:00+00:00', 'not-a-uuid']),
+    raw_cursor(['', CONTACT_ID]),
+    raw_cursor([12345, CONTACT_ID]),
+    raw_cursor(['2026-01-01T00:00:00+00:00', None]),
+])
+def test_bad_cursors_are_rejected(cursor):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor)
+
+
+def test_search_filter_escapes_wildcards_and_quotes():
+    # LIKE escapes (\%, \_) are escaped again for the PostgREST quoted value
+    filters = search_filter('50%_"off"')
+    assert filters.startswith(r'name.ilike."*50\\%\\_\"off\"*",')
+    assert 'company_id' not in filters
+
+
+def test_search_filter_includes_matching_companies():
+    filters = search_filter('acme', ['id-1', 'id-2'])
+    assert filters.endswith(',company_id.in.(id-1,id-2)')
@@ -0,0 +1,110 @@
+"""Tests for IndustryMatcher (app/services/industry_matcher.py)"""
+import itertools
+
+import pytest
+
+from app.services.industry_matcher import IndustryMatcher
+
+
+def legacy_match(industries, contact_industry, company_industry):
+    """The per-contact loop ai_identify_targets used before IndustryMatcher (logging removed)"""
+    contact_industry = (contact_industry or '').strip()
+    company_industry = (company_industry or '').strip() or None
+    if not contact_industry and company_industry:
+        contact_industry = company_industry
+    contact_industry_lower = contact_industry.lower() if contact_industry else ''
+    company_industry_lower = company_industry.lower() if company_industry else ''
+
+    for ind in industries:
+        ind_clean = ind.strip().lower()
+        ind_normalized = ind_clean.replace('&', 'and').replace(',', ' ').replace('  ', ' ').strip()
+        contact_normalized = contact_industry_lower.replace('&', 'and').replace(',', ' ').replace('  ', ' ').strip()
+        company_normalized = company_industry_lower.replace('&', 'and').replace(',', ' ').replace('  ', ' ').strip() if company_industry_lower else ''
+        ind_words = [w for w in ind_normalized.split() if len(w) > 3]
+        contact_words = contact_industry_lower.split()
+        company_words = company_industry_lower.split() if company_industry_lower else []
+
+        if contact_industry_lower == ind_clean:
+            return ind
+        if company_industry_lower and company_industry_lower == ind_clean:
+            return ind
+        if contact_normalized == ind_normalized:
+            return ind
+        if company_normalized and company_normalized == ind_normalized:
+            return ind
+
+        match_checks = [
+            ind_clean in contact_industry_lower,
+            contact_industry_lower in ind_clean,
+            ind_normalized in contact_normalized,
+            contact_normalized in ind_normalized,
+        ]
+        if ind_words:
+            match_checks.extend([
+                any(word in contact_industry_lower for word in ind_words),
+                any(word in ind_clean for word in contact_words if len(word) > 3),
+            ])
+        if company_industry_lower:
+            match_checks.extend([
+                ind_clean in company_industry_lower,
+                company_industry_lower in ind_clean,
+                ind_normalized in company_normalized,
+                company_normalized in ind_normalized,
+            ])
+            if ind_words:
+                match_checks.extend([
+                    any(word in company_industry_lower for word in ind_words),
+                    any(word in ind_clean for word in company_words if len(word) > 3),
+                ])
+        if any(match_checks):
+            return ind
+    return None
+
+
+REQUESTED = [
+    ['Travel & Tourism'],
+    ['FMCG', 'Retail'],
+    ['Banking, Financial Services', 'Insurance'],
+    ['Food and Beverage', 'Travel'],
+    ['IT'],
+]
+
+VALUES = [
+    None, '', '   ', 'travel', 'Travel', 'TRAVEL & TOURISM', 'travel and tourism', 'tourism',
+    'Hospitality & Travel', 'fmcg', 'Consumer Goods (FMCG)', 'retail', 'E-Retail', 'banking',
+    'financial services', 'Banking & Finance', 'insurance', 'Food & Beverage', 'beverages',
+    'food', 'it', 'IT Services', 'information technology', 'healthcare', 'real estate',
+    'automotive', 'a', 'Tour',
+]
+
+
+@pytest.mark.parametrize('industries', REQUESTED, ids=lambda i: '|'.join(i))
+def test_matches_the_legacy_loop(industries):
+    matcher = IndustryMatcher(industries)
+    for contact_industry, company_industry in itertools.product(VALUES, VALUES):
+        expected = legacy_match(industries, contact_industry, company_industry)
+        assert matcher.match(contact_industry, company_industry) == expected, (contact_industry, company_industry)
+
+
+def test_first_requested_industry_wins():
+    assert IndustryMatcher(['Retail', 'FMCG']).match('fmcg retail') == 'Retail'
+    assert IndustryMatcher(['FMCG', 'Retail']).match('fmcg retail') == 'FMCG'
+
+
+def test_company_industry_is_a_fallback_and_a_second_chance():
+    matcher = IndustryMatcher(['Banking'])
+    assert matcher.match(None, 'Banking') == 'Banking'
+    assert matcher.match('healthcare', 'banking') == 'Banking'
+    assert matcher.match('healthcare', 'automotive') is None
+
+
+def test_contacts_without_any_industry_match():
+    assert IndustryMatcher(['Banking']).match(None, None) == 'Banking'
+
+
+def test_distinct_values_are_memoized():
+    matcher = IndustryMatcher(['Travel'])
+    for _ in range(3):
+        matcher.match('Travel', 'Hospitality')
+        matcher.match('travel ', None)
+    assert matcher.distinct_values == 3
@@ -69,6 +69,62 @@ OPTIONAL_VARS = {
     # Redis
     'REDIS_HOST': 'Redis host (default: redis)',
     'REDIS_PORT': 'Redis port (default: 6379)',
+    'CACHE_SWEEP_INTERVAL': 'Seconds between stale cache key sweeps (default: 0 = disabled)',
+    'MEMORY_CACHE_MAX_ENTRIES': 'Max entries in the in-memory cache fallback (default: 1000)',
+    'MEMORY_CACHE_MAX_MB': 'Max approximate size of the in-memory cache fallback in MB (default: 256)',
+    'CACHE_CODEC': 'Cache payload codec, e.g. msgpack+zstd, orjson+lz4, json+none (default: best installed)',
+    'CACHE_L1_ENABLED': 'Per-process L1 cache in front of Redis (default: true)',
+    'CACHE_L1_TTL': 'Max seconds a value stays in the L1 cache (default: 30)',
+    'CONTACTS_LIST_MODE': 'GET /api/contacts mode: server (Postgres keyset pagination, default) or cache',
+    'CONTACTS_SERVER_MAX_LIMIT': 'Largest page served in server mode; bigger limits use the cache (default: 1000)',
+    'CONTACTS_SERVER_SEARCH_MAX_COMPANIES': 'Most companies a server-mode search matches by name/industry; broader searches use the cache (default: 100)',
+    'IMPORT_JOB_BATCH_SIZE': 'Rows per upsert batch in background import jobs (default: 500)',
+    'IMPORT_JOB_QUEUE_BATCHES': 'Parsed batches buffered ahead of the import writer (default: 4)',
+    'IMPORT_JOB_CONCURRENCY': 'Import batches written concurrently per job (default: 4)',
+    'BATCH_WRITE_MAX_CONCURRENCY': 'Job batch writes in flight per process across all jobs (default: 8)',
+    'CONTACTS_BULK_UPSERT': 'Write contact imports with set-based bulk upserts (default: true)',
+    'CONTACTS_BULK_UPSERT_CHUNK_SIZE': 'Rows per bulk contact upsert chunk (default: 500)',
+    'CONTACTS_IN_FILTER_MAX_CHARS': 'Max URL-encoded length of one IN (...) filter in duplicate checks (default: 6000)',
+    'CONTACTS_DELTA_ENABLED': 'Refresh the contacts cache with deltas instead of full reloads (default: true)',
+    'CONTACTS_FULL_RESYNC_INTERVAL': 'Seconds between forced full contacts cache reloads (default: 86400)',
+    'CONTACTS_DELTA_MAX_ROWS': 'Changed rows above which a full contacts reload is done instead (default: 10000)',
+    'CONTACT_SEARCH_INDEX_MAX': 'Contacts search indexes kept per process (default: 8)',
+    'CONTACT_SEARCH_INDEX_MAX_MB': 'Max approximate size of contacts search indexes in MB (default: 128)',
+    'ENRICHMENT_CACHE_TTL_DAYS': 'Days a company enrichment result is reused per domain (default: 90)',
+    'ENRICHMENT_NEGATIVE_TTL_DAYS': 'Days an unknown-domain enrichment result is reused (default: 7)',
+    'ENRICHMENT_REDIS_TTL': 'Seconds enrichment results stay in Redis in front of the table (default: 86400)',
+    'ENRICHMENT_BATCH_SIZE': 'Domains per OpenAI call when enriching new companies in bulk (default: 20)',
+    'LINKEDIN_ENRICHMENT_WORKERS': 'Threads enriching imported contacts from LinkedIn in the background (default: 4)',
+    'LINKEDIN_ENRICHMENT_RATE': 'LinkedIn enrichment calls per second across all workers (default: 5)',
+    'LINKEDIN_ENRICHMENT_QUEUE_SIZE': 'Contacts waiting for LinkedIn enrichment before new ones are skipped (default: 10000)',
+    'LINKEDIN_ENRICHMENT_FLUSH_SIZE': 'LinkedIn enrichment results per bulk write-back (default: 50)',
+    'LINKEDIN_ENRICHMENT_FLUSH_SECONDS': 'Maximum seconds a LinkedIn enrichment result waits for its write-back (default: 2)',
+    'TARGET_ANALYSIS_BATCH_SIZE': 'Contacts per AI call when identifying targets (default: 10)',
+    'TARGET_ANALYSIS_CONCURRENCY': 'Target analysis batches sent to the AI provider at once (default: 4)',
+    'TARGET_ANALYSIS_GEMINI_RATE': 'Gemini target analysis calls per second per process (default: 1)',
+    'TARGET_ANALYSIS_OPENAI_RATE': 'OpenAI target analysis calls per second per process (default: 3)',
+    'TARGET_ANALYSIS_MAX_RETRIES': 'Retries of a rate-limited (429) target analysis call (default: 3)',
+    'TARGET_ANALYSIS_BACKOFF_SECONDS': 'Initial backoff after a 429, doubled per retry (default: 2)',
+    'TARGET_ANALYSIS_CACHE': 'Reuse cached AI analyses of unchanged contacts: true (default) or false',
+    'TARGET_ANALYSIS_CACHE_TTL_DAYS': 'Days a per-contact AI analysis is reused (default: 30)',
+    'TARGET_ANALYSIS_REDIS_TTL': 'Seconds cached analyses stay in Redis in front of the table (default: 86400)',
+    'JOB_QUEUE_BACKEND': 'Background job queue: redis (durable, default) or thread (in-process)',
+    'JOB_WORKER_CONCURRENCY': 'Jobs run at once by a dedicated worker process (default: 2)',
+    'JOB_EMBEDDED_WORKERS': 'Job worker threads inside each web process; 0 with dedicated workers (default: 1)',
+    'JOB_LEASE_SECONDS': 'Seconds before a job whose worker stopped heartbeating is requeued (default: 60)',
+    'JOB_HEARTBEAT_SECONDS': 'Seconds between job lease renewals (default: 15)',
+    'JOB_MAX_ATTEMPTS': 'Claims per job before an expired lease marks it failed (default: 3)',
+    'JOB_DATA_TTL': 'Seconds a queued job and its uploaded file are kept (default: 604800)',
+    'IMPORT_FILE_STORAGE': 'Where uploaded import files are kept for resuming: local (default) or supabase',
+    'IMPORT_FILE_DIR': 'Directory for uploaded import files with local storage (default: data/imports)',
+    'IMPORT_FILE_BUCKET': 'Supabase storage bucket for uploaded import files (default: import-files)',
+    'JOB_PROGRESS_WRITE_INTERVAL': 'Min seconds between progress writes to a job row (default: 1)',
+    'JOB_EVENTS_MAX_SECONDS': 'Seconds a job progress event stream stays open before the browser reconnects (default: 300)',
+    
+    # Auth
+    'SUPABASE_AUTH_VERIFY_MODE': 'Token validation mode: remote (default) or local JWT verification',
+    'SUPABASE_JWT_SECRET': 'Supabase JWT secret for local HS256 verification',
+    'AUTH_USER_CACHE_TTL': 'Seconds to cache resolved user/industry per token (default: 60)',
     
     # Cal.com
     'CAL_COM_API_KEY': 'Cal.com API key for meeting scheduling',